@@ -0,0 +1,5 @@
+"""
+Benchmark suites for instagram_cookie_generator.
+
+Run as modules from the repository root, e.g. `python -m benchmarks.startup`.
+"""
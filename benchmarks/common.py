@@ -0,0 +1,204 @@
+"""
+Shared helpers for benchmark suites: synthetic cookie jars, process inspection,
+latency statistics and machine-readable result output.
+"""
+
+import json
+import math
+import os
+import platform
+import socket
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from datetime import UTC, datetime
+from importlib.metadata import PackageNotFoundError
+from importlib.metadata import version as dist_version
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+SRC_DIR = REPO_ROOT / "src"
+
+SESSION_COOKIE_NAMES = ("csrftoken", "datr", "ds_user_id", "ig_did", "mid", "rur", "sessionid")
+
+
+def write_synthetic_jar(path: Path, lines: int, ttl_seconds: int = 7 * 24 * 3600) -> Path:
+    """
+    Write a Netscape cookie jar with the given number of cookie lines.
+
+    The first lines reuse real Instagram cookie names; the rest get synthetic names.
+    Expiries are spread over `ttl_seconds` so the earliest one is still in the future.
+
+    Args:
+        path: Destination file.
+        lines: Number of cookie lines.
+        ttl_seconds: Upper bound of the expiry spread from now.
+
+    Returns:
+        Path: The written file.
+    """
+    now = int(time.time())
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("# Netscape HTTP Cookie File\n")
+        f.write("# This file was generated by a benchmark.\n\n")
+        for i in range(lines):
+            name = SESSION_COOKIE_NAMES[i] if i < len(SESSION_COOKIE_NAMES) else f"bench_cookie_{i}"
+            expiry = now + 3600 + (i * 7919) % ttl_seconds
+            f.write(f".instagram.com\tTRUE\t/\tTRUE\t{expiry}\t{name}\t{i:032x}\n")
+    return path
+
+
+def ensure_src_on_path() -> None:
+    """Make the package importable from the source tree without installing it."""
+    if str(SRC_DIR) not in sys.path:
+        sys.path.insert(0, str(SRC_DIR))
+
+
+def free_port() -> int:
+    """Return a TCP port that is currently free on localhost."""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return int(sock.getsockname()[1])
+
+
+def service_env(**overrides: str) -> Dict[str, str]:
+    """Environment for spawning the service from the source tree."""
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(SRC_DIR), env.get("PYTHONPATH")]))
+    env.update(overrides)
+    return env
+
+
+def wait_for_http_ok(url: str, timeout: float, proc: Optional[subprocess.Popen[bytes]] = None) -> Optional[float]:
+    """
+    Poll a URL until it returns HTTP 200.
+
+    Args:
+        url: URL to poll.
+        timeout: Maximum seconds to wait.
+        proc: Process serving the URL; polling stops early if it exits.
+
+    Returns:
+        float | None: Seconds until the first 200 response, or None on timeout.
+    """
+    start = time.perf_counter()
+    while time.perf_counter() - start < timeout:
+        if proc is not None and proc.poll() is not None:
+            return None
+        try:
+            with urllib.request.urlopen(url, timeout=1) as response:
+                if response.status == 200:
+                    return time.perf_counter() - start
+        except (urllib.error.URLError, ConnectionError, TimeoutError):
+            pass
+        time.sleep(0.005)
+    return None
+
+
+def process_tree(pid: int) -> List[int]:
+    """Return the PID and all descendant PIDs of a process, read from /proc."""
+    children: Dict[int, List[int]] = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat", "r", encoding="utf-8") as f:
+                stat = f.read()
+        except OSError:
+            continue
+        # The command name may contain spaces, fields after it are space separated.
+        ppid = int(stat.rsplit(")", 1)[1].split()[1])
+        children.setdefault(ppid, []).append(int(entry))
+
+    tree, queue = [], [pid]
+    while queue:
+        current = queue.pop()
+        tree.append(current)
+        queue.extend(children.get(current, []))
+    return tree
+
+
+def rss_bytes(pid: int) -> int:
+    """Return the resident set size of a process in bytes, or 0 if it is gone."""
+    try:
+        with open(f"/proc/{pid}/status", "r", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return 0
+
+
+def tree_rss_bytes(pid: int) -> int:
+    """Return the summed resident set size of a process and its descendants."""
+    return sum(rss_bytes(p) for p in process_tree(pid))
+
+
+def percentile(sorted_values: Sequence[float], pct: float) -> float:
+    """
+    Nearest-rank percentile of an already sorted sequence.
+
+    Args:
+        sorted_values: Values in ascending order.
+        pct: Percentile in the 0-100 range.
+
+    Returns:
+        float: The percentile value, 0.0 for an empty sequence.
+    """
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, math.ceil(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+def latency_summary(latencies: Sequence[float], elapsed: float) -> Dict[str, float]:
+    """
+    Summarize request latencies (seconds) measured over `elapsed` wall-clock seconds.
+
+    Returns:
+        dict: Request count, throughput and latency percentiles in milliseconds.
+    """
+    ordered = sorted(latencies)
+    return {
+        "requests": len(ordered),
+        "throughput_rps": len(ordered) / elapsed if elapsed > 0 else 0.0,
+        "p50_ms": percentile(ordered, 50) * 1000,
+        "p90_ms": percentile(ordered, 90) * 1000,
+        "p99_ms": percentile(ordered, 99) * 1000,
+        "max_ms": (ordered[-1] if ordered else 0.0) * 1000,
+    }
+
+
+def run_metadata() -> Dict[str, Any]:
+    """Describe the environment a benchmark ran in, so results can be compared across releases."""
+    try:
+        revision = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        revision = "unknown"
+    try:
+        package_version = dist_version("instagram-cookie-generator")
+    except PackageNotFoundError:
+        package_version = "unknown"
+    return {
+        "timestamp": datetime.now(UTC).isoformat(timespec="seconds"),
+        "git_revision": revision,
+        "package_version": package_version,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def write_results(results: Dict[str, Any], output: Optional[str]) -> None:
+    """Write benchmark results as JSON to a file, or to stdout when no file is given."""
+    payload = json.dumps(results, indent=2, sort_keys=True)
+    if output:
+        Path(output).write_text(payload + "\n", encoding="utf-8")
+    else:
+        print(payload)
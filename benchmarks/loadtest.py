@@ -0,0 +1,252 @@
+"""
+Load-test harness for the health endpoints with large cookie jars.
+
+Generates synthetic Netscape jars of increasing size and drives `/status` and `/healthz`
+through Flask's test client and through a real socket at a configurable concurrency.
+For each jar size it reports throughput, p50/p99 latency, the cost of (re)building the
+status metadata from the jar, and tracemalloc allocation peaks:
+
+    python -m benchmarks.loadtest --sizes 10000 100000 --concurrency 8 --output loadtest.json
+
+With `--cold` the cached status snapshot is dropped before every request, which measures
+the full jar parse on the request path instead of the cached steady state.
+"""
+
+import argparse
+import http.client
+import logging
+import tempfile
+import threading
+import time
+import tracemalloc
+from pathlib import Path
+from types import ModuleType
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from werkzeug.serving import make_server
+
+from .common import (
+    ensure_src_on_path,
+    free_port,
+    latency_summary,
+    run_metadata,
+    write_results,
+    write_synthetic_jar,
+)
+
+ENDPOINTS = ("/status", "/healthz")
+
+
+def load_webserver(cookies_file: Path) -> ModuleType:
+    """
+    Import the webserver and point it at a cookies file.
+
+    Args:
+        cookies_file: Jar the endpoints should report on.
+
+    Returns:
+        ModuleType: The webserver module.
+    """
+    ensure_src_on_path()
+    from instagram_cookie_generator import webserver  # pylint: disable=import-outside-toplevel
+
+    setattr(webserver, "COOKIES_FILE", str(cookies_file))
+    webserver.invalidate_status_snapshot()
+    return webserver
+
+
+def run_concurrent(request: Callable[[], None], concurrency: int, total_requests: int) -> Dict[str, float]:
+    """
+    Issue requests from concurrent threads and summarize latencies.
+
+    Args:
+        request: Callable performing one request; raising counts as an error.
+        concurrency: Number of client threads.
+        total_requests: Requests issued across all threads; the remainder of an uneven split goes to the first threads.
+
+    Returns:
+        dict: Throughput, latency percentiles and error count.
+    """
+    latencies: List[float] = []
+    errors = [0]
+    lock = threading.Lock()
+    shares = [total_requests // concurrency + (i < total_requests % concurrency) for i in range(concurrency)]
+    barrier = threading.Barrier(concurrency + 1)
+
+    def client(count: int) -> None:
+        local: List[float] = []
+        failed = 0
+        barrier.wait()
+        for _ in range(count):
+            start = time.perf_counter()
+            try:
+                request()
+                local.append(time.perf_counter() - start)
+            except Exception:  # pylint: disable=broad-exception-caught
+                failed += 1
+        with lock:
+            latencies.extend(local)
+            errors[0] += failed
+
+    threads = [threading.Thread(target=client, args=(count,)) for count in shares]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    return {**latency_summary(latencies, elapsed), "concurrency": concurrency, "errors": errors[0]}
+
+
+def measure_allocations(request: Callable[[], None], samples: int) -> Dict[str, float]:
+    """
+    Measure memory allocated by sequential requests with tracemalloc.
+
+    Returns:
+        dict: Peak traced memory and mean net allocation per request in bytes.
+    """
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        before, _ = tracemalloc.get_traced_memory()
+        for _ in range(samples):
+            request()
+        after, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"peak_bytes": peak - before, "net_bytes_per_request": (after - before) / samples}
+
+
+def measure_metadata_build(webserver: ModuleType, repeats: int) -> Dict[str, float]:
+    """
+    Time and trace a full jar parse, i.e. what a request pays after the jar changed.
+
+    Returns:
+        dict: Median build time in milliseconds and tracemalloc peak in bytes.
+    """
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        webserver.build_status_snapshot(None)
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        webserver.build_status_snapshot(None)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    timings.sort()
+    return {"median_ms": timings[len(timings) // 2] * 1000, "alloc_peak_bytes": peak}
+
+
+def flask_client_request(webserver: ModuleType, endpoint: str, cold: bool) -> Callable[[], None]:
+    """Build a request callable going through Flask's test client."""
+    client = webserver.app.test_client()
+
+    def request() -> None:
+        if cold:
+            webserver.invalidate_status_snapshot()
+        client.get(endpoint).get_data()
+
+    return request
+
+
+def socket_request(webserver: ModuleType, port: int, endpoint: str, cold: bool) -> Callable[[], None]:
+    """Build a request callable going through a real TCP connection."""
+
+    def request() -> None:
+        if cold:
+            webserver.invalidate_status_snapshot()
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+        try:
+            conn.request("GET", endpoint)
+            conn.getresponse().read()
+        finally:
+            conn.close()
+
+    return request
+
+
+def run_size(args: argparse.Namespace, jar_lines: int, tmp: Path) -> Dict[str, Any]:
+    """
+    Run all transports and endpoints against a jar of the given size.
+
+    Returns:
+        dict: Results keyed by transport and endpoint.
+    """
+    jar = write_synthetic_jar(tmp / f"cookies_{jar_lines}.txt", jar_lines)
+    webserver = load_webserver(jar)
+    result: Dict[str, Any] = {
+        "jar_lines": jar_lines,
+        "jar_bytes": jar.stat().st_size,
+        "metadata_build": measure_metadata_build(webserver, args.build_repeats),
+    }
+
+    if "test-client" in args.transports:
+        result["test_client"] = {}
+        for endpoint in ENDPOINTS:
+            request = flask_client_request(webserver, endpoint, args.cold)
+            request()
+            result["test_client"][endpoint] = {
+                **run_concurrent(request, args.concurrency, args.requests),
+                "allocations": measure_allocations(request, args.alloc_samples),
+            }
+
+    if "socket" in args.transports:
+        port = free_port()
+        server = make_server("127.0.0.1", port, webserver.app, threaded=True)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            result["socket"] = {}
+            for endpoint in ENDPOINTS:
+                request = socket_request(webserver, port, endpoint, args.cold)
+                request()
+                result["socket"][endpoint] = run_concurrent(request, args.concurrency, args.requests)
+        finally:
+            server.shutdown()
+            thread.join()
+
+    return result
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Load-test /status and /healthz with large cookie jars.")
+    parser.add_argument("--output", help="Write JSON results to this file instead of stdout.")
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[10_000, 50_000, 100_000, 250_000], help="Jar sizes in lines."
+    )
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent client threads.")
+    parser.add_argument("--requests", type=int, default=2000, help="Requests per endpoint and transport.")
+    parser.add_argument(
+        "--transports",
+        nargs="+",
+        choices=["test-client", "socket"],
+        default=["test-client", "socket"],
+        help="How requests reach the app.",
+    )
+    parser.add_argument("--cold", action="store_true", help="Drop the cached status snapshot before each request.")
+    parser.add_argument("--alloc-samples", type=int, default=50, help="Sequential requests traced for allocations.")
+    parser.add_argument("--build-repeats", type=int, default=5, help="Timed full jar parses per size.")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    """Run the load-test harness."""
+    args = parse_args(argv)
+    # Per-request access logs would dominate the socket transport timings.
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)
+    results: Dict[str, Any] = {"suite": "loadtest", "meta": run_metadata(), "params": vars(args), "sizes": []}
+    with tempfile.TemporaryDirectory() as tmp:
+        for jar_lines in args.sizes:
+            results["sizes"].append(run_size(args, jar_lines, Path(tmp)))
+    write_results(results, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+Offline benchmark of the refresh flow, replaying a recorded browser session.
+
+Record a trace once against a real browser (BROWSER_RECORD_FILE=trace.jsonl), then run the
+full `cookie_manager` refresh against it without a browser or network:
+
+    python -m benchmarks.replay --trace trace.jsonl --time-scale 1 --runs 5 --output replay.json
+
+With `--time-scale 1` each browser command takes as long as it did when recorded, so the
+totals reflect real sessions; `--time-scale 0` isolates the service's own overhead. For each
+run it reports the wall-clock duration and the time spent in each traced phase (`navigate`,
+`cookies.load`, `login`, `cookies.save`, ...). The flow's fixed page-load waits are included.
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+from .common import ensure_src_on_path, run_metadata, write_results
+
+
+def seed_cookies(trace: str, cookies_file: Path) -> int:
+    """
+    Write the cookies the recorded session loaded, so the replay takes the same branch.
+
+    Cookie values are redacted in traces; the replay matches them redacted as well.
+
+    Args:
+        trace: Trace file.
+        cookies_file: Cookies file to write.
+
+    Returns:
+        int: Number of cookies written, 0 if the recorded session started without a jar.
+    """
+    ensure_src_on_path()
+    # pylint: disable=import-outside-toplevel
+    from instagram_cookie_generator.replay import load_trace
+    from instagram_cookie_generator.storage import Cookie, write_netscape
+
+    cookies = [
+        Cookie.from_webdriver(entry["args"][0]) for entry in load_trace(trace) if entry["command"] == "add_cookie"
+    ]
+    if cookies:
+        write_netscape(str(cookies_file), cookies)
+    return len(cookies)
+
+
+def run_once(trace: str, tmp: Path) -> Dict[str, Any]:
+    """
+    Run one refresh against the trace.
+
+    Args:
+        trace: Trace file.
+        tmp: Scratch directory for the cookies file.
+
+    Returns:
+        dict: Duration, seeded cookie count, error if the refresh failed and per-phase durations in milliseconds.
+    """
+    # pylint: disable=import-outside-toplevel
+    from instagram_cookie_generator.accounts import Account
+    from instagram_cookie_generator.cookie_manager import cookie_manager
+    from instagram_cookie_generator.tracing import get_tracer
+
+    cookies_file = tmp / f"cookies-{time.monotonic_ns()}.txt"
+    seeded = seed_cookies(trace, cookies_file)
+    account = Account(username="replay", password="replay", cookies_file=str(cookies_file))
+    tracer = get_tracer()
+    before = len(tracer.spans())
+
+    error = None
+    started = time.perf_counter()
+    try:
+        cookie_manager(account)
+    except Exception as e:  # pylint: disable=broad-exception-caught
+        error = f"{type(e).__name__}: {e}"
+    duration = time.perf_counter() - started
+
+    phases: Dict[str, float] = {}
+    for finished in tracer.spans()[before:]:
+        phases[finished.name] = round(phases.get(finished.name, 0.0) + finished.duration_ms, 3)
+    return {"seconds": round(duration, 4), "seeded_cookies": seeded, "error": error, "phases_ms": phases}
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Benchmark the refresh flow against a recorded browser session.")
+    parser.add_argument("--trace", required=True, help="Trace recorded with BROWSER_RECORD_FILE.")
+    parser.add_argument("--time-scale", type=float, default=1.0, help="Multiplier of recorded latencies, 0 for none.")
+    parser.add_argument("--runs", type=int, default=3, help="Number of replayed refreshes.")
+    parser.add_argument("--output", help="Write JSON results to this file instead of stdout.")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    """Run the replay benchmark."""
+    args = parse_args(argv)
+    # Configuration is read at import time, so it must be in place before the package is imported.
+    os.environ.update(
+        {
+            "BROWSER_ENGINE": "replay",
+            "REPLAY_TRACE_FILE": os.path.abspath(args.trace),
+            "REPLAY_TIME_SCALE": str(args.time_scale),
+            "BROWSER_RECORD_FILE": "",
+            "LOGIN_RATE_GLOBAL_PER_HOUR": "0",
+            "LOGIN_RATE_ACCOUNT_PER_HOUR": "0",
+            "COOKIE_STORE_BACKEND": "file",
+        }
+    )
+    ensure_src_on_path()
+    with open(args.trace, "r", encoding="utf-8") as f:
+        header = json.loads(f.readline())
+
+    runs: List[Dict[str, Any]] = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for _ in range(args.runs):
+            runs.append(run_once(args.trace, Path(tmp)))
+
+    seconds = sorted(run["seconds"] for run in runs)
+    results = {
+        "suite": "replay",
+        "meta": run_metadata(),
+        "params": vars(args),
+        "trace": header,
+        "runs": runs,
+        "min_seconds": seconds[0] if seconds else 0.0,
+        "median_seconds": seconds[len(seconds) // 2] if seconds else 0.0,
+        "errors": sum(1 for run in runs if run["error"]),
+    }
+    write_results(results, args.output)
+
+
+if __name__ == "__main__":
+    main()
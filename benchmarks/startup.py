@@ -0,0 +1,253 @@
+"""
+Startup and import-time benchmark suite.
+
+Measures, against the service started from the source tree:
+
+- per-module import time of the entry point (parsed from `python -X importtime`)
+- time from process spawn to the first successful `/healthz`
+- steady-state RSS of the process tree, idle and (with `--full`) during a refresh
+- `/status` throughput and latency percentiles under concurrent load
+
+Results are written as JSON so they can be compared between releases:
+
+    python -m benchmarks.startup --output startup.json
+"""
+
+import argparse
+import http.client
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+from .common import (
+    free_port,
+    latency_summary,
+    run_metadata,
+    service_env,
+    tree_rss_bytes,
+    wait_for_http_ok,
+    write_results,
+    write_synthetic_jar,
+)
+
+ENTRY_MODULE = "instagram_cookie_generator.main"
+PACKAGE_PREFIX = "instagram_cookie_generator"
+
+
+def parse_importtime(stderr: str) -> Dict[str, Dict[str, int]]:
+    """
+    Parse `-X importtime` output.
+
+    Args:
+        stderr: Captured stderr of the interpreter.
+
+    Returns:
+        dict: Module name to {"self_us": ..., "cumulative_us": ...}.
+    """
+    modules: Dict[str, Dict[str, int]] = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = (part.strip() for part in line[len("import time:") :].split("|", 2))
+        modules[name.strip()] = {"self_us": int(self_us), "cumulative_us": int(cumulative_us)}
+    return modules
+
+
+def measure_import_times(modules: Sequence[str], repeats: int, top: int) -> Dict[str, Any]:
+    """
+    Measure import time of each target module in a fresh interpreter.
+
+    Args:
+        modules: Modules to import.
+        repeats: Fresh interpreter runs per module; medians are reported.
+        top: Number of most expensive dependencies (by self time) to list.
+
+    Returns:
+        dict: Per target module: total, package modules and top dependencies in microseconds.
+    """
+    results: Dict[str, Any] = {}
+    for module in modules:
+        samples: Dict[str, Dict[str, List[int]]] = defaultdict(lambda: {"self_us": [], "cumulative_us": []})
+        for _ in range(repeats):
+            proc = subprocess.run(
+                [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                capture_output=True,
+                text=True,
+                check=True,
+                env=service_env(),
+            )
+            for name, timing in parse_importtime(proc.stderr).items():
+                samples[name]["self_us"].append(timing["self_us"])
+                samples[name]["cumulative_us"].append(timing["cumulative_us"])
+
+        medians = {
+            name: {key: int(statistics.median(values)) for key, values in timing.items()}
+            for name, timing in samples.items()
+        }
+        ranked = sorted(medians.items(), key=lambda item: item[1]["self_us"], reverse=True)
+        results[module] = {
+            "total_us": medians.get(module, {}).get("cumulative_us", 0),
+            "loaded_modules": len(medians),
+            "package_modules": {name: t for name, t in medians.items() if name.startswith(PACKAGE_PREFIX)},
+            "top_self_us": dict(ranked[:top]),
+            "selenium_loaded": any(name.startswith("selenium") for name in medians),
+        }
+    return results
+
+
+def measure_status_load(host: str, port: int, concurrency: int, total_requests: int) -> Dict[str, float]:
+    """
+    Drive `/status` from concurrent client threads.
+
+    Args:
+        host: Server host.
+        port: Server port.
+        concurrency: Number of client threads.
+        total_requests: Requests issued across all threads; the remainder of an uneven split goes to the first threads.
+
+    Returns:
+        dict: Throughput, latency percentiles and error count.
+    """
+    latencies: List[float] = []
+    errors = [0]
+    lock = threading.Lock()
+    shares = [total_requests // concurrency + (i < total_requests % concurrency) for i in range(concurrency)]
+
+    def client(count: int) -> None:
+        local: List[float] = []
+        failed = 0
+        for _ in range(count):
+            start = time.perf_counter()
+            try:
+                conn = http.client.HTTPConnection(host, port, timeout=10)
+                conn.request("GET", "/status")
+                conn.getresponse().read()
+                conn.close()
+                local.append(time.perf_counter() - start)
+            except OSError:
+                failed += 1
+        with lock:
+            latencies.extend(local)
+            errors[0] += failed
+
+    threads = [threading.Thread(target=client, args=(count,)) for count in shares]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    return {**latency_summary(latencies, elapsed), "concurrency": concurrency, "errors": errors[0]}
+
+
+def sample_rss(pid: int, window_seconds: float, interval: float = 0.1) -> Dict[str, int]:
+    """
+    Sample the RSS of a process tree over a time window.
+
+    Returns:
+        dict: Median and peak RSS in bytes.
+    """
+    samples = []
+    deadline = time.monotonic() + window_seconds
+    while time.monotonic() < deadline:
+        samples.append(tree_rss_bytes(pid))
+        time.sleep(interval)
+    return {"median_bytes": int(statistics.median(samples)) if samples else 0, "peak_bytes": max(samples, default=0)}
+
+
+def measure_service(args: argparse.Namespace, jar: Path) -> Dict[str, Any]:
+    """
+    Start the service and measure readiness, memory and `/status` load behaviour.
+
+    Args:
+        args: Parsed command line arguments.
+        jar: Cookies file the service should serve.
+
+    Returns:
+        dict: Service level measurements.
+    """
+    port = free_port()
+    command = [sys.executable, "-m", ENTRY_MODULE] + ([] if args.full else ["--serve-only"])
+    env = service_env(COOKIES_FILE=str(jar), SERVER_HOST="127.0.0.1", SERVER_PORT=str(port), LOG_LEVEL="WARNING")
+
+    results: Dict[str, Any] = {"mode": "full" if args.full else "serve-only"}
+    readiness: List[float] = []
+    for run in range(args.repeats):
+        with subprocess.Popen(command, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL) as proc:
+            try:
+                ready = wait_for_http_ok(f"http://127.0.0.1:{port}/healthz", args.ready_timeout, proc)
+                if ready is None:
+                    raise RuntimeError(f"Service did not become ready within {args.ready_timeout}s")
+                readiness.append(ready)
+
+                if run == args.repeats - 1:
+                    time.sleep(args.settle_seconds)
+                    results["rss_idle"] = sample_rss(proc.pid, args.rss_window)
+                    results["status_load"] = measure_status_load("127.0.0.1", port, args.concurrency, args.requests)
+                    if args.full:
+                        # The refresh worker starts right away, sample while the browser is running.
+                        results["rss_refresh"] = sample_rss(proc.pid, args.refresh_window)
+            finally:
+                proc.terminate()
+                proc.wait(timeout=10)
+
+    results["time_to_healthz_ms"] = {
+        "median": statistics.median(readiness) * 1000,
+        "min": min(readiness) * 1000,
+        "max": max(readiness) * 1000,
+        "samples": len(readiness),
+    }
+    return results
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Startup and import-time benchmarks.")
+    parser.add_argument("--output", help="Write JSON results to this file instead of stdout.")
+    parser.add_argument("--repeats", type=int, default=5, help="Fresh process runs per measurement.")
+    parser.add_argument(
+        "--modules",
+        nargs="+",
+        default=[ENTRY_MODULE, f"{PACKAGE_PREFIX}.webserver", f"{PACKAGE_PREFIX}.cookie_manager"],
+        help="Modules to measure import time for.",
+    )
+    parser.add_argument("--top", type=int, default=15, help="Most expensive imports to report per module.")
+    parser.add_argument("--jar-lines", type=int, default=20, help="Cookie lines in the synthetic jar.")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent /status clients.")
+    parser.add_argument("--requests", type=int, default=2000, help="Total /status requests.")
+    parser.add_argument("--ready-timeout", type=float, default=30.0, help="Seconds to wait for /healthz.")
+    parser.add_argument("--settle-seconds", type=float, default=1.0, help="Wait before sampling idle RSS.")
+    parser.add_argument("--rss-window", type=float, default=2.0, help="Seconds to sample idle RSS for.")
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="Run with the refresh worker (needs credentials in the environment) instead of --serve-only.",
+    )
+    parser.add_argument("--refresh-window", type=float, default=30.0, help="Seconds to sample RSS during refresh.")
+    parser.add_argument("--skip-service", action="store_true", help="Only measure import times.")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    """Run the startup benchmark suite."""
+    args = parse_args(argv)
+    results: Dict[str, Any] = {"suite": "startup", "meta": run_metadata(), "params": vars(args)}
+    results["import_time"] = measure_import_times(args.modules, args.repeats, args.top)
+
+    if not args.skip_service:
+        with tempfile.TemporaryDirectory() as tmp:
+            jar = write_synthetic_jar(Path(tmp) / "cookies.txt", args.jar_lines)
+            results["service"] = measure_service(args, jar)
+
+    write_results(results, args.output)
+
+
+if __name__ == "__main__":
+    main()
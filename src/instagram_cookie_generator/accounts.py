@@ -0,0 +1,90 @@
+"""
+Accounts Module.
+
+Describes the Instagram accounts a generator refreshes. By default this is the single
+account from INSTAGRAM_USERNAME / INSTAGRAM_PASSWORD, saved to COOKIES_FILE. With
+INSTAGRAM_ACCOUNTS_FILE, accounts are read from a JSON list:
+
+    [{"username": "alice", "password": "..."}, {"username": "bob", "password": "...", "cookies_file": "bob.txt"}]
+
+Accounts without a `cookies_file` are saved to ACCOUNT_COOKIES_FILE with `{account}`
+replaced by the username.
+"""
+
+import json
+import threading
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from .config import (
+    ACCOUNT_COOKIES_FILE,
+    COOKIES_FILE,
+    INSTAGRAM_ACCOUNTS_FILE,
+    INSTAGRAM_PASSWORD,
+    INSTAGRAM_USERNAME,
+)
+
+
+@dataclass(frozen=True)
+class Account:
+    """Credentials of one account and the cookies file its jar is saved to."""
+
+    username: str
+    password: str = field(repr=False)
+    cookies_file: str = COOKIES_FILE
+
+
+def load_accounts(path: str = INSTAGRAM_ACCOUNTS_FILE) -> List[Account]:
+    """
+    Load the configured accounts.
+
+    Args:
+        path: JSON accounts file. If empty, the single account from the environment is used.
+
+    Returns:
+        list: Accounts, empty if none are configured.
+
+    Raises:
+        ValueError: If the file is malformed or lists an account twice.
+    """
+    if not path:
+        if not INSTAGRAM_USERNAME:
+            return []
+        return [Account(INSTAGRAM_USERNAME, INSTAGRAM_PASSWORD or "", COOKIES_FILE)]
+
+    with open(path, "r", encoding="utf-8") as f:
+        raw = json.load(f)
+    if not isinstance(raw, list):
+        raise ValueError(f"Accounts file {path} must contain a JSON list")
+
+    accounts = []
+    for entry in raw:
+        if not isinstance(entry, dict) or not entry.get("username") or "password" not in entry:
+            raise ValueError(f"Invalid account entry in {path}: every account needs a username and a password")
+        username = str(entry["username"])
+        cookies_file = entry.get("cookies_file") or ACCOUNT_COOKIES_FILE.format(account=username)
+        accounts.append(Account(username, str(entry["password"]), cookies_file))
+
+    names = [account.username for account in accounts]
+    if len(set(names)) != len(names):
+        raise ValueError(f"Duplicate accounts in {path}")
+    return accounts
+
+
+_ACCOUNTS: Optional[List[Account]] = None
+_ACCOUNTS_LOCK = threading.Lock()
+
+
+def get_accounts() -> List[Account]:
+    """Return the process-wide account list, loaded on first use."""
+    global _ACCOUNTS  # pylint: disable=global-statement
+
+    with _ACCOUNTS_LOCK:
+        if _ACCOUNTS is None:
+            _ACCOUNTS = load_accounts()
+        return _ACCOUNTS
+
+
+def find_account(username: str) -> Optional[Account]:
+    """Return the configured account with this username, if any."""
+    return next((account for account in get_accounts() if account.username == username), None)
@@ -0,0 +1,231 @@
+"""
+Browser Engine Module.
+
+Defines the `Browser` interface the cookie manager drives (navigate, cookies, find element)
+and pluggable engines that launch it. Firefox is the default engine; Chromium (including
+chrome-headless-shell) can be selected with BROWSER_ENGINE=chromium, and a recorded session
+replayed with BROWSER_ENGINE=replay (see the replay module).
+"""
+
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, List, Optional, Protocol, Tuple, cast
+
+from selenium import webdriver
+from selenium.common import WebDriverException
+from selenium.webdriver.chrome.options import Options as ChromeOptions
+from selenium.webdriver.chrome.service import Service as ChromeService
+from selenium.webdriver.firefox.options import Options as FirefoxOptions
+from selenium.webdriver.firefox.service import Service as FirefoxService
+from selenium.webdriver.remote.webelement import WebElement
+from webdriver_manager.firefox import GeckoDriverManager
+
+from .config import BROWSER_ENGINE, BROWSER_RECORD_FILE, CHROME_BINARY, CHROMEDRIVER_PATH
+from .logger import get_logger
+from .proxies import ProxyEndpoint
+
+logger = get_logger()
+
+# Element locator as a (By strategy, selector) pair, e.g. ("css selector", "input[name='username']").
+Locator = Tuple[str, str]
+
+
+class Browser(Protocol):
+    """The subset of the Selenium WebDriver API the cookie manager relies on."""
+
+    @property
+    def current_url(self) -> str:
+        """URL of the current page."""
+
+    def get(self, url: str) -> None:
+        """Navigate to a URL."""
+
+    def refresh(self) -> None:
+        """Reload the current page."""
+
+    def get_cookies(self) -> List[Dict[str, Any]]:
+        """Return all cookies visible to the current page."""
+
+    def add_cookie(self, cookie_dict: Dict[str, Any]) -> None:
+        """Add a cookie to the session."""
+
+    def find_element(self, by: str = ..., value: Optional[str] = None) -> WebElement:
+        """Find an element, raising NoSuchElementException if it is missing."""
+
+    def execute_script(self, script: str, *args: Any) -> Any:
+        """Run JavaScript in the page and return its result."""
+
+    def quit(self) -> None:
+        """Shut the browser down."""
+
+
+class BrowserEngine(ABC):
+    """Launches configured `Browser` instances."""
+
+    name: str = "browser"
+
+    @abstractmethod
+    def launch(self, headless: bool = True, lightweight: bool = True, proxy: Optional[ProxyEndpoint] = None) -> Browser:
+        """
+        Start a browser.
+
+        Args:
+            headless: Run without a display.
+            lightweight: Skip images, stylesheets and other non-essential resources.
+            proxy: Proxy all traffic goes through, if any.
+
+        Returns:
+            Browser: The running browser.
+        """
+
+
+def _warn_proxy_credentials(proxy: ProxyEndpoint) -> None:
+    """Browser proxy settings cannot carry credentials; authenticate proxies by source IP instead."""
+    if proxy.has_credentials:
+        logger.warning(f"Proxy credentials for {proxy.display} are ignored by the browser.")
+
+
+class FirefoxEngine(BrowserEngine):
+    """Firefox through geckodriver, resolved with webdriver-manager."""
+
+    name = "firefox"
+
+    def options(
+        self, headless: bool = True, lightweight: bool = True, proxy: Optional[ProxyEndpoint] = None
+    ) -> FirefoxOptions:
+        """Build Firefox options."""
+        options = FirefoxOptions()
+        if headless:
+            options.add_argument("-headless")
+        if lightweight:
+            options.set_preference("permissions.default.image", 2)
+            options.set_preference("dom.ipc.plugins.enabled.libflashplayer.so", "false")
+            options.set_preference("permissions.default.stylesheet", 2)
+            options.set_preference("permissions.default.subdocument", 2)
+            options.set_preference("permissions.default.object", 2)
+        if proxy:
+            _warn_proxy_credentials(proxy)
+            options.set_preference("network.proxy.type", 1)
+            if proxy.scheme.startswith("socks"):
+                options.set_preference("network.proxy.socks", proxy.host)
+                options.set_preference("network.proxy.socks_port", proxy.port)
+                options.set_preference("network.proxy.socks_version", 4 if proxy.scheme == "socks4" else 5)
+                options.set_preference("network.proxy.socks_remote_dns", True)
+            else:
+                for protocol in ("http", "ssl"):
+                    options.set_preference(f"network.proxy.{protocol}", proxy.host)
+                    options.set_preference(f"network.proxy.{protocol}_port", proxy.port)
+        return options
+
+    def launch(self, headless: bool = True, lightweight: bool = True, proxy: Optional[ProxyEndpoint] = None) -> Browser:
+        service = FirefoxService(GeckoDriverManager().install())
+        return webdriver.Firefox(service=service, options=self.options(headless, lightweight, proxy))
+
+
+class ChromiumEngine(BrowserEngine):
+    """
+    Chromium through chromedriver.
+
+    Set CHROME_BINARY to use a smaller build such as chrome-headless-shell, and
+    CHROMEDRIVER_PATH to a matching chromedriver. Without CHROMEDRIVER_PATH, Selenium
+    Manager resolves the driver.
+    """
+
+    name = "chromium"
+
+    def options(
+        self, headless: bool = True, lightweight: bool = True, proxy: Optional[ProxyEndpoint] = None
+    ) -> ChromeOptions:
+        """Build Chromium options."""
+        options = ChromeOptions()
+        if CHROME_BINARY:
+            options.binary_location = CHROME_BINARY
+        if headless:
+            options.add_argument("--headless=new")
+        options.add_argument("--no-sandbox")
+        options.add_argument("--disable-dev-shm-usage")
+        options.add_argument("--disable-gpu")
+        if lightweight:
+            options.add_argument("--blink-settings=imagesEnabled=false")
+            options.add_argument("--disable-extensions")
+            options.add_experimental_option(
+                "prefs",
+                {"profile.managed_default_content_settings.images": 2, "profile.default_content_settings.popups": 2},
+            )
+        if proxy:
+            _warn_proxy_credentials(proxy)
+            options.add_argument(f"--proxy-server={proxy.display}")
+        return options
+
+    def launch(self, headless: bool = True, lightweight: bool = True, proxy: Optional[ProxyEndpoint] = None) -> Browser:
+        service = ChromeService(CHROMEDRIVER_PATH) if CHROMEDRIVER_PATH else ChromeService()
+        return webdriver.Chrome(service=service, options=self.options(headless, lightweight, proxy))
+
+
+def _replay_engine() -> BrowserEngine:
+    from .replay import ReplayEngine  # pylint: disable=import-outside-toplevel,cyclic-import
+
+    return ReplayEngine()
+
+
+ENGINES: Dict[str, Callable[[], BrowserEngine]] = {
+    FirefoxEngine.name: FirefoxEngine,
+    ChromiumEngine.name: ChromiumEngine,
+    "replay": _replay_engine,
+}
+
+
+def register_engine(name: str, factory: Callable[[], BrowserEngine]) -> None:
+    """Make an engine selectable through BROWSER_ENGINE."""
+    ENGINES[name] = factory
+
+
+def get_engine(name: str = BROWSER_ENGINE) -> BrowserEngine:
+    """
+    Create the configured browser engine.
+
+    Args:
+        name: Engine name, defaults to BROWSER_ENGINE.
+
+    Returns:
+        BrowserEngine: The engine.
+
+    Raises:
+        ValueError: If no engine with that name is registered.
+    """
+    try:
+        return ENGINES[name]()
+    except KeyError:
+        raise ValueError(f"Unknown browser engine {name!r}, available: {', '.join(sorted(ENGINES))}") from None
+
+
+def launch_browser(
+    headless: bool = True,
+    lightweight: bool = True,
+    engine: Optional[BrowserEngine] = None,
+    proxy: Optional[ProxyEndpoint] = None,
+    record_file: str = BROWSER_RECORD_FILE,
+) -> Browser:
+    """
+    Launch a browser with the given or configured engine.
+
+    Args:
+        headless: Run without a display.
+        lightweight: Skip images, stylesheets and other non-essential resources.
+        engine: Engine to use, defaults to the configured one.
+        proxy: Proxy all traffic goes through, if any.
+        record_file: Record the session's commands to this trace file, if set.
+
+    Returns:
+        Browser: The running browser.
+    """
+    engine = engine or get_engine()
+    try:
+        driver = engine.launch(headless=headless, lightweight=lightweight, proxy=proxy)
+    except WebDriverException:
+        logger.exception(f"Failed to initialize {engine.name} WebDriver.")
+        raise
+    if record_file:
+        from .replay import RecordingDriver  # pylint: disable=import-outside-toplevel,cyclic-import
+
+        return cast(Browser, RecordingDriver(driver, record_file))
+    return driver
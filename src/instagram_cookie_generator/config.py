@@ -0,0 +1,103 @@
+"""
+Configuration Module.
+
+Reads service settings from environment variables. Kept free of heavy imports so the
+health server can start without loading Selenium.
+"""
+
+import os
+import socket
+from typing import cast
+
+INSTAGRAM_USERNAME = cast(str, os.getenv("INSTAGRAM_USERNAME"))
+INSTAGRAM_PASSWORD = cast(str, os.getenv("INSTAGRAM_PASSWORD"))
+
+COOKIES_FILE = os.getenv("COOKIES_FILE", "instagram_cookies.txt")
+
+# Optional JSON list of accounts replacing the single INSTAGRAM_USERNAME account, saved to ACCOUNT_COOKIES_FILE.
+INSTAGRAM_ACCOUNTS_FILE = os.getenv("INSTAGRAM_ACCOUNTS_FILE", "")
+ACCOUNT_COOKIES_FILE = os.getenv("ACCOUNT_COOKIES_FILE", "instagram_cookies.{account}.txt")
+
+# Cookie store backend: "file" (COOKIES_FILE only), "sqlite" or "memory".
+# Non-file backends still export COOKIES_FILE after every refresh.
+COOKIE_STORE_BACKEND = os.getenv("COOKIE_STORE_BACKEND", "file").lower()
+COOKIE_STORE_PATH = os.getenv("COOKIE_STORE_PATH", "instagram_cookies.db")
+
+# Optional JSONL journal of cookie changes between refreshes, capped in size.
+COOKIE_JOURNAL_FILE = os.getenv("COOKIE_JOURNAL_FILE", "")
+COOKIE_JOURNAL_MAX_BYTES = int(os.getenv("COOKIE_JOURNAL_MAX_BYTES", str(1024 * 1024)))
+
+# Extra cookie views exported next to COOKIES_FILE, e.g. "minimal;bots=sessionid,csrftoken".
+COOKIE_VIEWS = os.getenv("COOKIE_VIEWS", "")
+# Formats each view and the main jar are exported in: "txt" (Netscape), "json" and "header" (Cookie: line).
+# Only "txt" by default: the other formats write further copies of the session cookies and are opt-in.
+COOKIE_EXPORT_FORMATS = os.getenv("COOKIE_EXPORT_FORMATS") or "txt"
+# Bearer token required by /cookies/<view>.<format>; the endpoint is disabled while unset.
+COOKIE_EXPORT_TOKEN = os.getenv("COOKIE_EXPORT_TOKEN", "")
+
+# Browser engine: "firefox" (default), "chromium" or "replay". CHROME_BINARY may point to chrome-headless-shell.
+BROWSER_ENGINE = os.getenv("BROWSER_ENGINE", "firefox").lower()
+CHROME_BINARY = os.getenv("CHROME_BINARY", "")
+CHROMEDRIVER_PATH = os.getenv("CHROMEDRIVER_PATH", "")
+
+# Optional JSON file replacing the built-in login flow steps.
+LOGIN_FLOW_FILE = os.getenv("LOGIN_FLOW_FILE", "")
+
+# Optional JSON file persisting which element locators match, to try the best ones first.
+LOCATOR_STATS_FILE = os.getenv("LOCATOR_STATS_FILE", "")
+# Resolve all candidate locators in one script call instead of one find_element call each.
+LOCATOR_BATCH = os.getenv("LOCATOR_BATCH", "true").lower() in ("1", "true", "yes")
+
+# Trace spans of refresh cycles: kept in memory for /debug/traces and optionally appended to a JSONL file.
+TRACE_FILE = os.getenv("TRACE_FILE", "")
+TRACE_BUFFER_SIZE = int(os.getenv("TRACE_BUFFER_SIZE", "2000"))
+
+# Enable /debug/traces and /debug/profile, which samples all threads on demand.
+DEBUG_ENDPOINTS = os.getenv("DEBUG_ENDPOINTS", "false").lower() in ("1", "true", "yes")
+
+# Leader election between replicas sharing a volume: only the holder of the lease in this SQLite file refreshes.
+LEADER_LEASE_FILE = os.getenv("LEADER_LEASE_FILE", "")
+LEADER_LEASE_SECONDS = float(os.getenv("LEADER_LEASE_SECONDS", "30"))
+NODE_ID = os.getenv("NODE_ID") or f"{socket.gethostname()}-{os.getpid()}"
+
+# Optional membership file ("node_id [base_url]" per line) sharding accounts across generator nodes.
+CLUSTER_MEMBERS_FILE = os.getenv("CLUSTER_MEMBERS_FILE", "")
+
+# Login submissions per hour and back-to-back burst, across all accounts and per account (0 disables a limit).
+LOGIN_RATE_GLOBAL_PER_HOUR = float(os.getenv("LOGIN_RATE_GLOBAL_PER_HOUR", "12"))
+LOGIN_BURST_GLOBAL = int(os.getenv("LOGIN_BURST_GLOBAL", "3"))
+LOGIN_RATE_ACCOUNT_PER_HOUR = float(os.getenv("LOGIN_RATE_ACCOUNT_PER_HOUR", "4"))
+LOGIN_BURST_ACCOUNT = int(os.getenv("LOGIN_BURST_ACCOUNT", "2"))
+# Browsers running and login submissions in flight at the same time.
+MAX_CONCURRENT_BROWSERS = int(os.getenv("MAX_CONCURRENT_BROWSERS", "1"))
+MAX_CONCURRENT_LOGINS = int(os.getenv("MAX_CONCURRENT_LOGINS", "1"))
+
+# Comma-separated egress proxy URLs (http, https, socks4, socks5) assigned to accounts, and their health limits.
+PROXY_POOL = os.getenv("PROXY_POOL", "")
+PROXY_MAX_FAILURE_RATE = float(os.getenv("PROXY_MAX_FAILURE_RATE", "0.5"))
+PROXY_COOLDOWN_SECONDS = float(os.getenv("PROXY_COOLDOWN_SECONDS", "600"))
+
+# /livez fails when the refresh worker made no progress for this long outside planned waits.
+LIVENESS_DEADLINE_SECONDS = float(os.getenv("LIVENESS_DEADLINE_SECONDS", "600"))
+
+# Seconds an in-flight refresh may take to stop on SIGTERM before its browsers are quit.
+SHUTDOWN_TIMEOUT_SECONDS = float(os.getenv("SHUTDOWN_TIMEOUT_SECONDS", "30"))
+
+# Cookie-health history: points kept, seconds between samples outside refreshes (0 disables), optional binary file.
+HISTORY_SIZE = int(os.getenv("HISTORY_SIZE", "4096"))
+HISTORY_SAMPLE_SECONDS = float(os.getenv("HISTORY_SAMPLE_SECONDS", "300"))
+HISTORY_FILE = os.getenv("HISTORY_FILE", "")
+
+# Record every browser command of a refresh to this trace file (JSON lines), for offline replay.
+BROWSER_RECORD_FILE = os.getenv("BROWSER_RECORD_FILE", "")
+# Trace played by BROWSER_ENGINE=replay; recorded latencies are multiplied by REPLAY_TIME_SCALE (0: instant).
+REPLAY_TRACE_FILE = os.getenv("REPLAY_TRACE_FILE", "")
+REPLAY_TIME_SCALE = float(os.getenv("REPLAY_TIME_SCALE") or "1.0")
+
+REFRESH_INTERVAL = int(os.getenv("REFRESH_INTERVAL_SECONDS", "3600"))
+
+SERVER_HOST = os.getenv("SERVER_HOST", "0.0.0.0")
+SERVER_PORT = int(os.getenv("SERVER_PORT", "5000"))
+
+INSTAGRAM_LOGIN_URL = "https://www.instagram.com/accounts/login/"
+INSTAGRAM_HOME_URL = "https://www.instagram.com/"
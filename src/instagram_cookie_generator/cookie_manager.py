@@ -7,208 +7,300 @@ Handles browser automation to log into Instagram, manage cookies, and save them
 import datetime
 import os
 import time
-from typing import Optional, Sequence, Tuple, cast
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
 
-from selenium import webdriver
 from selenium.common import NoSuchElementException, WebDriverException
-from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
-from selenium.webdriver.firefox.options import Options
-from selenium.webdriver.firefox.service import Service
-from selenium.webdriver.remote.webdriver import WebDriver
 from selenium.webdriver.remote.webelement import WebElement
-from webdriver_manager.firefox import GeckoDriverManager
 
+from .accounts import Account
+from .browser import Browser, Locator, launch_browser
+from .config import (
+    BROWSER_ENGINE,
+    COOKIE_STORE_BACKEND,
+    COOKIES_FILE,
+    INSTAGRAM_HOME_URL,
+    INSTAGRAM_LOGIN_URL,
+    INSTAGRAM_PASSWORD,
+    INSTAGRAM_USERNAME,
+    LOCATOR_BATCH,
+)
+from .export import get_exports, prepare_jar
+from .journal import get_journal
+from .lifecycle import get_lifecycle
+from .locators import batch_find, get_locator_stats
 from .logger import get_logger
+from .login_flow import Action, FlowContext, LoginFlow, Step, load_steps
+from .overlays import CONSENT, Overlay, dismiss_overlays
+from .proxies import ProxyEndpoint, get_proxy_pool
+from .ratelimit import get_governor
 from .retry import retry
+from .storage import Cookie, get_store, iter_netscape, read_netscape, write_netscape
+from .tracing import span
 
 logger = get_logger()
 
-# Load environment variables
-INSTAGRAM_USERNAME = cast(str, os.getenv("INSTAGRAM_USERNAME"))
-INSTAGRAM_PASSWORD = cast(str, os.getenv("INSTAGRAM_PASSWORD"))
-
-COOKIES_FILE = os.getenv("COOKIES_FILE", "instagram_cookies.txt")
-
-INSTAGRAM_LOGIN_URL = "https://www.instagram.com/accounts/login/"
-INSTAGRAM_HOME_URL = "https://www.instagram.com/"
-
-Locator = Tuple[str, str]
-
 
 @retry(max_attempts=3, delay_seconds=3)
-def setup_browser(headless: bool = True, lightweight: bool = True) -> WebDriver:
+def setup_browser(headless: bool = True, lightweight: bool = True, proxy: Optional[ProxyEndpoint] = None) -> Browser:
     """
-    Set up a headless Firefox browser instance.
+    Set up a headless browser instance with the configured engine (Firefox by default).
 
     Args:
         headless (bool): Run in headless mode if True.
         lightweight (bool): Disable loading of images, stylesheets, etc.
+        proxy (ProxyEndpoint): Proxy all browser traffic goes through, if any.
 
     Returns:
-        WebDriver: A configured Firefox WebDriver instance.
+        Browser: A configured browser instance.
+    """
+    return launch_browser(headless=headless, lightweight=lightweight, proxy=proxy)
+
+
+def _open_home(driver: Browser, proxy: Optional[ProxyEndpoint]) -> None:
     """
-    options = Options()
-    if headless:
-        options.add_argument("-headless")
-    if lightweight:
-        options.set_preference("permissions.default.image", 2)
-        options.set_preference("dom.ipc.plugins.enabled.libflashplayer.so", "false")
-        options.set_preference("permissions.default.stylesheet", 2)
-        options.set_preference("permissions.default.subdocument", 2)
-        options.set_preference("permissions.default.object", 2)
+    Open the Instagram home page, scoring the proxy by the outcome and latency of the page load.
 
+    Raises:
+        WebDriverException: If the page cannot be loaded, e.g. because the proxy is down.
+    """
+    pool = get_proxy_pool()
+    started = time.monotonic()
     try:
-        service = Service(GeckoDriverManager().install())
-        return cast(WebDriver, webdriver.Firefox(service=service, options=options))
+        driver.get(INSTAGRAM_HOME_URL)
+        # Chromium shows an error page instead of failing the navigation when the proxy is unreachable.
+        if proxy is not None and driver.current_url.startswith(("about:neterror", "chrome-error://")):
+            raise WebDriverException(f"Reached error page: {driver.current_url}")
     except WebDriverException:
-        logger.exception("Failed to initialize Firefox WebDriver.")
+        if pool is not None and proxy is not None:
+            pool.report(proxy, False)
         raise
+    if pool is not None and proxy is not None:
+        pool.report(proxy, True, time.monotonic() - started)
 
 
-def _dismiss_cookie_banner(driver: WebDriver) -> None:
+def _dismiss_cookie_banner(driver: Browser) -> None:
     """Attempt to close Instagram's GDPR/consent banner if present."""
-    candidate_buttons: Tuple[Locator, ...] = (
-        (By.XPATH, "//button[contains(., 'Allow essential')]"),
-        (By.XPATH, "//button[contains(., 'Allow all')]"),
-        (By.XPATH, "//button[contains(., 'Accept')]"),
-        (By.CSS_SELECTOR, "button[title='Only allow essential cookies']"),
-        (By.CSS_SELECTOR, "button[aria-label='Only allow essential cookies']"),
-    )
+    dismiss_overlays(driver, [CONSENT])
+
+
+def _find_once(driver: Browser, locators: Sequence[Locator]) -> Tuple[Optional[int], Optional[WebElement]]:
+    """
+    Look all candidates up once, batched into a single script call when possible.
 
-    for by, value in candidate_buttons:
+    Returns:
+        tuple: (index, element) of the first match, or (None, None).
+    """
+    if LOCATOR_BATCH:
+        try:
+            found = batch_find(driver, locators)
+            return found if found is not None else (None, None)
+        except (ValueError, WebDriverException) as exc:
+            logger.debug(f"Batched lookup unavailable, falling back to find_element: {exc}")
+
+    for index, (by, value) in enumerate(locators):
         try:
-            button = driver.find_element(by, value)
-            button.click()
-            time.sleep(1)
-            return
+            return index, driver.find_element(by, value)
         except NoSuchElementException:
             continue
-        except Exception as exc:  # pylint: disable=broad-exception-caught
-            logger.debug("Unable to click cookie banner button {}: {}", value, exc)
+    return None, None
 
 
-def _find_first_element(driver: WebDriver, locators: Sequence[Locator], wait_seconds: int = 15) -> Optional[WebElement]:
+def _find_first_element(
+    driver: Browser, locators: Sequence[Locator], wait_seconds: int = 15, group: Optional[str] = None
+) -> Optional[WebElement]:
     """
     Try multiple locators until one is found or timeout expires.
 
-    Uses repeated find_element calls to avoid brittle single-selector failures
-    when Instagram tweaks its markup.
+    Avoids brittle single-selector failures when Instagram tweaks its markup. With a
+    `group`, candidates are tried in order of their recent hit rate and the outcome is
+    recorded for the next lookup; the stats file is written once per refresh, not per lookup.
     """
+    stats = get_locator_stats()
+    ordered = stats.order(group, locators) if group else list(locators)
     deadline = time.time() + wait_seconds
-    last_exc: Optional[Exception] = None
 
-    while time.time() < deadline:
-        for by, value in locators:
-            try:
-                return driver.find_element(by, value)
-            except NoSuchElementException as exc:
-                last_exc = exc
-                continue
-        time.sleep(0.5)
-
-    if last_exc:
-        logger.debug("Elements not found for selectors: {}", [value for _, value in locators], exc_info=last_exc)
+    with span("locator.wait", group=group or "", candidates=len(ordered)) as wait_span:
+        polls = 0
+        while True:
+            polls += 1
+            index, element = _find_once(driver, ordered)
+            if element is not None and index is not None:
+                wait_span.set_attribute("polls", polls)
+                wait_span.set_attribute("locator", ordered[index][1])
+                if group:
+                    stats.record(group, ordered[: index + 1], ordered[index])
+                return element
+            if time.time() >= deadline:
+                break
+            time.sleep(0.5)
+        wait_span.set_attribute("polls", polls)
+        wait_span.set_attribute("locator", None)
+
+    logger.debug(f"Elements not found for selectors: {[value for _, value in ordered]}")
+    if group:
+        stats.record(group, ordered, None)
     return None
 
 
-def load_cookies(driver: WebDriver, filename: str) -> None:
+def load_cookies(driver: Browser, filename: str) -> None:
     """
     Load cookies from a file into the browser session.
 
     Args:
-        driver (WebDriver): The Selenium WebDriver instance.
+        driver (Browser): The browser instance.
         filename (str): Path to the cookies file.
     """
     if os.path.exists(filename):
         logger.info(f"Loading existing cookies from {filename}")
         try:
-            with open(filename, "r", encoding="utf-8") as f:
-                lines = f.readlines()
-            for line in lines:
-                if not line.startswith("#") and line.strip():
-                    domain, _, path, secure, expiry, name, value = line.strip().split("\t")
-                    cookie = {
-                        "domain": domain,
-                        "path": path,
-                        "secure": secure == "TRUE",
-                        "expiry": int(expiry),
-                        "name": name,
-                        "value": value,
-                    }
-                    try:
-                        driver.add_cookie(cookie)
-                    except (ValueError, TypeError) as e:
-                        logger.warning(f"Invalid cookie format for {name}: {e}")
-                    except Exception as e:  # pylint: disable=broad-exception-caught
-                        # For unexpected exceptions, log full stack trace
-                        logger.exception(f"{type(e)}: Unexpected error while adding cookie: {name}: {e}")
+            add_cookies(driver, iter_netscape(filename))
         except OSError as e:
             logger.exception(f"{type(e)}: Failed to read cookies file {filename}: {e}")
 
 
-def save_cookies(driver: WebDriver, filename: str) -> None:
+def add_cookies(driver: Browser, cookies: Iterable[Cookie]) -> None:
+    """
+    Add cookies to the browser session, skipping the ones the browser rejects.
+
+    Args:
+        driver (Browser): The browser instance.
+        cookies (Iterable[Cookie]): Cookies to add.
+    """
+    for cookie in cookies:
+        try:
+            driver.add_cookie(cookie.to_webdriver())
+        except (ValueError, TypeError) as e:
+            logger.warning(f"Invalid cookie format for {cookie.name}: {e}")
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            # For unexpected exceptions, log full stack trace
+            logger.exception(f"{type(e)}: Unexpected error while adding cookie: {cookie.name}: {e}")
+
+
+def _log_cookie_expiry(cookie: Cookie, now: datetime.datetime) -> None:
+    """Log a human-readable expiration of a saved cookie."""
+    readable_expiry = datetime.datetime.fromtimestamp(cookie.expiry)
+    delta = readable_expiry - now
+    days = delta.days
+    hours, remainder = divmod(delta.seconds, 3600)
+    minutes, _ = divmod(remainder, 60)
+
+    remaining = f"{days}d {hours}h {minutes}m" if days > 0 else (f"{hours}h {minutes}m" if hours > 0 else f"{minutes}m")
+    warning = (
+        " \u2757 Expiring soon!"
+        if delta.total_seconds() <= 24 * 3600
+        else (" \u26a0\ufe0f Less than 7 days" if delta.total_seconds() <= 7 * 24 * 3600 else "")
+    )
+
+    rexp: str = readable_expiry.strftime("%Y-%m-%d %H:%M:%S")
+    logger.info(f"Cookie {cookie.name} expires at {rexp} (Time left: {remaining}){warning}")
+
+
+def save_cookies(driver: Browser, filename: str) -> Optional[List[Cookie]]:
     """
     Save cookies from the browser session into a file.
 
+    Duplicates and expired cookies are dropped before writing.
+
     Args:
-        driver (WebDriver): The Selenium WebDriver instance.
+        driver (Browser): The browser instance.
         filename (str): Path to the cookies file.
+
+    Returns:
+        list: Saved cookies, or None if writing the file failed.
     """
     logger.info(f"Saving cookies to file {filename}")
 
+    raw_cookies = driver.get_cookies()
+    cookies = prepare_jar(Cookie.from_webdriver(c) for c in raw_cookies)
+    if len(cookies) != len(raw_cookies):
+        logger.info(f"Dropped {len(raw_cookies) - len(cookies)} duplicate or expired cookies.")
     try:
-        cookies = driver.get_cookies()
-        now = datetime.datetime.now()
-
-        with open(filename, "w", encoding="utf-8") as f:
-            f.write("# Netscape HTTP Cookie File\n")
-            f.write("# This file was generated by a script.\n")
-            f.write("# http://curl.haxx.se/docs/http-cookies.html\n\n")
-
-            for c in cookies:
-                domain = c["domain"]
-                flag = "TRUE" if domain.startswith(".") else "FALSE"
-                path = c["path"]
-                secure = "TRUE" if c.get("secure", False) else "FALSE"
-                expiry = c.get("expiry", int(time.time()) + 3600)
-                name = c["name"]
-                value = c["value"]
-
-                # Save cookie line
-                f.write(f"{domain}\t{flag}\t{path}\t{secure}\t{expiry}\t{name}\t{value}\n")
-
-                # Display human-readable expiration
-                readable_expiry = datetime.datetime.fromtimestamp(expiry)
-                delta = readable_expiry - now
-                days = delta.days
-                hours, remainder = divmod(delta.seconds, 3600)
-                minutes, _ = divmod(remainder, 60)
-
-                remaining = (
-                    f"{days}d {hours}h {minutes}m"
-                    if days > 0
-                    else (f"{hours}h {minutes}m" if hours > 0 else f"{minutes}m")
-                )
-                warning = (
-                    " \u2757 Expiring soon!"
-                    if delta.total_seconds() <= 24 * 3600
-                    else (" \u26a0\ufe0f Less than 7 days" if delta.total_seconds() <= 7 * 24 * 3600 else "")
-                )
-
-                rexp: str = readable_expiry.strftime("%Y-%m-%d %H:%M:%S")
-                logger.info(f"Cookie {name} expires at {rexp} (Time left: {remaining}){warning}")
+        write_netscape(filename, cookies)
     except OSError as e:
         logger.exception(f"{type(e)}: Failed to save cookies to file")
+        return None
+
+    now = datetime.datetime.now()
+    for cookie in cookies:
+        _log_cookie_expiry(cookie, now)
+    return cookies
+
+
+def _default_account() -> Account:
+    """The single account configured by INSTAGRAM_USERNAME and INSTAGRAM_PASSWORD."""
+    return Account(INSTAGRAM_USERNAME, INSTAGRAM_PASSWORD, COOKIES_FILE)
+
+
+def stored_cookies(account: Account) -> List[Cookie]:
+    """
+    Return the account's jar from the cookie store.
+
+    Args:
+        account (Account): Account to look up.
+
+    Returns:
+        list: Stored cookies; empty with the file backend, for unknown accounts or if the store fails.
+    """
+    if COOKIE_STORE_BACKEND == "file":
+        return []
+    try:
+        return get_store().load(account.username)
+    except Exception as e:  # pylint: disable=broad-exception-caught
+        logger.exception(f"{type(e)}: Failed to load cookies from {COOKIE_STORE_BACKEND} store: {e}")
+        return []
+
+
+def persist_cookies(driver: Browser, account: Optional[Account] = None) -> None:
+    """
+    Save the session cookies to the account's cookies file and, for non-file backends, to the cookie store.
+
+    The change against the previously saved jar is recorded in the cookie journal. With a
+    non-file backend, the previous jar is read from the store and only the changed cookies
+    are written back to it. If the cookies file cannot be written, nothing is journaled,
+    exported or stored, so all of them keep matching the jar on disk.
+
+    Args:
+        driver (Browser): The browser instance.
+        account (Account): Account the session belongs to, defaults to the INSTAGRAM_USERNAME account.
+    """
+    account = account or _default_account()
+    previous = stored_cookies(account)
+    in_store = bool(previous)
+    if not in_store:
+        try:
+            previous = read_netscape(account.cookies_file)
+        except OSError as e:
+            logger.warning(f"Cannot read previous cookies from {account.cookies_file}: {e}")
+
+    cookies = save_cookies(driver, account.cookies_file)
+    if cookies is None:
+        return
+    diff = get_journal().record(previous, cookies, account.username)
+    try:
+        get_exports().publish(cookies, account.cookies_file)
+    except Exception as e:  # pylint: disable=broad-exception-caught
+        # The jar is saved; failing here would only repeat the whole login through the retry.
+        logger.exception(f"{type(e)}: Failed to publish cookie exports: {e}")
+    if COOKIE_STORE_BACKEND != "file":
+        try:
+            store = get_store()
+            if not in_store:
+                store.save(account.username, cookies)
+            elif not diff.is_empty():
+                store.upsert(account.username, diff.added + [new for _, new in diff.changed])
+                store.delete(account.username, [cookie.key for cookie in diff.removed])
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            logger.exception(f"{type(e)}: Failed to save cookies to {COOKIE_STORE_BACKEND} store: {e}")
 
 
 @retry(max_attempts=2, delay_seconds=2)
-def already_logged_in(driver: WebDriver) -> bool:
+def already_logged_in(driver: Browser) -> bool:
     """
     Check if already logged into Instagram based on current page.
 
     Args:
-        driver (WebDriver): The Selenium WebDriver instance.
+        driver (Browser): The browser instance.
 
     Returns:
         bool: True if already logged in, False otherwise.
@@ -222,101 +314,166 @@ def already_logged_in(driver: WebDriver) -> bool:
         return False
 
 
+def _action_navigate(driver: Browser, step: Step, _context: FlowContext) -> bool:
+    """Open the step URL."""
+    driver.get(step.url or INSTAGRAM_LOGIN_URL)
+    return True
+
+
+def _action_dismiss_consent(driver: Browser, _step: Step, _context: FlowContext) -> bool:
+    """Close the consent banner if one is shown."""
+    _dismiss_cookie_banner(driver)
+    return True
+
+
+def _action_fill(driver: Browser, step: Step, context: FlowContext) -> bool:
+    """Type the step value into the first matching input."""
+    element = _find_first_element(driver, step.locators, wait_seconds=int(step.timeout_seconds), group=step.name)
+    if element is None:
+        logger.error(f"Login page structure changed, {step.name} field not found after waiting.")
+        return False
+    element.send_keys(context.render(step.value))
+    context.elements[step.name] = element
+    return True
+
+
+def _action_submit(driver: Browser, step: Step, context: FlowContext) -> bool:
+    """Submit the form by pressing Enter in the target input, within the login rate limits and concurrency cap."""
+    element = context.elements.get(step.target or "")
+    if element is None:
+        element = _find_first_element(driver, step.locators, wait_seconds=int(step.timeout_seconds))
+    if element is None:
+        return False
+    with get_governor().login(context.variables.get("username") or ""):
+        element.send_keys(Keys.RETURN)
+    return True
+
+
+def _action_dismiss_overlays(driver: Browser, step: Step, _context: FlowContext) -> bool:
+    """Dismiss the step's overlay, or all known overlays when the step has no locators."""
+    overlays = [Overlay(step.name, step.locators)] if step.locators else None
+    return bool(dismiss_overlays(driver, overlays, timeout=step.timeout_seconds))
+
+
+def _action_click(driver: Browser, step: Step, _context: FlowContext) -> bool:
+    """Click the first present element, e.g. an interstitial's dismiss button."""
+    for by, value in step.locators:
+        try:
+            driver.find_element(by, value).click()
+            return True
+        except NoSuchElementException:
+            continue
+    return False
+
+
+def _action_check_logged_in(driver: Browser, _step: Step, _context: FlowContext) -> bool:
+    """Verify the session is authenticated."""
+    return already_logged_in(driver)
+
+
+LOGIN_ACTIONS: Dict[str, Action] = {
+    "navigate": _action_navigate,
+    "dismiss_consent": _action_dismiss_consent,
+    "fill": _action_fill,
+    "submit": _action_submit,
+    "dismiss_overlays": _action_dismiss_overlays,
+    "click": _action_click,
+    "check_logged_in": _action_check_logged_in,
+}
+
+
 @retry(max_attempts=3, delay_seconds=5)
-def login_instagram(driver: WebDriver) -> bool:
+def _run_login_flow(driver: Browser, flow: LoginFlow, account: Account) -> bool:
+    """Run the login flow; a retry resumes from the flow's last checkpoint."""
+    return flow.run(driver, {"username": account.username, "password": account.password})
+
+
+def login_instagram(driver: Browser, account: Optional[Account] = None) -> bool:
     """
     Perform Instagram login using provided credentials.
 
+    The steps are defined by the login flow (see `login_flow`); failed attempts are
+    retried from the last completed checkpoint.
+
     Args:
-        driver (WebDriver): The Selenium WebDriver instance.
+        driver (Browser): The browser instance.
+        account (Account): Account to log in, defaults to the INSTAGRAM_USERNAME account.
 
     Returns:
         bool: True if login succeeded, False otherwise.
     """
-    driver.get(INSTAGRAM_LOGIN_URL)
-    time.sleep(5)
-    _dismiss_cookie_banner(driver)
-
+    flow = LoginFlow(load_steps(), LOGIN_ACTIONS)
     try:
-        username_input = _find_first_element(
-            driver,
-            [
-                (By.CSS_SELECTOR, "input[name='username']"),
-                (By.NAME, "username"),
-                (By.CSS_SELECTOR, "input[aria-label='Phone number, username, or email']"),
-                (By.XPATH, "//input[contains(@aria-label, 'username') or contains(@name, 'username')]"),
-            ],
-        )
-        password_input = _find_first_element(
-            driver,
-            [
-                (By.CSS_SELECTOR, "input[name='password']"),
-                (By.NAME, "password"),
-                (By.CSS_SELECTOR, "input[aria-label='Password']"),
-                (By.CSS_SELECTOR, "input[type='password']"),
-            ],
-        )
-
-        if not username_input or not password_input:
-            logger.error("Login page structure changed, username/password fields not found after waiting.")
-            return False
-
-        username_input.send_keys(INSTAGRAM_USERNAME)
-        password_input.send_keys(INSTAGRAM_PASSWORD)
-        password_input.send_keys(Keys.RETURN)
-
-        time.sleep(8)
-
-        try:
-            driver.find_element(By.XPATH, "//button[contains(text(), 'Not Now')]").click()
-            time.sleep(2)
-        except NoSuchElementException:
-            pass
-
-        return already_logged_in(driver)
-    except NoSuchElementException:
-        logger.error("Login page structure has changed, username/password fields not found.")
-        return False
+        return _run_login_flow(driver, flow, account or _default_account())
     except Exception as e:  # pylint: disable=broad-exception-caught
         logger.exception(f"{type(e)}: Unexpected error during login flow.")
         return False
+    finally:
+        logger.info(f"Login flow timings: {flow.timings_summary()}")
 
 
-def cookie_manager() -> None:
+def cookie_manager(account: Optional[Account] = None) -> None:
     """
     Main function to refresh Instagram cookies.
 
     Handles loading existing cookies, login if needed, and saving new cookies.
+
+    Args:
+        account (Account): Account to refresh, defaults to the INSTAGRAM_USERNAME account.
     """
-    if not INSTAGRAM_USERNAME or not INSTAGRAM_PASSWORD:
+    account = account or _default_account()
+    if not account.username or not account.password:
         raise ValueError("INSTAGRAM_USERNAME and INSTAGRAM_PASSWORD must be set in environment variables")
 
-    logger.info("Starting headless Firefox...")
+    logger.info(f"Starting headless {BROWSER_ENGINE} for {account.username}...")
 
     @retry()
     def do_work() -> None:
-        driver = setup_browser()
-        try:
-            driver.get(INSTAGRAM_HOME_URL)
-            time.sleep(3)
-
-            if os.path.exists(COOKIES_FILE):
-                load_cookies(driver, COOKIES_FILE)
-                driver.refresh()
-                time.sleep(5)
-
-                if already_logged_in(driver):
-                    logger.info("Logged in using existing cookies.")
-                    save_cookies(driver, COOKIES_FILE)
-                    return
-
-                logger.info("Existing cookies invalid, logging in manually...")
-
-            if login_instagram(driver):
-                save_cookies(driver, COOKIES_FILE)
-
-        finally:
-            driver.quit()
+        lifecycle = get_lifecycle()
+        lifecycle.checkpoint("browser launch")
+        governor = get_governor()
+        with governor.login_reservation(account.username), governor.browser_slot():
+            pool = get_proxy_pool()
+            proxy = pool.assign(account.username) if pool is not None else None
+            with span("browser.launch", engine=BROWSER_ENGINE, proxy=proxy.display if proxy else None):
+                driver = setup_browser(proxy=proxy)
+            try:
+                with lifecycle.browser(driver):
+                    with span("navigate", url=INSTAGRAM_HOME_URL):
+                        _open_home(driver, proxy)
+                        time.sleep(3)
+
+                    stored = stored_cookies(account)
+                    if stored or os.path.exists(account.cookies_file):
+                        with span("cookies.load", file=account.cookies_file, store=bool(stored)):
+                            if stored:
+                                logger.info(f"Loading existing cookies of {account.username} from the cookie store")
+                                add_cookies(driver, stored)
+                            else:
+                                load_cookies(driver, account.cookies_file)
+                            driver.refresh()
+                            time.sleep(5)
+
+                        if already_logged_in(driver):
+                            logger.info("Logged in using existing cookies.")
+                            with span("cookies.save", source="existing"):
+                                persist_cookies(driver, account)
+                            return
+
+                        logger.info("Existing cookies invalid, logging in manually...")
+
+                    lifecycle.checkpoint("login")
+                    with span("login") as login_span:
+                        logged_in = login_instagram(driver, account)
+                        login_span.set_attribute("ok", logged_in)
+                    if logged_in:
+                        with span("cookies.save", source="login"):
+                            persist_cookies(driver, account)
+
+            finally:
+                with span("browser.quit"):
+                    driver.quit()
+                get_locator_stats().save()
 
     logger.info("Starting cookie manager with retry mechanism...")
     do_work()
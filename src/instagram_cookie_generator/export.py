@@ -0,0 +1,407 @@
+"""
+Cookie Export Module.
+
+Prepares jars for consumers: deduplicates cookies, drops expired ones and renders named
+views (subsets of cookie names) in several formats: Netscape (`txt`, for yt-dlp), JSON
+(`json`, keyword arguments of `requests.cookies.create_cookie`) and a `Cookie:` header line
+(`header`, for curl). Every format of every view is rendered once per jar change, written
+atomically next to COOKIES_FILE and kept in memory for `/cookies/<view>.<format>`.
+
+Views are configured with COOKIE_VIEWS, e.g. `minimal=sessionid,csrftoken,ds_user_id;full=*`,
+and formats with COOKIE_EXPORT_FORMATS, e.g. `txt,json,header`.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass, replace
+from typing import Callable, Dict, FrozenSet, Iterable, List, Optional, Sequence, Tuple
+
+from .config import COOKIE_EXPORT_FORMATS, COOKIE_VIEWS, COOKIES_FILE
+from .logger import get_logger
+from .storage import NETSCAPE_HEADER, Cookie, read_netscape, write_atomic
+
+logger = get_logger()
+
+# Cookies needed to make authenticated requests as the logged-in user.
+MINIMAL_SESSION_COOKIES = frozenset({"sessionid", "ds_user_id", "csrftoken"})
+
+
+@dataclass(frozen=True)
+class CookieView:
+    """A named subset of the jar. `names` of None means every cookie."""
+
+    name: str
+    names: Optional[FrozenSet[str]] = None
+
+    def select(self, cookies: Iterable[Cookie]) -> List[Cookie]:
+        """Return the cookies belonging to this view, in jar order."""
+        if self.names is None:
+            return list(cookies)
+        return [c for c in cookies if c.name in self.names]
+
+
+BUILTIN_VIEWS: Dict[str, CookieView] = {
+    "full": CookieView("full"),
+    "minimal": CookieView("minimal", MINIMAL_SESSION_COOKIES),
+}
+
+
+def parse_views(spec: str) -> List[CookieView]:
+    """
+    Parse a view specification.
+
+    Entries are separated by `;`. Each is either a built-in view name (`full`, `minimal`)
+    or `name=cookie1,cookie2`, where `*` selects all cookies.
+
+    Args:
+        spec: View specification, e.g. `minimal;bots=sessionid,csrftoken`.
+
+    Returns:
+        list: Parsed views.
+
+    Raises:
+        ValueError: If an entry references an unknown built-in view or has no name.
+    """
+    views = []
+    for entry in filter(None, (part.strip() for part in spec.split(";"))):
+        name, sep, names = (part.strip() for part in entry.partition("="))
+        if not name:
+            raise ValueError(f"Cookie view without a name: {entry!r}")
+        if not sep:
+            if name not in BUILTIN_VIEWS:
+                raise ValueError(f"Unknown cookie view: {name!r}")
+            views.append(BUILTIN_VIEWS[name])
+        elif names == "*":
+            views.append(CookieView(name))
+        else:
+            views.append(CookieView(name, frozenset(filter(None, (n.strip() for n in names.split(","))))))
+    return views
+
+
+def render_netscape(cookies: Sequence[Cookie]) -> bytes:
+    """Render cookies as a Netscape cookie file."""
+    return (NETSCAPE_HEADER + "".join(cookie.to_netscape_line() + "\n" for cookie in cookies)).encode()
+
+
+def render_json(cookies: Sequence[Cookie]) -> bytes:
+    """Render cookies as a JSON list of `requests.cookies.create_cookie` keyword arguments."""
+    return json.dumps(
+        [
+            {
+                "name": cookie.name,
+                "value": cookie.value,
+                "domain": cookie.domain,
+                "path": cookie.path,
+                "secure": cookie.secure,
+                "expires": cookie.expiry,
+            }
+            for cookie in cookies
+        ],
+        separators=(",", ":"),
+    ).encode()
+
+
+def render_header(cookies: Sequence[Cookie]) -> bytes:
+    """Render cookies as a `Cookie:` request header line."""
+    return ("Cookie: " + "; ".join(f"{cookie.name}={cookie.value}" for cookie in cookies) + "\n").encode()
+
+
+@dataclass(frozen=True)
+class ExportFormat:
+    """A rendering of a jar, named by its file extension."""
+
+    extension: str
+    mimetype: str
+    render: Callable[[Sequence[Cookie]], bytes]
+
+
+FORMATS: Dict[str, ExportFormat] = {
+    export_format.extension: export_format
+    for export_format in (
+        ExportFormat("txt", "text/plain", render_netscape),
+        ExportFormat("json", "application/json", render_json),
+        ExportFormat("header", "text/plain", render_header),
+    )
+}
+
+# View of the main jar, exported next to COOKIES_FILE without a view suffix.
+MAIN_VIEW = BUILTIN_VIEWS["full"]
+
+
+def parse_formats(spec: str) -> List[ExportFormat]:
+    """
+    Parse a comma separated list of export formats.
+
+    Args:
+        spec: Format extensions, e.g. `txt,json,header`.
+
+    Returns:
+        list: Parsed formats.
+
+    Raises:
+        ValueError: If a format is unknown.
+    """
+    formats = []
+    for extension in filter(None, (part.strip().lower() for part in spec.split(","))):
+        if extension not in FORMATS:
+            raise ValueError(f"Unknown cookie export format: {extension!r}, expected one of {sorted(FORMATS)}")
+        formats.append(FORMATS[extension])
+    return formats
+
+
+def dedupe_cookies(cookies: Iterable[Cookie]) -> List[Cookie]:
+    """
+    Drop duplicate cookies with the same (domain, path, name), keeping the one that expires last.
+
+    Domains are compared exactly: a host-only `www.instagram.com` cookie and a domain-wide
+    `.instagram.com` one are different cookies, sent to different hosts, and both are kept.
+    The result keeps the position of the first occurrence of each cookie.
+
+    Args:
+        cookies: Cookies as returned by the browser.
+
+    Returns:
+        list: Unique cookies.
+    """
+    chosen: Dict[Tuple[str, str, str], Cookie] = {}
+    for cookie in cookies:
+        key = (cookie.domain, cookie.path, cookie.name)
+        current = chosen.get(key)
+        if current is None or cookie.expiry > current.expiry:
+            chosen[key] = cookie
+    return list(chosen.values())
+
+
+def drop_expired(cookies: Iterable[Cookie], now: Optional[int] = None) -> List[Cookie]:
+    """
+    Remove cookies that already expired.
+
+    Args:
+        cookies: Cookies to filter.
+        now: Reference Unix timestamp. Defaults to the current time.
+
+    Returns:
+        list: Cookies expiring after `now`.
+    """
+    now = int(time.time()) if now is None else now
+    return [c for c in cookies if c.expiry > now]
+
+
+def prepare_jar(cookies: Iterable[Cookie], now: Optional[int] = None) -> List[Cookie]:
+    """Deduplicate and drop expired cookies."""
+    return drop_expired(dedupe_cookies(cookies), now)
+
+
+def view_path(view: CookieView, base_file: str = COOKIES_FILE) -> str:
+    """
+    Return the file a view is exported to, e.g. `instagram_cookies.minimal.txt`.
+
+    Args:
+        view: The cookie view.
+        base_file: Main cookies file the view file is placed next to.
+
+    Returns:
+        str: Path of the view file.
+    """
+    root, ext = os.path.splitext(base_file)
+    return f"{root}.{view.name}{ext or '.txt'}"
+
+
+def export_path(view: Optional[CookieView], export_format: ExportFormat, base_file: str = COOKIES_FILE) -> str:
+    """
+    Return the file a view is exported to in a format, e.g. `instagram_cookies.minimal.json`.
+
+    Args:
+        view: The cookie view, or None for the main jar (`instagram_cookies.json`).
+        export_format: The export format.
+        base_file: Main cookies file the export is placed next to.
+
+    Returns:
+        str: Path of the export file.
+    """
+    if export_format.extension == "txt":
+        return base_file if view is None else view_path(view, base_file)
+    root = os.path.splitext(base_file)[0]
+    return f"{root}.{export_format.extension}" if view is None else f"{root}.{view.name}.{export_format.extension}"
+
+
+def render_exports(
+    cookies: Iterable[Cookie], views: Sequence[CookieView], formats: Sequence[ExportFormat]
+) -> Dict[Tuple[str, str], bytes]:
+    """
+    Render the main jar and each view in each format.
+
+    Args:
+        cookies: Prepared cookies.
+        views: Views besides the main jar.
+        formats: Formats to render.
+
+    Returns:
+        dict: (view name, format extension) to rendered body; the main jar is the `full` view.
+    """
+    jar = list(cookies)
+    bodies = {}
+    for view in (MAIN_VIEW, *views):
+        selected = view.select(jar)
+        for export_format in formats:
+            bodies[(view.name, export_format.extension)] = export_format.render(selected)
+    return bodies
+
+
+def _write_exports(
+    bodies: Dict[Tuple[str, str], bytes], views: Sequence[CookieView], formats: Sequence[ExportFormat], base_file: str
+) -> Dict[str, str]:
+    """Write rendered exports next to `base_file`, except the main Netscape jar written by `save_cookies`."""
+    written = {}
+    for view in (None, *views):
+        name = MAIN_VIEW.name if view is None else view.name
+        for export_format in formats:
+            path = export_path(view, export_format, base_file)
+            if path == base_file:
+                continue
+            try:
+                write_atomic(path, bodies[(name, export_format.extension)])
+            except OSError as e:
+                logger.exception(f"{type(e)}: Failed to export cookie view {name} to {path}: {e}")
+                continue
+            if view is not None and export_format.extension == "txt":
+                written[name] = path
+    logger.info(
+        f"Exported cookies for views {[MAIN_VIEW.name] + [v.name for v in views]} as {[f.extension for f in formats]}"
+    )
+    return written
+
+
+def export_views(
+    cookies: Iterable[Cookie],
+    views: Optional[List[CookieView]] = None,
+    base_file: str = COOKIES_FILE,
+    formats: Optional[List[ExportFormat]] = None,
+) -> Dict[str, str]:
+    """
+    Write each view of a prepared jar to its own file per format.
+
+    Args:
+        cookies: Prepared (deduplicated, unexpired) cookies.
+        views: Views to export. Defaults to COOKIE_VIEWS.
+        base_file: Main cookies file the view files are placed next to.
+        formats: Formats to export. Defaults to COOKIE_EXPORT_FORMATS.
+
+    Returns:
+        dict: View name to written Netscape file path. Views that failed to write are left out.
+    """
+    views = parse_views(COOKIE_VIEWS) if views is None else views
+    formats = parse_formats(COOKIE_EXPORT_FORMATS) if formats is None else formats
+    return _write_exports(render_exports(cookies, views, formats), views, formats, base_file)
+
+
+def _signature(path: str) -> Optional[Tuple[int, int]]:
+    """Modification time and size of a file, None if it does not exist."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+@dataclass(frozen=True)
+class RenderedExports:
+    """All exports of one jar, and the state of the cookies file they were rendered for."""
+
+    digest: str
+    signature: Optional[Tuple[int, int]]
+    bodies: Dict[Tuple[str, str], bytes]
+
+    def body(self, view: str, extension: str) -> Optional[bytes]:
+        """Return a rendered export, None if that view or format is not configured."""
+        return self.bodies.get((view, extension))
+
+
+class ExportCache:
+    """Rendered exports per cookies file, published on refresh and served from memory."""
+
+    def __init__(self, views: Optional[List[CookieView]] = None, formats: Optional[List[ExportFormat]] = None) -> None:
+        """
+        Args:
+            views: Views besides the main jar. Defaults to COOKIE_VIEWS.
+            formats: Formats to render. Defaults to COOKIE_EXPORT_FORMATS.
+        """
+        self.views = parse_views(COOKIE_VIEWS) if views is None else views
+        self.formats = parse_formats(COOKIE_EXPORT_FORMATS) if formats is None else formats
+        self._entries: Dict[str, RenderedExports] = {}
+        self._lock = threading.Lock()
+
+    def publish(self, cookies: Iterable[Cookie], base_file: str = COOKIES_FILE) -> RenderedExports:
+        """
+        Render and write the exports of a freshly saved jar.
+
+        Nothing is rendered or written if the jar did not change since the last publish.
+
+        Args:
+            cookies: Prepared cookies, as saved to `base_file`.
+            base_file: Main cookies file the exports are placed next to.
+
+        Returns:
+            RenderedExports: The current exports.
+        """
+        jar = list(cookies)
+        digest = hashlib.sha1(render_netscape(jar), usedforsecurity=False).hexdigest()
+        with self._lock:
+            current = self._entries.get(base_file)
+        if current is not None and current.digest == digest:
+            logger.info("Cookie jar unchanged, keeping the current exports.")
+            rendered = replace(current, signature=_signature(base_file))
+        else:
+            bodies = render_exports(jar, self.views, self.formats)
+            _write_exports(bodies, self.views, self.formats, base_file)
+            rendered = RenderedExports(digest, _signature(base_file), bodies)
+        with self._lock:
+            self._entries[base_file] = rendered
+        return rendered
+
+    def get(self, base_file: str = COOKIES_FILE) -> Optional[RenderedExports]:
+        """
+        Return the exports of a cookies file, rendering them from disk if it changed since.
+
+        Covers serve-only replicas and restarts, where no refresh published the jar.
+
+        Args:
+            base_file: Main cookies file.
+
+        Returns:
+            RenderedExports | None: None if the cookies file does not exist or cannot be read.
+        """
+        signature = _signature(base_file)
+        if signature is None:
+            return None
+        with self._lock:
+            current = self._entries.get(base_file)
+        if current is not None and current.signature == signature:
+            return current
+        try:
+            jar = read_netscape(base_file)
+        except OSError as e:
+            logger.warning(f"Cannot read cookies from {base_file}: {e}")
+            return None
+        digest = hashlib.sha1(render_netscape(jar), usedforsecurity=False).hexdigest()
+        rendered = RenderedExports(digest, signature, render_exports(jar, self.views, self.formats))
+        with self._lock:
+            self._entries[base_file] = rendered
+        return rendered
+
+
+_EXPORTS: Optional[ExportCache] = None
+_EXPORTS_LOCK = threading.Lock()
+
+
+def get_exports() -> ExportCache:
+    """Return the process-wide export cache."""
+    global _EXPORTS  # pylint: disable=global-statement
+
+    with _EXPORTS_LOCK:
+        if _EXPORTS is None:
+            _EXPORTS = ExportCache()
+        return _EXPORTS
@@ -0,0 +1,128 @@
+"""
+Heartbeat Module.
+
+Tracks liveness of the refresh worker separately from cookie readiness. The worker
+attaches itself and every trace span it opens or closes counts as progress, as do its
+explicit beats. Planned waits (the refresh interval, rate limit delays, waiting for
+leadership) are declared as idle periods. `/livez` fails when the worker made no progress
+for LIVENESS_DEADLINE_SECONDS outside such a period, e.g. inside a hung `driver.get`, or
+when the worker thread died.
+"""
+
+import math
+import threading
+import time
+from datetime import UTC, datetime
+from typing import Any, Dict, Optional
+
+from .config import LIVENESS_DEADLINE_SECONDS
+
+
+class Heartbeat:
+    """Progress state of the refresh worker, shared with the health endpoints."""
+
+    def __init__(self, deadline: float = LIVENESS_DEADLINE_SECONDS) -> None:
+        """
+        Args:
+            deadline: Seconds without progress after which the worker counts as stuck.
+        """
+        self.deadline = deadline
+        self.stage = "starting"
+        self.cycle = 0
+        self.cycles_completed = 0
+        self.last_cycle_finished: Optional[float] = None
+        self._thread: Optional[threading.Thread] = None
+        self._last_beat = time.monotonic()
+        self._idle_until = 0.0
+        self._lock = threading.Lock()
+
+    def attach(self) -> None:
+        """Register the calling thread as the worker whose progress is tracked."""
+        with self._lock:
+            self._thread = threading.current_thread()
+            self._last_beat = time.monotonic()
+            self._idle_until = 0.0
+
+    def beat(self, stage: str) -> None:
+        """Record progress, ending any idle period."""
+        with self._lock:
+            self.stage = stage
+            self._last_beat = time.monotonic()
+            self._idle_until = 0.0
+
+    def progress(self, stage: str) -> None:
+        """Record progress if called from the attached worker thread; used by tracing spans."""
+        if self._thread is not None and threading.current_thread() is self._thread:
+            self.beat(stage)
+
+    def idle(self, seconds: Optional[float], stage: str = "sleeping") -> None:
+        """
+        Declare a planned wait, during which no progress is expected.
+
+        Args:
+            seconds: Length of the wait, or None for an open-ended wait such as following a leader.
+            stage: Name of the wait.
+        """
+        with self._lock:
+            self.stage = stage
+            self._last_beat = time.monotonic()
+            self._idle_until = math.inf if seconds is None else self._last_beat + seconds
+
+    def cycle_started(self, cycle: int) -> None:
+        """Record the start of a refresh cycle."""
+        self.cycle = cycle
+        self.beat("refresh_cycle")
+
+    def cycle_finished(self) -> None:
+        """Record the end of a refresh cycle."""
+        with self._lock:
+            self.cycles_completed += 1
+            self.last_cycle_finished = time.time()
+        self.beat("refresh_cycle_done")
+
+    def status(self) -> Dict[str, Any]:
+        """
+        Liveness of the worker.
+
+        Returns:
+            dict: `alive` and the current stage, seconds since the last progress and cycle counters.
+        """
+        now = time.monotonic()
+        with self._lock:
+            thread = self._thread
+            silent = now - self._last_beat
+            overdue = now - max(self._last_beat, self._idle_until if self._idle_until < math.inf else now)
+            alive = thread is None or (thread.is_alive() and overdue <= self.deadline)
+            if thread is None:
+                worker = "none"
+            else:
+                worker = "running" if thread.is_alive() else "stopped"
+            return {
+                "alive": alive,
+                "worker": worker,
+                "stage": self.stage,
+                "idle": self._idle_until > now,
+                "seconds_since_progress": round(silent, 1),
+                "deadline": self.deadline,
+                "cycle": self.cycle,
+                "cycles_completed": self.cycles_completed,
+                "last_cycle_finished": (
+                    datetime.fromtimestamp(self.last_cycle_finished, UTC).isoformat()
+                    if self.last_cycle_finished is not None
+                    else None
+                ),
+            }
+
+
+_HEARTBEAT: Optional[Heartbeat] = None
+_HEARTBEAT_LOCK = threading.Lock()
+
+
+def get_heartbeat() -> Heartbeat:
+    """Return the process-wide heartbeat."""
+    global _HEARTBEAT  # pylint: disable=global-statement
+
+    with _HEARTBEAT_LOCK:
+        if _HEARTBEAT is None:
+            _HEARTBEAT = Heartbeat()
+        return _HEARTBEAT
@@ -0,0 +1,307 @@
+"""
+History Module.
+
+Rolling cookie-health history: a fixed-size ring buffer of samples holding the cookie count
+and earliest expiry of this node's jars (COOKIES_FILE, or the jars of the node's accounts
+with INSTAGRAM_ACCOUNTS_FILE), plus the duration and outcome of refresh cycles. A sample is
+recorded after every refresh cycle and every HISTORY_SAMPLE_SECONDS in between.
+
+The buffer is array-backed (one `array.array` column per field), so HISTORY_SIZE points cost
+29 bytes each and no per-point objects. With HISTORY_FILE set, it is saved to a compact binary
+file after every sample and restored on startup. `/status/history` serves it downsampled.
+"""
+
+import array
+import math
+import struct
+import threading
+import time
+from datetime import UTC, datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from .config import HISTORY_FILE, HISTORY_SAMPLE_SECONDS, HISTORY_SIZE
+from .logger import get_logger
+from .sharding import shard_accounts
+from .storage import scan_netscape, write_atomic
+
+logger = get_logger()
+
+# Outcome of a sample: periodic sample without a refresh, successful or failed refresh cycle.
+OUTCOME_SAMPLE = 0
+OUTCOME_OK = 1
+OUTCOME_FAILED = 2
+
+# File layout: header (magic, version, point count), then points oldest first.
+FILE_MAGIC = b"ICGH"
+FILE_VERSION = 1
+_HEADER = struct.Struct("<4sBI")
+# time, cookie count, earliest expiry (0 if none), refresh duration (NaN for samples), outcome.
+_POINT = struct.Struct("<dIqdB")
+
+Point = Tuple[float, int, int, float, int]
+
+
+def jar_stats(cookies_file: str) -> Tuple[int, int]:
+    """
+    Count the cookies of a Netscape file and find the earliest expiry.
+
+    Args:
+        cookies_file: Path to the cookies file.
+
+    Returns:
+        tuple: Cookie count and earliest expiry as a Unix timestamp (0 if there are no cookies).
+    """
+    count = 0
+    earliest = 0
+    try:
+        for fields in scan_netscape(cookies_file, ("expiry",)):
+            if fields is None:
+                continue
+            count += 1
+            expiry = int(fields[0])
+            earliest = expiry if not earliest else min(earliest, expiry)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Cannot read cookie stats from {cookies_file}: {e}")
+    return count, earliest
+
+
+def shard_stats() -> Tuple[int, int]:
+    """
+    Count the cookies of this node's jars and find the earliest expiry among them.
+
+    Returns:
+        tuple: Total cookie count and earliest expiry as a Unix timestamp (0 if there are no cookies).
+    """
+    try:
+        cookies_files = [account.cookies_file for account in shard_accounts()]
+    except (OSError, ValueError) as e:
+        logger.warning(f"{type(e)}: Cannot load accounts for cookie stats: {e}")
+        return 0, 0
+    count = 0
+    earliest = 0
+    for cookies_file in cookies_files:
+        jar_count, jar_earliest = jar_stats(cookies_file)
+        count += jar_count
+        if jar_earliest:
+            earliest = jar_earliest if not earliest else min(earliest, jar_earliest)
+    return count, earliest
+
+
+class History:
+    """Fixed-size ring buffer of cookie-health points."""
+
+    def __init__(self, capacity: int = HISTORY_SIZE, path: str = HISTORY_FILE) -> None:
+        """
+        Args:
+            capacity: Maximum number of points kept; the oldest are overwritten.
+            path: Binary file the history is persisted to, empty to keep it in memory only.
+        """
+        self.capacity = max(1, capacity)
+        self.path = path
+        self._times = array.array("d", bytes(8 * self.capacity))
+        self._counts = array.array("I", bytes(4 * self.capacity))
+        self._expiries = array.array("q", bytes(8 * self.capacity))
+        self._durations = array.array("d", bytes(8 * self.capacity))
+        self._outcomes = array.array("B", bytes(self.capacity))
+        self._next = 0
+        self._size = 0
+        self._lock = threading.Lock()
+        if path:
+            self._load()
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _append(self, point: Point) -> None:
+        """Store a point, overwriting the oldest when full. Caller holds the lock."""
+        i = self._next
+        self._times[i], self._counts[i], self._expiries[i], self._durations[i], self._outcomes[i] = point
+        self._next = (i + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+
+    def _points(self) -> List[Point]:
+        """All points, oldest first. Caller holds the lock."""
+        start = (self._next - self._size) % self.capacity
+        indexes = [(start + offset) % self.capacity for offset in range(self._size)]
+        return [
+            (self._times[i], self._counts[i], self._expiries[i], self._durations[i], self._outcomes[i]) for i in indexes
+        ]
+
+    def record(
+        self,
+        cookie_count: int,
+        earliest_expiry: int,
+        duration: Optional[float] = None,
+        ok: Optional[bool] = None,
+        at: Optional[float] = None,
+    ) -> None:
+        """
+        Record a point.
+
+        Args:
+            cookie_count: Number of cookies in the jar.
+            earliest_expiry: Earliest cookie expiry as a Unix timestamp, 0 if none.
+            duration: Refresh cycle duration in seconds, None for a periodic sample.
+            ok: Refresh cycle outcome, None for a periodic sample.
+            at: Unix timestamp of the point. Defaults to now.
+        """
+        if ok is None:
+            outcome = OUTCOME_SAMPLE
+        else:
+            outcome = OUTCOME_OK if ok else OUTCOME_FAILED
+        point = (
+            time.time() if at is None else at,
+            cookie_count,
+            earliest_expiry,
+            math.nan if duration is None else duration,
+            outcome,
+        )
+        # Saved under the lock, so concurrent recorders (sampler and refresh worker) cannot
+        # replace a newer file with an older dump.
+        with self._lock:
+            self._append(point)
+            if self.path:
+                try:
+                    write_atomic(self.path, self._dump())
+                except OSError as e:
+                    logger.warning(f"Cannot save cookie history to {self.path}: {e}")
+
+    def sample(self, cookies_file: Optional[str] = None) -> None:
+        """Record the current state of a cookies file, by default this node's jars, as a periodic sample."""
+        self.record(*(jar_stats(cookies_file) if cookies_file else shard_stats()))
+
+    def record_cycle(self, duration: float, ok: bool, cookies_file: Optional[str] = None) -> None:
+        """Record a finished refresh cycle with the resulting state of a cookies file, by default this node's jars."""
+        self.record(*(jar_stats(cookies_file) if cookies_file else shard_stats()), duration=duration, ok=ok)
+
+    def _dump(self) -> bytes:
+        """Serialize all points. Caller holds the lock."""
+        points = self._points()
+        return _HEADER.pack(FILE_MAGIC, FILE_VERSION, len(points)) + b"".join(_POINT.pack(*p) for p in points)
+
+    def _load(self) -> None:
+        """Restore points saved by a previous run, keeping the newest if capacity shrank."""
+        try:
+            with open(self.path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return
+        except OSError as e:
+            logger.warning(f"Cannot read cookie history from {self.path}: {e}")
+            return
+        try:
+            magic, version, count = _HEADER.unpack_from(data)
+            if magic != FILE_MAGIC or version != FILE_VERSION:
+                raise ValueError(f"unsupported format {magic!r} v{version}")
+            points = [_POINT.unpack_from(data, _HEADER.size + i * _POINT.size) for i in range(count)]
+        except (struct.error, ValueError) as e:
+            logger.warning(f"Ignoring corrupt cookie history {self.path}: {e}")
+            return
+        with self._lock:
+            for point in points[-self.capacity :]:
+                self._append(point)
+        logger.info(f"Restored {len(points)} cookie history points from {self.path}")
+
+    def query(self, since: Optional[float] = None, max_points: int = 200) -> Dict[str, Any]:
+        """
+        Return the history, downsampled into at most `max_points` equal time buckets.
+
+        Each bucket reports the last cookie count, the earliest expiry, the mean and maximum
+        refresh duration and the number of refreshes and failures.
+
+        Args:
+            since: Only points recorded at or after this Unix timestamp.
+            max_points: Maximum number of buckets.
+
+        Returns:
+            dict: Capacity, size, bucket width in seconds and the buckets, oldest first.
+        """
+        with self._lock:
+            points = [p for p in self._points() if since is None or p[0] >= since]
+        max_points = max(1, max_points)
+        if not points:
+            return {"capacity": self.capacity, "size": self._size, "step": 0, "points": []}
+
+        start, end = points[0][0], points[-1][0]
+        step = (end - start) / max_points if len(points) > max_points else 0.0
+        buckets: List[Dict[str, Any]] = []
+        durations: List[float] = []
+        for at, count, expiry, duration, outcome in points:
+            index = min(int((at - start) / step), max_points - 1) if step else len(buckets)
+            if not buckets or index != buckets[-1]["index"]:
+                durations = []
+                buckets.append(
+                    {
+                        "index": index,
+                        "time": at,
+                        "earliest_expiry": 0,
+                        "refreshes": 0,
+                        "failures": 0,
+                        "refresh_seconds": None,
+                        "refresh_seconds_max": None,
+                    }
+                )
+            bucket = buckets[-1]
+            bucket["cookie_count"] = count
+            if expiry and (not bucket["earliest_expiry"] or expiry < bucket["earliest_expiry"]):
+                bucket["earliest_expiry"] = expiry
+            if outcome != OUTCOME_SAMPLE:
+                bucket["refreshes"] += 1
+                bucket["failures"] += outcome == OUTCOME_FAILED
+                durations.append(duration)
+                bucket["refresh_seconds"] = round(sum(durations) / len(durations), 3)
+                bucket["refresh_seconds_max"] = round(max(durations), 3)
+
+        for bucket in buckets:
+            del bucket["index"]
+            bucket["time"] = datetime.fromtimestamp(bucket["time"], UTC).isoformat()
+            expiry = bucket.pop("earliest_expiry")
+            bucket["earliest_expiry"] = datetime.fromtimestamp(expiry, UTC).isoformat() if expiry else None
+        return {"capacity": self.capacity, "size": self._size, "step": round(step, 3), "points": buckets}
+
+
+class HistorySampler:
+    """Records a periodic sample of this node's jars in a background thread."""
+
+    def __init__(self, history: History, interval: float = HISTORY_SAMPLE_SECONDS) -> None:
+        """
+        Args:
+            history: History to record into.
+            interval: Seconds between samples.
+        """
+        self.history = history
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.history.sample()
+
+    def start(self) -> None:
+        """Start sampling, unless the interval is 0."""
+        if self.interval <= 0:
+            return
+        self._thread = threading.Thread(target=self._run, name="history_sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop sampling."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+
+_HISTORY: Optional[History] = None
+_HISTORY_LOCK = threading.Lock()
+
+
+def get_history() -> History:
+    """Return the process-wide history, restored from HISTORY_FILE on first use."""
+    global _HISTORY  # pylint: disable=global-statement
+
+    with _HISTORY_LOCK:
+        if _HISTORY is None:
+            _HISTORY = History()
+        return _HISTORY
@@ -0,0 +1,257 @@
+"""
+Cookie Journal Module.
+
+Computes incremental diffs between consecutive cookie jars, appends them to a compact,
+size-capped JSONL journal and publishes them to in-process subscribers.
+"""
+
+import json
+import os
+import threading
+import time
+from collections import Counter, deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional, Tuple
+
+from .config import COOKIE_JOURNAL_FILE, COOKIE_JOURNAL_MAX_BYTES
+from .logger import get_logger
+from .storage import Cookie, CookieKey
+
+logger = get_logger()
+
+# Entries kept in memory for `recent()` when no journal file is configured.
+MEMORY_ENTRIES = 256
+
+
+@dataclass(frozen=True)
+class CookieDiff:
+    """Changes between two cookie jars, matched by (domain, path, name)."""
+
+    added: List[Cookie] = field(default_factory=list)
+    removed: List[Cookie] = field(default_factory=list)
+    changed: List[Tuple[Cookie, Cookie]] = field(default_factory=list)
+
+    def is_empty(self) -> bool:
+        """True if both jars were identical."""
+        return not (self.added or self.removed or self.changed)
+
+    def summary(self) -> str:
+        """One-line human-readable summary, e.g. `+1 -0 ~2 (rur, sessionid)`."""
+        names = sorted({c.name for c in self.added + self.removed} | {new.name for _, new in self.changed})
+        return f"+{len(self.added)} -{len(self.removed)} ~{len(self.changed)} ({', '.join(names)})"
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Serialize the diff, including cookie values so consumers can apply it as a delta.
+
+        Returns:
+            dict: Compact representation with `added`, `removed` and `changed` lists.
+        """
+
+        def entry(cookie: Cookie) -> Dict[str, Any]:
+            return {
+                "domain": cookie.domain,
+                "path": cookie.path,
+                "name": cookie.name,
+                "expiry": cookie.expiry,
+                "secure": cookie.secure,
+                "value": cookie.value,
+            }
+
+        changed = []
+        for old, new in self.changed:
+            item = entry(new)
+            item["fields"] = changed_fields(old, new)
+            changed.append(item)
+        return {
+            "added": [entry(c) for c in self.added],
+            "removed": [entry(c) for c in self.removed],
+            "changed": changed,
+        }
+
+
+def changed_fields(old: Cookie, new: Cookie) -> List[str]:
+    """Return the names of cookie fields that differ between two versions of a cookie."""
+    return [name for name in ("value", "expiry", "secure") if getattr(old, name) != getattr(new, name)]
+
+
+def diff_cookies(old: Iterable[Cookie], new: Iterable[Cookie]) -> CookieDiff:
+    """
+    Compute the incremental diff from one jar to another.
+
+    Args:
+        old: Previously saved cookies.
+        new: Freshly saved cookies.
+
+    Returns:
+        CookieDiff: Added, removed, and changed (value, expiry or secure flag) cookies.
+    """
+    old_by_key: Dict[CookieKey, Cookie] = {c.key: c for c in old}
+    new_by_key: Dict[CookieKey, Cookie] = {c.key: c for c in new}
+    return CookieDiff(
+        added=[c for key, c in new_by_key.items() if key not in old_by_key],
+        removed=[c for key, c in old_by_key.items() if key not in new_by_key],
+        changed=[(old_by_key[key], c) for key, c in new_by_key.items() if key in old_by_key and old_by_key[key] != c],
+    )
+
+
+Subscriber = Callable[[CookieDiff], None]
+
+
+class CookieJournal:
+    """
+    Append-only journal of cookie diffs.
+
+    Entries are JSON lines `{"ts": ..., "account": ..., "added": [...], "removed": [...], "changed": [...]}`.
+    When the file grows beyond `max_bytes`, the oldest half of it is dropped. Without a
+    path, the latest entries are kept in memory only.
+    """
+
+    def __init__(self, path: Optional[str] = None, max_bytes: int = COOKIE_JOURNAL_MAX_BYTES) -> None:
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._memory: Deque[Dict[str, Any]] = deque(maxlen=MEMORY_ENTRIES)
+        self._subscribers: List[Subscriber] = []
+
+    def subscribe(self, callback: Subscriber) -> None:
+        """Call `callback` with every non-empty diff recorded from now on."""
+        with self._lock:
+            self._subscribers.append(callback)
+
+    def unsubscribe(self, callback: Subscriber) -> None:
+        """Stop publishing diffs to `callback`."""
+        with self._lock:
+            if callback in self._subscribers:
+                self._subscribers.remove(callback)
+
+    def record(self, old: Iterable[Cookie], new: Iterable[Cookie], account: str) -> CookieDiff:
+        """
+        Diff two jars, journal the result and publish it to subscribers.
+
+        Args:
+            old: Previously saved cookies.
+            new: Freshly saved cookies.
+            account: Account the jar belongs to.
+
+        Returns:
+            CookieDiff: The computed diff, also when it is empty.
+        """
+        diff = diff_cookies(old, new)
+        if diff.is_empty():
+            logger.info(f"Cookie jar of {account} unchanged since last save.")
+            return diff
+
+        logger.info(f"Cookie jar of {account} changed: {diff.summary()}")
+        entry = {"ts": int(time.time()), "account": account, **diff.to_dict()}
+        with self._lock:
+            self._memory.append(entry)
+            if self.path:
+                self._append(entry)
+            subscribers = list(self._subscribers)
+
+        for callback in subscribers:
+            try:
+                callback(diff)
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                logger.exception(f"{type(e)}: Cookie diff subscriber failed: {e}")
+        return diff
+
+    def _append(self, entry: Dict[str, Any]) -> None:
+        """Append an entry to the journal file and enforce the size cap. Caller holds the lock."""
+        assert self.path is not None
+        line = json.dumps(entry, separators=(",", ":")) + "\n"
+        try:
+            with open(self.path, "a+b") as f:
+                if f.tell() > 0:
+                    f.seek(-1, os.SEEK_END)
+                    if f.read(1) != b"\n":
+                        # The last append was cut short, e.g. by a crash: start a new line.
+                        line = "\n" + line
+                f.write(line.encode())
+            if os.path.getsize(self.path) > self.max_bytes:
+                self._truncate()
+        except OSError as e:
+            logger.exception(f"{type(e)}: Failed to write cookie journal {self.path}: {e}")
+
+    def _truncate(self) -> None:
+        """Keep the newest entries that fit into half of `max_bytes`."""
+        assert self.path is not None
+        with open(self.path, "r", encoding="utf-8") as f:
+            lines = f.readlines()
+        kept: Deque[str] = deque()
+        size = 0
+        for line in reversed(lines):
+            size += len(line.encode())
+            if size > self.max_bytes // 2 and kept:
+                break
+            kept.appendleft(line)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.writelines(kept)
+        os.replace(tmp_path, self.path)
+
+    def recent(self, limit: int = 50) -> List[Dict[str, Any]]:
+        """
+        Return the latest journal entries, oldest first.
+
+        Args:
+            limit: Maximum number of entries.
+
+        Returns:
+            list: Journal entries as written; corrupt lines are skipped.
+        """
+        with self._lock:
+            if not self.path:
+                return list(self._memory)[-limit:]
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    lines = deque(f, maxlen=limit)
+            except FileNotFoundError:
+                return []
+        entries = []
+        for line in lines:
+            if not line.strip():
+                continue
+            try:
+                entries.append(json.loads(line))
+            except json.JSONDecodeError:
+                # A crash during an append can leave a truncated last line behind.
+                logger.warning(f"Skipping corrupt cookie journal line in {self.path}: {line[:80]!r}")
+        return entries
+
+    def rotation_counts(self, limit: int = MEMORY_ENTRIES) -> Dict[str, Dict[str, int]]:
+        """
+        Count how often each cookie's value changed across the latest journal entries, per account.
+
+        Returns:
+            dict: Account to cookie name to number of value rotations.
+        """
+        counts: Dict[str, Counter[str]] = {}
+        for entry in self.recent(limit):
+            for change in entry.get("changed", []):
+                if "value" in change.get("fields", []):
+                    counts.setdefault(entry.get("account", ""), Counter())[change["name"]] += 1
+        return {account: dict(names) for account, names in counts.items()}
+
+
+def redact_entry(entry: Dict[str, Any]) -> Dict[str, Any]:
+    """Strip cookie values from a journal entry before exposing it."""
+    redacted = dict(entry)
+    for kind in ("added", "removed", "changed"):
+        redacted[kind] = [{k: v for k, v in c.items() if k not in ("value", "secure")} for c in entry.get(kind, [])]
+    return redacted
+
+
+_JOURNAL: Optional[CookieJournal] = None
+_JOURNAL_LOCK = threading.Lock()
+
+
+def get_journal() -> CookieJournal:
+    """Return the process-wide cookie journal."""
+    global _JOURNAL  # pylint: disable=global-statement
+
+    with _JOURNAL_LOCK:
+        if _JOURNAL is None:
+            _JOURNAL = CookieJournal(COOKIE_JOURNAL_FILE or None)
+        return _JOURNAL
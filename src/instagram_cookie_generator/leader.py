@@ -0,0 +1,249 @@
+"""
+Leader Election Module.
+
+Coordinates replicas sharing a volume so only one of them runs the browser refresh. The
+leader holds a time-limited lease row in a SQLite database on the shared volume and
+renews it in the background; followers keep serving the shared cookies file and take
+over once the lease expires, i.e. within `LEADER_LEASE_SECONDS` plus one renew interval
+after the leader stops.
+
+The lease relies on roughly synchronized wall clocks between replicas.
+"""
+
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from .config import LEADER_LEASE_FILE, LEADER_LEASE_SECONDS, NODE_ID
+from .logger import get_logger
+
+logger = get_logger()
+
+LEASE_NAME = "refresh"
+
+
+class LeaderLease:
+    """A named, expiring lease stored in SQLite."""
+
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS leases (
+            name TEXT PRIMARY KEY,
+            holder TEXT NOT NULL,
+            expires_at REAL NOT NULL,
+            term INTEGER NOT NULL
+        )
+    """
+
+    def __init__(self, path: str, node_id: str = NODE_ID, ttl: float = LEADER_LEASE_SECONDS) -> None:
+        """
+        Args:
+            path: SQLite database on the volume shared by all replicas.
+            node_id: Unique identity of this replica.
+            ttl: Seconds a lease stays valid without renewal.
+        """
+        self.path = path
+        self.node_id = node_id
+        self.ttl = ttl
+        self.term = 0
+        self._valid_until = 0.0
+        self._lock = threading.Lock()
+        # No WAL: it requires shared memory, which network file systems do not provide.
+        self._conn = sqlite3.connect(path, timeout=max(1.0, ttl / 3), check_same_thread=False, isolation_level=None)
+        self._conn.execute(self._SCHEMA)
+
+    @property
+    def is_leader(self) -> bool:
+        """True while this node holds an unexpired lease, judged by the local monotonic clock."""
+        return time.monotonic() < self._valid_until
+
+    def try_acquire(self) -> bool:
+        """
+        Acquire the lease if it is free or expired, or renew it if this node holds it.
+
+        Returns:
+            bool: True if this node is the leader afterwards.
+        """
+        started = time.monotonic()
+        now = time.time()
+        with self._lock:
+            try:
+                self._conn.execute("BEGIN IMMEDIATE")
+                row = self._conn.execute(
+                    "SELECT holder, expires_at, term FROM leases WHERE name = ?", (LEASE_NAME,)
+                ).fetchone()
+                if row is not None and row[0] != self.node_id and row[1] > now:
+                    self._conn.execute("COMMIT")
+                    if self.is_leader:
+                        logger.warning(f"Node {self.node_id} lost refresh leadership to {row[0]}.")
+                    self._valid_until = 0.0
+                    return False
+
+                term = row[2] if row is not None and row[0] == self.node_id else (row[2] if row else 0) + 1
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO leases (name, holder, expires_at, term) VALUES (?, ?, ?, ?)",
+                    (LEASE_NAME, self.node_id, now + self.ttl, term),
+                )
+                self._conn.execute("COMMIT")
+            except sqlite3.Error as e:
+                if self._conn.in_transaction:
+                    self._conn.execute("ROLLBACK")
+                # Keep the local view: a lease we hold stays valid in the database until it expires.
+                logger.warning(f"Cannot update leader lease in {self.path}: {e}")
+                return self.is_leader
+
+            if term != self.term:
+                logger.info(f"Node {self.node_id} became refresh leader (term {term}).")
+            self.term = term
+            self._valid_until = started + self.ttl
+            return True
+
+    def release(self) -> None:
+        """Give up the lease so another node can take over immediately."""
+        with self._lock:
+            self._valid_until = 0.0
+            try:
+                self._conn.execute("DELETE FROM leases WHERE name = ? AND holder = ?", (LEASE_NAME, self.node_id))
+            except sqlite3.Error as e:
+                logger.warning(f"Cannot release leader lease in {self.path}: {e}")
+
+    def status(self) -> Dict[str, Any]:
+        """
+        Describe the current lease.
+
+        Returns:
+            dict: This node's id, whether it leads, and the lease holder, term and remaining seconds.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT holder, expires_at, term FROM leases WHERE name = ?", (LEASE_NAME,)
+            ).fetchone()
+        holder, expires_at, term = row if row is not None else (None, 0.0, 0)
+        return {
+            "node_id": self.node_id,
+            "is_leader": self.is_leader,
+            "holder": holder if expires_at > time.time() else None,
+            "term": term,
+            "expires_in": max(0.0, round(expires_at - time.time(), 1)),
+        }
+
+    def close(self) -> None:
+        """Close the database connection."""
+        self._conn.close()
+
+
+class LeaderElector:
+    """Keeps trying to acquire, then renew, a lease in a background thread."""
+
+    def __init__(self, lease: LeaderLease, renew_interval: Optional[float] = None) -> None:
+        """
+        Args:
+            lease: The lease to compete for.
+            renew_interval: Seconds between attempts, defaults to a third of the lease TTL.
+        """
+        self.lease = lease
+        self.renew_interval = renew_interval if renew_interval is not None else lease.ttl / 3
+        self._changed = threading.Condition()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def is_leader(self) -> bool:
+        """True while this node holds the lease."""
+        return self.lease.is_leader
+
+    def _attempt(self) -> None:
+        self.lease.try_acquire()
+        with self._changed:
+            self._changed.notify_all()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.renew_interval):
+            self._attempt()
+
+    def start(self) -> None:
+        """Make a first attempt and keep competing in the background."""
+        self._attempt()
+        self._thread = threading.Thread(target=self._run, name="leader_elector", daemon=True)
+        self._thread.start()
+
+    def wait_until_leader(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block until this node leads.
+
+        Args:
+            timeout: Maximum seconds to wait, forever if None.
+
+        Returns:
+            bool: True if this node is the leader.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._changed:
+            while not self.is_leader and not self._stop.is_set():
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    break
+                self._changed.wait(remaining)
+        return self.is_leader
+
+    def stop(self) -> None:
+        """Stop competing and release the lease."""
+        self._stop.set()
+        with self._changed:
+            self._changed.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.lease.release()
+
+
+_ELECTOR: Optional[LeaderElector] = None
+_ELECTOR_LOCK = threading.Lock()
+
+
+def get_elector() -> Optional[LeaderElector]:
+    """
+    Return the process-wide elector, started on first use.
+
+    Returns:
+        LeaderElector | None: None if leader election is disabled (LEADER_LEASE_FILE unset).
+    """
+    global _ELECTOR  # pylint: disable=global-statement
+
+    if not LEADER_LEASE_FILE:
+        return None
+    with _ELECTOR_LOCK:
+        if _ELECTOR is None:
+            _ELECTOR = LeaderElector(LeaderLease(LEADER_LEASE_FILE))
+            _ELECTOR.start()
+        return _ELECTOR
+
+
+def stop_elector() -> None:
+    """Stop the process-wide elector, if started, releasing the lease for a fast takeover."""
+    global _ELECTOR  # pylint: disable=global-statement
+
+    with _ELECTOR_LOCK:
+        elector, _ELECTOR = _ELECTOR, None
+    if elector is not None:
+        elector.stop()
+        elector.lease.close()
+
+
+def leader_status() -> Dict[str, Any]:
+    """
+    Describe leader election for `/status/leader` without joining the election.
+
+    Returns:
+        dict: Lease status, or `{"enabled": False}` if leader election is disabled.
+    """
+    if not LEADER_LEASE_FILE:
+        return {"enabled": False}
+    elector = _ELECTOR
+    if elector is not None:
+        return {"enabled": True, **elector.lease.status()}
+    lease = LeaderLease(LEADER_LEASE_FILE)
+    try:
+        return {"enabled": True, **lease.status()}
+    finally:
+        lease.close()
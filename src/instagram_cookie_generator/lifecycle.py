@@ -0,0 +1,187 @@
+"""
+Lifecycle Module.
+
+Graceful shutdown and signal-driven control of the refresh worker:
+
+- SIGTERM (and SIGINT) stop the HTTP server and cancel the refresh worker at its next safe
+  point: between accounts, before a browser launch or a login, or during a wait. Running
+  browsers are quit by the worker itself; if it does not stop within SHUTDOWN_TIMEOUT_SECONDS,
+  e.g. inside a hung `driver.get`, they are quit from the main thread to unblock it.
+- SIGHUP wakes the refresh worker for an immediate refresh.
+- SIGUSR1 logs a dump of internal state.
+
+Cookie files are always replaced atomically, so a canceled refresh never leaves a partially
+written jar behind.
+"""
+
+import signal
+import threading
+from contextlib import contextmanager
+from types import FrameType
+from typing import Any, Callable, Iterator, List, Optional
+
+from .logger import get_logger
+
+logger = get_logger()
+
+
+class ShutdownRequested(BaseException):
+    """
+    Raised at a safe point of the refresh worker once a shutdown was requested.
+
+    Like KeyboardInterrupt, it derives from BaseException so that the broad `except Exception`
+    handlers of the retry decorator and the login flow let it through.
+    """
+
+
+class Lifecycle:
+    """Shutdown and wake-up state shared by the main thread, the refresh worker and signal handlers."""
+
+    def __init__(self) -> None:
+        self.stop_reason: Optional[str] = None
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._browsers: List[Any] = []
+        self._lock = threading.Lock()
+
+    @property
+    def stopping(self) -> bool:
+        """True once a shutdown was requested."""
+        return self._stop.is_set()
+
+    def request_stop(self, reason: str) -> None:
+        """
+        Request a graceful shutdown.
+
+        Args:
+            reason: Why the service stops, e.g. the signal name.
+        """
+        with self._lock:
+            if self._stop.is_set():
+                return
+            self.stop_reason = reason
+        logger.info(f"Shutdown requested ({reason}).")
+        self._stop.set()
+        self._wake.set()
+
+    def request_refresh(self) -> None:
+        """Wake the refresh worker for an immediate refresh; requested during a refresh, it queues another one."""
+        self._wake.set()
+
+    def wait_for_stop(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block until a shutdown is requested.
+
+        Args:
+            timeout: Maximum seconds to wait, forever if None.
+
+        Returns:
+            bool: True if a shutdown was requested.
+        """
+        return self._stop.wait(timeout)
+
+    def sleep(self, seconds: float) -> bool:
+        """
+        Sleep between refreshes, waking early on shutdown or a refresh request.
+
+        Args:
+            seconds: Seconds to sleep.
+
+        Returns:
+            bool: True if woken early.
+        """
+        woken = self._wake.wait(seconds)
+        if not self._stop.is_set():
+            self._wake.clear()
+        return woken
+
+    def checkpoint(self, where: str) -> None:
+        """
+        Mark a safe point where an in-flight refresh may be canceled.
+
+        Args:
+            where: Description of the safe point, for logs.
+
+        Raises:
+            ShutdownRequested: If a shutdown was requested.
+        """
+        if self._stop.is_set():
+            raise ShutdownRequested(where)
+
+    @contextmanager
+    def browser(self, driver: Any) -> Iterator[Any]:
+        """
+        Register a running browser, so that a stuck shutdown can quit it.
+
+        Args:
+            driver: WebDriver instance.
+
+        Yields:
+            The driver.
+        """
+        with self._lock:
+            self._browsers.append(driver)
+        try:
+            yield driver
+        finally:
+            with self._lock:
+                if driver in self._browsers:
+                    self._browsers.remove(driver)
+
+    def quit_browsers(self) -> int:
+        """
+        Quit all registered browsers, unblocking calls into them from other threads.
+
+        Returns:
+            int: Number of browsers quit.
+        """
+        with self._lock:
+            browsers = list(self._browsers)
+            self._browsers.clear()
+        for driver in browsers:
+            try:
+                driver.quit()
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                logger.warning(f"{type(e)}: Cannot quit browser: {e}")
+        return len(browsers)
+
+
+def install_signal_handlers(lifecycle: Lifecycle, dump_state: Callable[[], None]) -> None:
+    """
+    Route process signals to the lifecycle. Must be called from the main thread.
+
+    Args:
+        lifecycle: Lifecycle to control.
+        dump_state: Logs internal state; run in its own thread on SIGUSR1.
+    """
+
+    def _stop(signum: int, _frame: Optional[FrameType]) -> None:
+        lifecycle.request_stop(signal.Signals(signum).name)
+
+    def _refresh(_signum: int, _frame: Optional[FrameType]) -> None:
+        logger.info("SIGHUP: immediate refresh requested.")
+        lifecycle.request_refresh()
+
+    def _dump(_signum: int, _frame: Optional[FrameType]) -> None:
+        threading.Thread(target=dump_state, name="state_dump", daemon=True).start()
+
+    signal.signal(signal.SIGTERM, _stop)
+    signal.signal(signal.SIGINT, _stop)
+    if hasattr(signal, "SIGHUP"):
+        signal.signal(signal.SIGHUP, _refresh)
+    if hasattr(signal, "SIGUSR1"):
+        signal.signal(signal.SIGUSR1, _dump)
+
+
+_LIFECYCLE: Optional[Lifecycle] = None
+_LIFECYCLE_LOCK = threading.Lock()
+
+
+def get_lifecycle() -> Lifecycle:
+    """Return the process-wide lifecycle."""
+    global _LIFECYCLE  # pylint: disable=global-statement
+
+    with _LIFECYCLE_LOCK:
+        if _LIFECYCLE is None:
+            _LIFECYCLE = Lifecycle()
+        return _LIFECYCLE
@@ -0,0 +1,194 @@
+"""
+Locator Learning Module.
+
+Tracks which element locators actually match on Instagram's pages and reorders candidate
+lists by recent hit rate, so the selector that currently works is tried first. Stats are
+kept per locator group (e.g. "username") as an exponentially weighted hit rate and can be
+persisted to LOCATOR_STATS_FILE across restarts.
+
+Also provides a batched lookup that resolves a whole candidate list in a single
+`execute_script` round trip instead of one `find_element` call per locator.
+"""
+
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from .browser import Browser, Locator
+from .config import LOCATOR_STATS_FILE
+from .logger import get_logger
+
+logger = get_logger()
+
+# Weight of the latest observation in the hit rate.
+HIT_RATE_ALPHA = 0.3
+# Hit rate assumed for locators without observations, so they rank between good and bad ones.
+UNSEEN_HIT_RATE = 0.5
+
+# Locator strategies the batched lookup can resolve in the page.
+BATCH_STRATEGIES = frozenset({"css selector", "xpath", "name", "id", "tag name", "class name"})
+
+# Resolves locators in the page. Kept as a JavaScript function body so other scripts can reuse it.
+FIND_ELEMENT_JS = """
+function findElement(by, value) {
+  try {
+    switch (by) {
+      case "css selector": return document.querySelector(value);
+      case "xpath": return document.evaluate(
+        value, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+      case "name": return document.getElementsByName(value)[0] || null;
+      case "id": return document.getElementById(value);
+      case "tag name": return document.getElementsByTagName(value)[0] || null;
+      case "class name": return document.getElementsByClassName(value)[0] || null;
+    }
+  } catch (e) {}
+  return null;
+}
+"""
+
+FIRST_MATCH_JS = FIND_ELEMENT_JS + """
+const locators = arguments[0];
+for (let i = 0; i < locators.length; i++) {
+  const el = findElement(locators[i][0], locators[i][1]);
+  if (el) return [i, el];
+}
+return null;
+"""
+
+
+def locator_key(locator: Locator) -> str:
+    """Stable string key of a locator, used in the stats file."""
+    by, value = locator
+    return f"{by}={value}"
+
+
+class LocatorStats:
+    """Per-group exponentially weighted hit rates of locators."""
+
+    def __init__(self, path: Optional[str] = None) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._rates: Dict[str, Dict[str, float]] = {}
+        self._dirty = False
+        if path:
+            self.load()
+
+    def hit_rate(self, group: str, locator: Locator) -> float:
+        """Return the current hit rate of a locator within a group."""
+        with self._lock:
+            return self._rates.get(group, {}).get(locator_key(locator), UNSEEN_HIT_RATE)
+
+    def order(self, group: str, locators: Sequence[Locator]) -> List[Locator]:
+        """
+        Sort candidates by hit rate, best first. Ties keep the given order.
+
+        Args:
+            group: Locator group, e.g. the login step name.
+            locators: Candidates in their configured order.
+
+        Returns:
+            list: Reordered candidates.
+        """
+        with self._lock:
+            rates = self._rates.get(group, {})
+            return sorted(locators, key=lambda loc: -rates.get(locator_key(loc), UNSEEN_HIT_RATE))
+
+    def record(self, group: str, tried: Sequence[Locator], hit: Optional[Locator]) -> None:
+        """
+        Record the outcome of a lookup.
+
+        Args:
+            group: Locator group.
+            tried: Locators that were evaluated, in order.
+            hit: The locator that matched, or None if none did.
+        """
+        with self._lock:
+            rates = self._rates.setdefault(group, {})
+            for locator in tried:
+                key = locator_key(locator)
+                observed = 1.0 if locator == hit else 0.0
+                previous = rates.get(key, UNSEEN_HIT_RATE)
+                rates[key] = round(previous + HIT_RATE_ALPHA * (observed - previous), 4)
+            self._dirty = True
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        """Return a copy of all hit rates."""
+        with self._lock:
+            return {group: dict(rates) for group, rates in self._rates.items()}
+
+    def load(self) -> None:
+        """Load stats from the stats file, ignoring a missing or corrupt file."""
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            with self._lock:
+                self._rates = {
+                    str(group): {str(k): float(v) for k, v in rates.items()} for group, rates in data.items()
+                }
+        except (OSError, ValueError, AttributeError) as e:
+            logger.warning(f"Ignoring unreadable locator stats file {self.path}: {e}")
+
+    def save(self) -> None:
+        """Write stats to the stats file if they changed since the last save."""
+        if not self.path:
+            return
+        with self._lock:
+            if not self._dirty:
+                return
+            data = json.dumps(self._rates, indent=1, sort_keys=True)
+            self._dirty = False
+        tmp_path = f"{self.path}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(data)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.warning(f"Failed to save locator stats to {self.path}: {e}")
+
+
+def batch_find(driver: Browser, locators: Sequence[Locator]) -> Optional[Tuple[int, Any]]:
+    """
+    Find the first matching locator with a single script call.
+
+    Args:
+        driver: Browser to query.
+        locators: Candidates in priority order.
+
+    Returns:
+        tuple | None: (index into `locators`, element) of the first match, or None if nothing matched.
+
+    Raises:
+        ValueError: If a locator strategy cannot be batched or the driver returned an
+            unexpected result; callers should fall back to `find_element`.
+    """
+    unsupported = [by for by, _ in locators if by not in BATCH_STRATEGIES]
+    if unsupported:
+        raise ValueError(f"Locator strategies cannot be batched: {', '.join(sorted(set(unsupported)))}")
+
+    start = time.monotonic()
+    result = driver.execute_script(FIRST_MATCH_JS, [list(loc) for loc in locators])
+    logger.debug(f"Batched lookup of {len(locators)} locators took {(time.monotonic() - start) * 1000:.1f}ms")
+
+    if result is None:
+        return None
+    if isinstance(result, list) and len(result) == 2 and isinstance(result[0], int):
+        return result[0], result[1]
+    raise ValueError(f"Unexpected batched lookup result: {type(result).__name__}")
+
+
+_STATS: Optional[LocatorStats] = None
+_STATS_LOCK = threading.Lock()
+
+
+def get_locator_stats() -> LocatorStats:
+    """Return the process-wide locator stats."""
+    global _STATS  # pylint: disable=global-statement
+
+    with _STATS_LOCK:
+        if _STATS is None:
+            _STATS = LocatorStats(LOCATOR_STATS_FILE or None)
+        return _STATS
@@ -4,6 +4,8 @@ Logger setup module for instagram_cookie_generator.
 - INFO and below -> stdout
 - WARNING and above -> stderr
 - Unified format (plain or JSON).
+- Repeated identical messages within LOG_DEDUP_WINDOW_SECONDS are collapsed into one line
+  with a repeat count, and each call site logs at most LOG_RATE_PER_SITE messages per window.
 - Single setup entrypoint: call setup_logger() only once from main.py.
 """
 
@@ -11,7 +13,10 @@ import json
 import logging
 import os
 import sys
+import threading
+from dataclasses import dataclass
 from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
 
 
 def _stdout_filter(record: logging.LogRecord) -> bool:
@@ -35,6 +40,9 @@ class JsonFormatter(logging.Formatter):
             "line": record.lineno,
             "message": record.getMessage(),
         }
+        repeated = getattr(record, "repeated", None)
+        if repeated:
+            record_dict["repeated"] = repeated
         return json.dumps(record_dict)
 
 
@@ -54,6 +62,142 @@ class PlainFormatter(logging.Formatter):
         return f"{record.asctime} [{record.levelname}] {record.module}:{record.lineno} {record.getMessage()}"
 
 
+@dataclass
+class _Repeat:
+    """Occurrences of one message within the current window."""
+
+    started: float
+    suppressed: int = 0
+
+
+@dataclass
+class _Site:
+    """Messages of one call site within the current window."""
+
+    name: str
+    started: float
+    emitted: int = 0
+    suppressed: int = 0
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Collapse repeated messages and rate-limit call sites, e.g. probes failing during an outage.
+
+    The first occurrence of a message passes; identical messages (same logger, level, call
+    site and text) are suppressed until the window ends. The next occurrence after that, or a
+    summary record if the message stopped, reports how many were suppressed: as a suffix of the
+    message and as the `repeated` field in JSON output. Independently, a call site emitting more
+    than `max_per_site` different messages in a window is suppressed and summarized the same way.
+
+    Records are dropped before formatting, so suppressed messages cost no formatting or I/O.
+    """
+
+    SWEEP_INTERVAL = 1.0
+
+    def __init__(self, window: float, max_per_site: int) -> None:
+        """
+        Args:
+            window: Seconds identical messages are collapsed for; 0 disables deduplication.
+            max_per_site: Messages per call site and window; 0 disables the rate limit.
+        """
+        super().__init__()
+        self.window = window
+        self.max_per_site = max_per_site
+        self._repeats: Dict[Tuple[str, int, str, int, str], _Repeat] = {}
+        self._sites: Dict[Tuple[str, int], _Site] = {}
+        self._last_sweep = 0.0
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if getattr(record, "sampling_summary", False) or self.window <= 0:
+            return True
+        now = record.created
+        with self._lock:
+            summaries: List[logging.LogRecord] = []
+            allowed = self._admit(record, now, summaries)
+            if now - self._last_sweep >= self.SWEEP_INTERVAL:
+                summaries.extend(self._sweep(now))
+        for summary in summaries:
+            logging.getLogger(summary.name).handle(summary)
+        return allowed
+
+    def _admit(self, record: logging.LogRecord, now: float, summaries: List[logging.LogRecord]) -> bool:
+        """Decide whether a record passes, adding summaries of ended windows. Caller holds the lock."""
+        key = (record.name, record.levelno, record.pathname, record.lineno, record.getMessage())
+        repeat = self._repeats.get(key)
+        if repeat is not None and now - repeat.started < self.window:
+            repeat.suppressed += 1
+            return False
+
+        site_key = (record.pathname, record.lineno)
+        site = self._sites.get(site_key)
+        if site is None or now - site.started >= self.window:
+            if site is not None and site.suppressed:
+                summaries.append(self._site_summary(site_key, site))
+            site = self._sites[site_key] = _Site(record.name, now)
+        if self.max_per_site and site.emitted >= self.max_per_site:
+            site.suppressed += 1
+            return False
+        site.emitted += 1
+
+        self._repeats[key] = _Repeat(now)
+        if repeat is not None and repeat.suppressed:
+            record.msg = f"{record.getMessage()} (repeated {repeat.suppressed} more times in {self.window:.0f}s)"
+            record.args = None
+            record.repeated = repeat.suppressed
+        return True
+
+    def _sweep(self, now: float, flush: bool = False) -> List[logging.LogRecord]:
+        """Drop ended windows, returning summaries of what they suppressed. Caller holds the lock."""
+        self._last_sweep = now
+        summaries = []
+        for key, repeat in list(self._repeats.items()):
+            if flush or now - repeat.started >= self.window:
+                del self._repeats[key]
+                if repeat.suppressed:
+                    name, level, pathname, lineno, message = key
+                    text = f"{message} (repeated {repeat.suppressed} more times in {self.window:.0f}s)"
+                    summaries.append(self._summary(name, level, pathname, lineno, text, repeat.suppressed))
+        for site_key, site in list(self._sites.items()):
+            if flush or now - site.started >= self.window:
+                del self._sites[site_key]
+                if site.suppressed:
+                    summaries.append(self._site_summary(site_key, site))
+        return summaries
+
+    def _site_summary(self, site_key: Tuple[str, int], site: _Site) -> logging.LogRecord:
+        """Summary of the messages a call site suppressed in its window."""
+        text = f"Suppressed {site.suppressed} log messages from this call site in {self.window:.0f}s"
+        return self._summary(site.name, logging.WARNING, *site_key, text, site.suppressed)
+
+    @staticmethod
+    def _summary(  # pylint: disable=too-many-positional-arguments
+        name: str, level: int, pathname: str, lineno: int, text: str, repeated: int
+    ) -> logging.LogRecord:
+        """Build a record reporting suppressed messages, passed through by the filter."""
+        summary = logging.LogRecord(name, level, pathname, lineno, text, None, None)
+        summary.repeated = repeated
+        summary.sampling_summary = True
+        return summary
+
+    def flush(self) -> None:
+        """Log summaries of all messages suppressed so far, e.g. on shutdown."""
+        with self._lock:
+            summaries = self._sweep(0.0, flush=True)
+        for summary in summaries:
+            logging.getLogger(summary.name).handle(summary)
+
+
+_SAMPLING_FILTER: Optional[SamplingFilter] = None
+
+
+def flush_suppressed() -> None:
+    """Log summaries of messages suppressed by the sampling filter installed by setup_logger()."""
+    if _SAMPLING_FILTER is not None:
+        _SAMPLING_FILTER.flush()
+
+
 def setup_logger() -> None:
     """
     Configure the root logger.
@@ -61,8 +205,14 @@ def setup_logger() -> None:
     Must be called once at app startup (e.g., in main.py).
     Safe to call multiple times but unnecessary.
     """
+    global _SAMPLING_FILTER  # pylint: disable=global-statement
+
     log_format = os.getenv("LOG_FORMAT", "plain").lower()  # "plain" or "json"
     log_level = os.getenv("LOG_LEVEL", "INFO").upper()
+    sampling = SamplingFilter(
+        window=float(os.getenv("LOG_DEDUP_WINDOW_SECONDS") or "60"),
+        max_per_site=int(os.getenv("LOG_RATE_PER_SITE") or "20"),
+    )
 
     formatter: logging.Formatter
 
@@ -80,14 +230,17 @@ def setup_logger() -> None:
     stdout_handler = logging.StreamHandler(sys.stdout)
     stdout_handler.setLevel(logging.DEBUG)
     stdout_handler.addFilter(_stdout_filter)
+    stdout_handler.addFilter(sampling)
     stdout_handler.setFormatter(formatter)
 
     stderr_handler = logging.StreamHandler(sys.stderr)
     stderr_handler.setLevel(logging.WARNING)
+    stderr_handler.addFilter(sampling)
     stderr_handler.setFormatter(formatter)
 
     root_logger.addHandler(stdout_handler)
     root_logger.addHandler(stderr_handler)
+    _SAMPLING_FILTER = sampling
 
 
 def get_logger(name: str | None = None) -> logging.Logger:
@@ -0,0 +1,226 @@
+"""
+Login Flow Module.
+
+Models the Instagram login as a state machine whose steps and locators are plain data.
+Each step names an action (navigate, fill, submit, click, ...) that the caller provides.
+The runner times every transition and remembers the last completed checkpoint, so a
+retry resumes from there instead of replaying the whole flow.
+
+A custom flow, e.g. with a "save login info" or 2FA interstitial, can be supplied as a
+JSON list of steps through LOGIN_FLOW_FILE:
+
+    [{"name": "open_login", "action": "navigate", "url": "https://www.instagram.com/accounts/login/"}, ...]
+"""
+
+import json
+import time
+from dataclasses import dataclass, field, fields
+from typing import Any, Callable, Dict, List, Mapping, NamedTuple, Optional, Sequence, Tuple
+
+from .browser import Browser, Locator
+from .config import INSTAGRAM_LOGIN_URL, LOGIN_FLOW_FILE
+from .logger import get_logger
+from .tracing import span
+
+logger = get_logger()
+
+
+@dataclass(frozen=True)
+class Step:
+    """
+    One state of the login flow.
+
+    Attributes:
+        name: Unique step name, used for timings and resume.
+        action: Name of the action that executes the step.
+        url: Target URL for navigation actions.
+        locators: Candidate element locators as (by, value) pairs, tried in order.
+        value: Text to type; `{username}` and `{password}` are substituted.
+        target: Name of an earlier step whose element this step acts on.
+        settle_seconds: Pause after the step, for the page to react.
+        timeout_seconds: How long element lookups may wait.
+        optional: A failed optional step does not fail the flow.
+        checkpoint: Once completed, retries resume after this step.
+    """
+
+    name: str
+    action: str
+    url: Optional[str] = None
+    locators: Tuple[Locator, ...] = ()
+    value: Optional[str] = None
+    target: Optional[str] = None
+    settle_seconds: float = 0.0
+    timeout_seconds: float = 15.0
+    optional: bool = False
+    checkpoint: bool = False
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> "Step":
+        """
+        Build a step from its JSON representation.
+
+        Raises:
+            ValueError: On unknown keys or missing `name`/`action`.
+        """
+        known = {f.name for f in fields(cls)}
+        unknown = set(data) - known
+        if unknown:
+            raise ValueError(f"Unknown login step keys: {', '.join(sorted(unknown))}")
+        if not data.get("name") or not data.get("action"):
+            raise ValueError(f"Login step needs a name and an action: {dict(data)}")
+        values = dict(data)
+        values["locators"] = tuple((str(by), str(value)) for by, value in data.get("locators", ()))
+        return cls(**values)
+
+
+DEFAULT_STEPS: Tuple[Dict[str, Any], ...] = (
+    {"name": "open_login", "action": "navigate", "url": INSTAGRAM_LOGIN_URL, "settle_seconds": 5},
+    # Consent banner and any other known overlay, detected and dismissed in one DOM query.
+    {"name": "consent", "action": "dismiss_overlays", "optional": True, "timeout_seconds": 3},
+    {
+        "name": "username",
+        "action": "fill",
+        "value": "{username}",
+        "locators": [
+            ["css selector", "input[name='username']"],
+            ["name", "username"],
+            ["css selector", "input[aria-label='Phone number, username, or email']"],
+            ["xpath", "//input[contains(@aria-label, 'username') or contains(@name, 'username')]"],
+        ],
+    },
+    {
+        "name": "password",
+        "action": "fill",
+        "value": "{password}",
+        "locators": [
+            ["css selector", "input[name='password']"],
+            ["name", "password"],
+            ["css selector", "input[aria-label='Password']"],
+            ["css selector", "input[type='password']"],
+        ],
+    },
+    # Credentials are submitted at most once per flow: retries resume after this step.
+    {"name": "submit", "action": "submit", "target": "password", "settle_seconds": 8, "checkpoint": True},
+    {"name": "interstitials", "action": "dismiss_overlays", "optional": True, "timeout_seconds": 3},
+    {"name": "verify", "action": "check_logged_in"},
+)
+
+
+def load_steps(path: Optional[str] = LOGIN_FLOW_FILE) -> List[Step]:
+    """
+    Load the login flow definition.
+
+    Args:
+        path: JSON file with a list of steps. Defaults to LOGIN_FLOW_FILE; the built-in
+            flow is used when empty.
+
+    Returns:
+        list: Flow steps in execution order.
+
+    Raises:
+        ValueError: If the definition is invalid or step names repeat.
+    """
+    raw: Sequence[Mapping[str, Any]] = DEFAULT_STEPS
+    if path:
+        with open(path, "r", encoding="utf-8") as f:
+            raw = json.load(f)
+    steps = [Step.from_dict(item) for item in raw]
+    names = [step.name for step in steps]
+    if len(names) != len(set(names)):
+        raise ValueError(f"Duplicate login step names in {path or 'default flow'}")
+    return steps
+
+
+class StepTiming(NamedTuple):
+    """Outcome and duration of one executed step."""
+
+    name: str
+    ok: bool
+    seconds: float
+
+
+@dataclass
+class FlowContext:
+    """Mutable state shared by the steps of one flow run."""
+
+    variables: Dict[str, str] = field(default_factory=dict)
+    elements: Dict[str, Any] = field(default_factory=dict)
+
+    def render(self, template: Optional[str]) -> str:
+        """Substitute `{variable}` placeholders in a step value."""
+        return (template or "").format(**self.variables)
+
+
+Action = Callable[[Browser, Step, FlowContext], bool]
+
+
+class LoginFlow:
+    """
+    Executes login steps in order, timing each transition.
+
+    A flow instance keeps its resume point across `run()` calls: if a step raises, the
+    next run starts right after the last completed checkpoint. A completed or failed run
+    resets the flow to the beginning.
+    """
+
+    def __init__(self, steps: Sequence[Step], actions: Mapping[str, Action]) -> None:
+        missing = {step.action for step in steps} - set(actions)
+        if missing:
+            raise ValueError(f"No action registered for: {', '.join(sorted(missing))}")
+        self.steps = list(steps)
+        self.actions = actions
+        self.resume_index = 0
+        self.context = FlowContext()
+        self.timings: List[StepTiming] = []
+
+    def run(self, driver: Browser, variables: Optional[Dict[str, str]] = None) -> bool:
+        """
+        Run the flow from the current resume point.
+
+        Args:
+            driver: Browser the actions operate on.
+            variables: Placeholder values such as username and password.
+
+        Returns:
+            bool: True once every required step passed, or False as soon as one fails. Optional
+            steps never decide the result, e.g. a trailing interstitial that was not shown.
+        """
+        if self.resume_index:
+            logger.info(f"Resuming login flow at step {self.steps[self.resume_index].name}")
+        else:
+            self.context = FlowContext()
+        if variables:
+            self.context.variables.update(variables)
+
+        for index in range(self.resume_index, len(self.steps)):
+            step = self.steps[index]
+            start = time.monotonic()
+            try:
+                with span(f"login.{step.name}", action=step.action, optional=step.optional) as step_span:
+                    ok = self.actions[step.action](driver, step, self.context)
+                    step_span.set_attribute("ok", ok)
+                    if step.settle_seconds:
+                        time.sleep(step.settle_seconds)
+            except Exception:
+                self._record(step, False, start)
+                raise
+            self._record(step, ok, start)
+
+            if not ok and not step.optional:
+                logger.error(f"Login step {step.name} failed.")
+                self.resume_index = 0
+                return False
+            if step.checkpoint:
+                self.resume_index = index + 1
+
+        self.resume_index = 0
+        return True
+
+    def _record(self, step: Step, ok: bool, start: float) -> None:
+        timing = StepTiming(step.name, ok, time.monotonic() - start)
+        self.timings.append(timing)
+        logger.debug(f"Login step {timing.name}: {'ok' if ok else 'failed'} in {timing.seconds:.2f}s")
+
+    def timings_summary(self) -> str:
+        """Render step timings as `name=1.23s` pairs, failed steps marked with `!`."""
+        return ", ".join(f"{t.name}={t.seconds:.2f}s{'' if t.ok else '!'}" for t in self.timings)
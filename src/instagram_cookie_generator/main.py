@@ -2,45 +2,246 @@
 Main module to orchestrate cookie refreshing and Flask server.
 
 Spawns a background thread to refresh Instagram cookies periodically,
-and launches a Flask webserver for health monitoring.
+and launches a Flask webserver for health monitoring until SIGTERM, then shuts
+both down gracefully (see `lifecycle`).
+
+Configuration and the webserver are imported only after `.env` has been loaded, and
+Selenium only on the first refresh, so `--serve-only` replicas never load the browser stack.
 """
 
+import argparse
+import json
+import logging
 import os
+import sys
 import threading
 import time
+import traceback
+from typing import TYPE_CHECKING, Optional, Sequence
 
 from dotenv import load_dotenv
 
-from .cookie_manager import cookie_manager
-from .logger import get_logger, setup_logger
-from .webserver import start_server
+from .logger import flush_suppressed, get_logger, setup_logger
+
+if TYPE_CHECKING:
+    from .history import HistorySampler
 
-load_dotenv()
-setup_logger()
 logger = get_logger()
 
-REFRESH_INTERVAL = int(os.getenv("REFRESH_INTERVAL_SECONDS", "3600"))
 
+def _next_refresh_delay(cookies_files: Sequence[str], interval: int) -> float:
+    """Seconds until the first of the shared cookie files is due for a refresh, 0 if one is missing."""
+    delay = float(interval)
+    for cookies_file in cookies_files:
+        try:
+            age = time.time() - os.path.getmtime(cookies_file)
+        except OSError:
+            return 0.0
+        delay = min(delay, max(0.0, interval - age))
+    return delay if cookies_files else 0.0
 
-def refresh_worker() -> None:
+
+def refresh_worker() -> None:  # pylint: disable=too-many-branches
     """
     Background thread that refreshes cookies at a fixed interval.
+
+    Each cycle refreshes the accounts of this node's shard. With leader election enabled,
+    only the leader refreshes; a node that takes over waits until the first cookies file
+    written by the previous leader is due.
     """
-    while True:
-        logger.info("Refreshing Instagram cookies...")
+    # pylint: disable=import-outside-toplevel
+    from .accounts import get_accounts
+    from .config import COOKIES_FILE, REFRESH_INTERVAL
+    from .cookie_manager import cookie_manager
+    from .heartbeat import get_heartbeat
+    from .history import get_history
+    from .leader import get_elector
+    from .lifecycle import ShutdownRequested, get_lifecycle
+    from .resources import track_resources
+    from .sharding import get_cluster, shard_accounts
+    from .tracing import span
+
+    heartbeat = get_heartbeat()
+    heartbeat.attach()
+    lifecycle = get_lifecycle()
+    elector = get_elector()
+    cycle = 0
+    while not lifecycle.stopping:
+        if elector is not None and not elector.is_leader:
+            logger.info("Follower: waiting for refresh leadership...")
+            heartbeat.idle(None, "following")
+            while not elector.wait_until_leader(timeout=1.0):
+                if lifecycle.stopping:
+                    break
+            try:
+                cookies_files = [account.cookies_file for account in shard_accounts(COOKIES_FILE)]
+            except (OSError, ValueError) as e:
+                logger.warning(f"{type(e)}: Cannot load accounts: {e}")
+                cookies_files = []
+            delay = _next_refresh_delay(cookies_files, REFRESH_INTERVAL)
+            if delay > 0 and not lifecycle.stopping:
+                logger.info(f"Leader: cookies are still fresh, next refresh in {delay:.0f} seconds.")
+                heartbeat.idle(delay)
+                lifecycle.sleep(delay)
+            continue
+
+        cycle += 1
+        heartbeat.cycle_started(cycle)
         try:
-            cookie_manager()
-            logger.info("Cookies refreshed successfully.")
-        except Exception as e:  # pylint: disable=broad-exception-caught
-            # Intentionally catching all exceptions to prevent the refresh worker from crashing the entire service.
-            logger.exception(f"{type(e)}: Unhandled exception in refresh worker loop.")
+            accounts = get_cluster().shard(get_accounts())
+        except (OSError, ValueError) as e:
+            logger.exception(f"{type(e)}: Cannot load accounts: {e}")
+            accounts = []
+        if not accounts:
+            logger.warning("No accounts configured or assigned to this node, nothing to refresh.")
+
+        started = time.monotonic()
+        failures = 0
+        # Resources are accounted over the whole cycle, so every account's browser counts towards one record.
+        with span("refresh_cycle", cycle=cycle, accounts=len(accounts)), track_resources():
+            for account in accounts:
+                if lifecycle.stopping:
+                    break
+                logger.info(f"Refreshing Instagram cookies for {account.username}...")
+                try:
+                    with span("account", account=account.username):
+                        cookie_manager(account)
+                    logger.info("Cookies refreshed successfully.")
+                except ShutdownRequested as e:
+                    logger.info(f"Refresh of {account.username} canceled before {e}.")
+                    break
+                except Exception as e:  # pylint: disable=broad-exception-caught
+                    # Catch everything so one account cannot crash the refresh worker or block the others.
+                    logger.exception(f"{type(e)}: Unhandled exception in refresh worker loop.")
+                    failures += 1
+        heartbeat.cycle_finished()
+        if lifecycle.stopping:
+            break
+        if accounts:
+            get_history().record_cycle(time.monotonic() - started, ok=not failures)
         logger.info(f"Sleeping for {REFRESH_INTERVAL} seconds...")
-        time.sleep(REFRESH_INTERVAL)
+        heartbeat.idle(REFRESH_INTERVAL)
+        if lifecycle.sleep(REFRESH_INTERVAL) and not lifecycle.stopping:
+            logger.info("Woken up for an immediate refresh.")
+    logger.info("Refresh worker stopped.")
 
 
-if __name__ == "__main__":
-    # Start refresh worker thread
-    threading.Thread(target=refresh_worker, daemon=True).start()
+def dump_state() -> None:
+    """Log internal state and the stacks of all threads, on SIGUSR1."""
+    # pylint: disable=import-outside-toplevel
+    from .heartbeat import get_heartbeat
+    from .leader import leader_status
+    from .proxies import get_proxy_pool
+    from .ratelimit import get_governor
 
-    # Start Flask webserver (this blocks main thread)
-    start_server()
+    names = {thread.ident: thread.name for thread in threading.enumerate()}
+    pool = get_proxy_pool()
+    state = {
+        "heartbeat": get_heartbeat().status(),
+        "leader": leader_status(),
+        "limits": get_governor().state(),
+        "proxies": pool.state() if pool is not None else None,
+        "threads": {
+            names.get(ident, str(ident)): traceback.format_stack(frame)
+            for ident, frame in sys._current_frames().items()  # pylint: disable=protected-access
+        },
+    }
+    logger.info(f"State dump: {json.dumps(state, default=str)}")
+
+
+def shutdown(worker: Optional[threading.Thread], timeout: float, sampler: Optional["HistorySampler"] = None) -> None:
+    """
+    Stop the refresh worker, release leadership and flush logs.
+
+    Args:
+        worker: Refresh worker thread, None in serve-only mode.
+        timeout: Seconds to wait for an in-flight refresh to stop before quitting its browsers.
+        sampler: Cookie-health history sampler to stop.
+    """
+    # pylint: disable=import-outside-toplevel
+    from .leader import stop_elector
+    from .lifecycle import get_lifecycle
+
+    lifecycle = get_lifecycle()
+    lifecycle.request_stop("server stopped")
+    if worker is not None:
+        worker.join(timeout)
+        if worker.is_alive():
+            quit_count = lifecycle.quit_browsers()
+            logger.warning(f"Refresh did not stop within {timeout:.0f}s, quit {quit_count} running browser(s).")
+            worker.join(5)
+    if sampler is not None:
+        sampler.stop()
+    stop_elector()
+    logger.info("Shutdown complete.")
+    flush_suppressed()
+    for handler in logging.getLogger().handlers:
+        handler.flush()
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    """
+    Parse command line arguments.
+
+    Args:
+        argv: Arguments to parse. Defaults to sys.argv[1:].
+
+    Returns:
+        argparse.Namespace: Parsed arguments.
+    """
+    parser = argparse.ArgumentParser(prog="instagram_cookie_generator", description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--serve-only",
+        action="store_true",
+        help="Only serve health endpoints for an existing cookies file, without refreshing cookies.",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    """
+    Service entry point.
+
+    Args:
+        argv: Command line arguments. Defaults to sys.argv[1:].
+    """
+    args = parse_args(argv)
+
+    load_dotenv()
+    setup_logger()
+
+    # pylint: disable=import-outside-toplevel
+    from .config import SHUTDOWN_TIMEOUT_SECONDS
+    from .export import get_exports
+    from .history import HistorySampler, get_history
+    from .lifecycle import get_lifecycle, install_signal_handlers
+    from .webserver import start_server
+
+    try:
+        # Parses COOKIE_VIEWS and COOKIE_EXPORT_FORMATS; fail here rather than after every refresh.
+        get_exports()
+    except ValueError as e:
+        logger.error(f"Invalid cookie export configuration: {e}")
+        raise SystemExit(2) from e
+
+    install_signal_handlers(get_lifecycle(), dump_state)
+    sampler = HistorySampler(get_history())
+    sampler.start()
+
+    worker = None
+    if args.serve_only:
+        logger.info("Serve-only mode, cookie refresh is disabled.")
+    else:
+        # Start refresh worker thread
+        worker = threading.Thread(target=refresh_worker, name="refresh_worker", daemon=True)
+        worker.start()
+
+    # Serve until SIGTERM (this blocks main thread)
+    try:
+        start_server()
+    finally:
+        shutdown(worker, SHUTDOWN_TIMEOUT_SECONDS, sampler)
+
+
+if __name__ == "__main__":
+    main()
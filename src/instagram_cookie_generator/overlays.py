@@ -0,0 +1,171 @@
+"""
+Overlay Handling Module.
+
+Detects consent banners and interstitial dialogs ("Not Now", "Save login info") in a
+single DOM evaluation, clicks their dismiss buttons within the same script call, then
+polls until they are actually gone instead of sleeping for a fixed time.
+"""
+
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from selenium.common import NoSuchElementException, WebDriverException
+from selenium.webdriver.common.by import By
+
+from .browser import Browser, Locator
+from .locators import BATCH_STRATEGIES, FIND_ELEMENT_JS, get_locator_stats
+from .logger import get_logger
+
+logger = get_logger()
+
+# Seconds to wait for dismissed overlays to disappear, and the poll interval while waiting.
+DISMISS_TIMEOUT = 3.0
+POLL_INTERVAL = 0.1
+
+
+@dataclass(frozen=True)
+class Overlay:
+    """An overlay and the candidate locators of the button that dismisses it."""
+
+    name: str
+    buttons: Tuple[Locator, ...]
+
+
+CONSENT = Overlay(
+    "consent",
+    (
+        (By.XPATH, "//button[contains(., 'Allow essential')]"),
+        (By.XPATH, "//button[contains(., 'Allow all')]"),
+        (By.XPATH, "//button[contains(., 'Accept')]"),
+        (By.CSS_SELECTOR, "button[title='Only allow essential cookies']"),
+        (By.CSS_SELECTOR, "button[aria-label='Only allow essential cookies']"),
+    ),
+)
+NOT_NOW = Overlay(
+    "not_now",
+    (
+        (By.XPATH, "//button[contains(text(), 'Not Now')]"),
+        (By.XPATH, "//div[@role='button'][contains(., 'Not now')]"),
+    ),
+)
+
+KNOWN_OVERLAYS: Tuple[Overlay, ...] = (CONSENT, NOT_NOW)
+
+# Returns {name: [button index, clicked]} for every overlay with a visible dismiss button.
+DETECT_OVERLAYS_JS = FIND_ELEMENT_JS + """
+const overlays = arguments[0];
+const click = arguments[1];
+const found = {};
+for (const [name, locators] of overlays) {
+  for (let i = 0; i < locators.length; i++) {
+    const el = findElement(locators[i][0], locators[i][1]);
+    if (!el || el.getClientRects().length === 0) continue;
+    let clicked = false;
+    if (click) {
+      try { el.click(); clicked = true; } catch (e) {}
+    }
+    found[name] = [i, clicked];
+    break;
+  }
+}
+return found;
+"""
+
+
+def _ordered(overlays: Sequence[Overlay]) -> List[Overlay]:
+    """Order each overlay's buttons by their recent hit rate."""
+    stats = get_locator_stats()
+    return [Overlay(o.name, tuple(stats.order(o.name, o.buttons))) for o in overlays]
+
+
+def detect_overlays(driver: Browser, overlays: Sequence[Overlay], click: bool = False) -> Dict[str, Tuple[int, bool]]:
+    """
+    Check all overlays in one script call.
+
+    Args:
+        driver: Browser to query.
+        overlays: Overlays to look for.
+        click: Click the dismiss button of every overlay found.
+
+    Returns:
+        dict: Overlay name to (index of the matching button, whether it was clicked).
+
+    Raises:
+        ValueError: If the overlays cannot be checked in-page; callers should fall back
+            to `find_element`.
+    """
+    if any(by not in BATCH_STRATEGIES for o in overlays for by, _ in o.buttons):
+        raise ValueError("Overlay locators cannot be batched")
+
+    payload = [[o.name, [list(loc) for loc in o.buttons]] for o in overlays]
+    result = driver.execute_script(DETECT_OVERLAYS_JS, payload, click)
+    if not isinstance(result, dict):
+        raise ValueError(f"Unexpected overlay detection result: {type(result).__name__}")
+    return {str(name): (int(value[0]), bool(value[1])) for name, value in result.items()}
+
+
+def _dismiss_sequentially(driver: Browser, overlays: Sequence[Overlay]) -> List[str]:
+    """Fallback: probe and click buttons one WebDriver call at a time."""
+    dismissed = []
+    for overlay in overlays:
+        for by, value in overlay.buttons:
+            try:
+                driver.find_element(by, value).click()
+                dismissed.append(overlay.name)
+                break
+            except NoSuchElementException:
+                continue
+            except Exception as exc:  # pylint: disable=broad-exception-caught
+                logger.debug(f"Unable to click {overlay.name} button {value}: {exc}")
+    if dismissed:
+        time.sleep(1)
+    return dismissed
+
+
+def dismiss_overlays(
+    driver: Browser, overlays: Optional[Sequence[Overlay]] = None, timeout: float = DISMISS_TIMEOUT
+) -> List[str]:
+    """
+    Dismiss every present overlay and wait until they disappear.
+
+    Args:
+        driver: Browser to act on.
+        overlays: Overlays to handle, defaults to all known ones.
+        timeout: Maximum seconds to wait for dismissed overlays to go away.
+
+    Returns:
+        list: Names of the dismissed overlays.
+    """
+    candidates = _ordered(KNOWN_OVERLAYS if overlays is None else overlays)
+    try:
+        found = detect_overlays(driver, candidates, click=True)
+    except (ValueError, WebDriverException) as exc:
+        logger.debug(f"In-page overlay detection unavailable, probing sequentially: {exc}")
+        return _dismiss_sequentially(driver, candidates)
+
+    stats = get_locator_stats()
+    for overlay in candidates:
+        if overlay.name in found:
+            index = found[overlay.name][0]
+            stats.record(overlay.name, overlay.buttons[: index + 1], overlay.buttons[index])
+
+    dismissed = [name for name, (_, clicked) in found.items() if clicked]
+    if not dismissed:
+        return []
+
+    logger.info(f"Dismissed overlays: {', '.join(dismissed)}")
+    pending = [o for o in candidates if o.name in dismissed]
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            still_present = detect_overlays(driver, pending)
+        except (ValueError, WebDriverException):
+            break
+        if not still_present:
+            break
+        pending = [o for o in pending if o.name in still_present]
+        time.sleep(POLL_INTERVAL)
+    else:
+        logger.warning(f"Overlays still visible after {timeout}s: {', '.join(o.name for o in pending)}")
+    return dismissed
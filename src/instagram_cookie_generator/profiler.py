@@ -0,0 +1,132 @@
+"""
+Sampling Profiler Module.
+
+Samples the stacks of all threads (the refresh worker, Flask request threads, ...) for a
+bounded window using `sys._current_frames()`. Nothing runs between profiling requests,
+so the profiler has no overhead while idle.
+
+Profiles are rendered as collapsed stacks (`thread;outer;inner count`, the input format of
+flame graph tools) or as a pstats-like table of per-function self and total samples.
+"""
+
+import math
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from types import FrameType
+from typing import Any, Dict, List, Optional, Tuple
+
+# Upper bound for a profiling window and the default sampling interval, in seconds.
+MAX_PROFILE_SECONDS = 60.0
+SAMPLE_INTERVAL = 0.005
+
+# Only one profile may run at a time.
+_PROFILE_LOCK = threading.Lock()
+
+
+class ProfilerBusyError(RuntimeError):
+    """Raised when a profile is requested while another one is running."""
+
+
+def _frame_label(frame: FrameType) -> str:
+    """Describe a frame's function as `name (package/module.py:first_line)`."""
+    code = frame.f_code
+    short_path = os.path.join(*code.co_filename.split(os.sep)[-2:]) if code.co_filename else "?"
+    return f"{code.co_name} ({short_path}:{code.co_firstlineno})"
+
+
+def _stack(frame: Optional[FrameType]) -> Tuple[str, ...]:
+    """Frames from the outermost to the innermost call."""
+    labels = []
+    while frame is not None:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    return tuple(reversed(labels))
+
+
+@dataclass
+class Profile:
+    """Aggregated stack samples of one profiling window."""
+
+    seconds: float = 0.0
+    interval: float = SAMPLE_INTERVAL
+    samples: int = 0
+    stacks: "Counter[Tuple[str, ...]]" = field(default_factory=Counter)
+
+    def collapsed(self) -> str:
+        """Render as collapsed stacks, most frequent first."""
+        lines = [f"{';'.join(stack)} {count}" for stack, count in self.stacks.most_common()]
+        return "\n".join(lines) + ("\n" if lines else "")
+
+    def top(self, limit: int = 30) -> List[Dict[str, Any]]:
+        """
+        Per-function sample counts, like pstats' tottime/cumtime columns.
+
+        Args:
+            limit: Maximum number of functions, ordered by self samples.
+
+        Returns:
+            list: Entries with `function`, `self` and `total` sample counts.
+        """
+        own: "Counter[str]" = Counter()
+        total: "Counter[str]" = Counter()
+        for stack, count in self.stacks.items():
+            frames = stack[1:]  # skip the thread name
+            if frames:
+                own[frames[-1]] += count
+            for label in set(frames):
+                total[label] += count
+        ranked = sorted(total, key=lambda label: (own[label], total[label]), reverse=True)
+        return [{"function": label, "self": own[label], "total": total[label]} for label in ranked[:limit]]
+
+    def to_dict(self, limit: int = 30) -> Dict[str, Any]:
+        """Serialize a summary of the profile."""
+        return {
+            "seconds": self.seconds,
+            "interval": self.interval,
+            "samples": self.samples,
+            "threads": sorted({stack[0] for stack in self.stacks}),
+            "top": self.top(limit),
+        }
+
+
+def sample(seconds: float, interval: float = SAMPLE_INTERVAL) -> Profile:
+    """
+    Sample all threads except the calling one for a bounded window.
+
+    Args:
+        seconds: Profiling window, capped at MAX_PROFILE_SECONDS.
+        interval: Seconds between samples.
+
+    Returns:
+        Profile: Aggregated stacks, each rooted at the thread name.
+
+    Raises:
+        ValueError: If `seconds` is NaN or infinite.
+        ProfilerBusyError: If another profile is already running.
+    """
+    if not math.isfinite(seconds):
+        raise ValueError(f"Profiling window must be a finite number of seconds, got {seconds}")
+    if not _PROFILE_LOCK.acquire(blocking=False):  # pylint: disable=consider-using-with
+        raise ProfilerBusyError("A profile is already running")
+    try:
+        seconds = min(max(seconds, 0.0), MAX_PROFILE_SECONDS)
+        profile = Profile(seconds=seconds, interval=interval)
+        own_ident = threading.get_ident()
+        deadline = time.monotonic() + seconds
+        while True:
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():  # pylint: disable=protected-access
+                if ident == own_ident:
+                    continue
+                profile.stacks[(names.get(ident, f"thread-{ident}"),) + _stack(frame)] += 1
+            profile.samples += 1
+            if time.monotonic() >= deadline:
+                break
+            time.sleep(interval)
+        return profile
+    finally:
+        _PROFILE_LOCK.release()
@@ -0,0 +1,247 @@
+"""
+Rate Limiting Module.
+
+Paces login submissions with token buckets, one shared by all accounts and one per
+account, so retries, forced refreshes and many accounts cannot burst into Instagram's
+anti-automation checks. Semaphores cap the number of concurrently running browsers and
+in-flight login submissions. The limiter state is exposed on `/status/limits`.
+
+Buckets use reservations: a caller takes a token immediately, possibly going into debt,
+and sleeps until its token would have been refilled, so waiting callers are served in
+arrival order. A refresh reserves its login before starting a browser, so no browser slot
+is held while waiting; the reservation is refunded if the existing cookies were still valid.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+
+from .config import (
+    LOGIN_BURST_ACCOUNT,
+    LOGIN_BURST_GLOBAL,
+    LOGIN_RATE_ACCOUNT_PER_HOUR,
+    LOGIN_RATE_GLOBAL_PER_HOUR,
+    MAX_CONCURRENT_BROWSERS,
+    MAX_CONCURRENT_LOGINS,
+)
+from .heartbeat import get_heartbeat
+from .lifecycle import get_lifecycle
+from .logger import get_logger
+from .tracing import current_span
+
+logger = get_logger()
+
+
+class TokenBucket:
+    """Token bucket refilled continuously at a fixed rate."""
+
+    def __init__(self, rate_per_hour: float, burst: int) -> None:
+        """
+        Args:
+            rate_per_hour: Tokens added per hour; 0 or less disables the bucket.
+            burst: Maximum number of stored tokens.
+        """
+        self.rate = rate_per_hour / 3600
+        self.capacity = float(max(1, burst))
+        self.tokens = self.capacity
+        self.granted = 0
+        self.waited_seconds = 0.0
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self) -> float:
+        """
+        Take a token.
+
+        Returns:
+            float: Seconds the caller has to wait before using the token.
+        """
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            self._refill(time.monotonic())
+            self.tokens -= 1
+            self.granted += 1
+            wait = max(0.0, -self.tokens / self.rate)
+            self.waited_seconds += wait
+            return wait
+
+    def refund(self) -> None:
+        """Return a reserved token that was not used."""
+        if self.rate <= 0:
+            return
+        with self._lock:
+            self._refill(time.monotonic())
+            self.tokens = min(self.capacity, self.tokens + 1)
+            self.granted -= 1
+
+    def state(self) -> Dict[str, Any]:
+        """Current fill level and counters."""
+        with self._lock:
+            if self.rate > 0:
+                self._refill(time.monotonic())
+            return {
+                "tokens": round(self.tokens, 2),
+                "capacity": self.capacity,
+                "rate_per_hour": round(self.rate * 3600, 2),
+                "granted": self.granted,
+                "waited_seconds": round(self.waited_seconds, 1),
+            }
+
+
+class Governor:  # pylint: disable=too-many-instance-attributes
+    """Login rate limits and concurrency caps shared by all refreshes of the process."""
+
+    def __init__(  # pylint: disable=too-many-positional-arguments
+        self,
+        global_rate: float = LOGIN_RATE_GLOBAL_PER_HOUR,
+        global_burst: int = LOGIN_BURST_GLOBAL,
+        account_rate: float = LOGIN_RATE_ACCOUNT_PER_HOUR,
+        account_burst: int = LOGIN_BURST_ACCOUNT,
+        max_browsers: int = MAX_CONCURRENT_BROWSERS,
+        max_logins: int = MAX_CONCURRENT_LOGINS,
+    ) -> None:
+        """
+        Args:
+            global_rate: Login submissions per hour across all accounts.
+            global_burst: Login submissions allowed back to back across all accounts.
+            account_rate: Login submissions per hour for a single account.
+            account_burst: Login submissions allowed back to back for a single account.
+            max_browsers: Browsers running at the same time.
+            max_logins: Login submissions in flight at the same time.
+        """
+        self.global_bucket = TokenBucket(global_rate, global_burst)
+        self._account_rate = account_rate
+        self._account_burst = account_burst
+        self._accounts: Dict[str, TokenBucket] = {}
+        self._max_browsers = max(1, max_browsers)
+        self._max_logins = max(1, max_logins)
+        self._browsers = threading.BoundedSemaphore(self._max_browsers)
+        self._logins = threading.BoundedSemaphore(self._max_logins)
+        self._active = {"browsers": 0, "logins": 0}
+        self._reserved = threading.local()
+        self._lock = threading.Lock()
+
+    def _account_bucket(self, account: str) -> TokenBucket:
+        with self._lock:
+            if account not in self._accounts:
+                self._accounts[account] = TokenBucket(self._account_rate, self._account_burst)
+            return self._accounts[account]
+
+    def _track(self, kind: str, delta: int) -> None:
+        with self._lock:
+            self._active[kind] += delta
+
+    @contextmanager
+    def browser_slot(self) -> Iterator[None]:
+        """Hold one of the concurrent browser slots while a browser runs."""
+        started = time.monotonic()
+        with self._browsers:
+            waited = time.monotonic() - started
+            if waited >= 1:
+                logger.info(f"Waited {waited:.1f}s for a free browser slot.")
+            self._track("browsers", 1)
+            try:
+                yield
+            finally:
+                self._track("browsers", -1)
+
+    def _pace(self, account: str) -> float:
+        """Take a token from the global and the account bucket and wait until both are due."""
+        wait = max(self.global_bucket.reserve(), self._account_bucket(account).reserve())
+        if wait > 0:
+            logger.warning(f"Login rate limit reached, delaying login of {account} by {wait:.0f}s.")
+            get_heartbeat().idle(wait, "login_rate_limit")
+            lifecycle = get_lifecycle()
+            lifecycle.wait_for_stop(wait)
+            lifecycle.checkpoint("login")
+        active = current_span()
+        if active is not None:
+            active.set_attribute("rate_limit_wait", round(wait, 3))
+        return wait
+
+    @contextmanager
+    def login_reservation(self, account: str) -> Iterator[float]:
+        """
+        Reserve a login submission before starting a browser, so no browser slot is held while waiting.
+
+        The first `login` of the account in this thread uses the reservation; an unused
+        reservation is refunded on exit.
+
+        Args:
+            account: Account that may submit its credentials.
+
+        Yields:
+            float: Seconds waited for the rate limits.
+        """
+        wait = self._pace(account)
+        self._reserved.account = account
+        try:
+            yield wait
+        finally:
+            if getattr(self._reserved, "account", None) == account:
+                self.global_bucket.refund()
+                self._account_bucket(account).refund()
+            self._reserved.account = None
+
+    @contextmanager
+    def login(self, account: str) -> Iterator[float]:
+        """
+        Pace and serialize a login submission.
+
+        Uses the thread's reservation for the account if there is one, otherwise waits for
+        the rate limits here.
+
+        Args:
+            account: Account submitting its credentials.
+
+        Yields:
+            float: Seconds waited for the rate limits.
+        """
+        if getattr(self._reserved, "account", None) == account:
+            self._reserved.account = None
+            wait = 0.0
+        else:
+            wait = self._pace(account)
+        with self._logins:
+            self._track("logins", 1)
+            try:
+                yield wait
+            finally:
+                self._track("logins", -1)
+
+    def state(self) -> Dict[str, Any]:
+        """
+        Limiter state for `/status/limits`.
+
+        Returns:
+            dict: Global and per-account buckets and concurrency usage.
+        """
+        with self._lock:
+            accounts = dict(self._accounts)
+            active = dict(self._active)
+        return {
+            "global": self.global_bucket.state(),
+            "accounts": {name: bucket.state() for name, bucket in sorted(accounts.items())},
+            "browsers": {"active": active["browsers"], "limit": self._max_browsers},
+            "logins": {"active": active["logins"], "limit": self._max_logins},
+        }
+
+
+_GOVERNOR: Optional[Governor] = None
+_GOVERNOR_LOCK = threading.Lock()
+
+
+def get_governor() -> Governor:
+    """Return the process-wide governor."""
+    global _GOVERNOR  # pylint: disable=global-statement
+
+    with _GOVERNOR_LOCK:
+        if _GOVERNOR is None:
+            _GOVERNOR = Governor()
+        return _GOVERNOR
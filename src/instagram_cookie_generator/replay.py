@@ -0,0 +1,331 @@
+"""
+Replay Module.
+
+Record-and-replay of WebDriver sessions, to benchmark the refresh flow offline with
+realistic browser latencies:
+
+- `RecordingDriver` wraps a real browser (BROWSER_RECORD_FILE) and captures every command,
+  element command and property read with its result, error and latency, tagged with the
+  trace span it ran in (`navigate`, `cookies.load`, `login`, `cookies.save`, ...). The trace is
+  saved as JSON lines when the browser quits.
+- `ReplayDriver` plays a trace back (BROWSER_ENGINE=replay, REPLAY_TRACE_FILE), sleeping for
+  each recorded latency multiplied by REPLAY_TIME_SCALE: 1 replays faithfully, 0 instantly.
+
+Commands are matched by name, element and arguments rather than by position, so polling loops
+may issue a command more or fewer times than recorded; the last response is then repeated.
+Cookie values and typed text are redacted before they are written to the trace.
+"""
+
+import json
+import time
+from collections import defaultdict, deque
+from datetime import UTC, datetime
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple, cast
+
+from selenium.common import WebDriverException
+from selenium.common import exceptions as selenium_exceptions
+from selenium.webdriver.remote.webelement import WebElement
+
+from .browser import Browser, BrowserEngine
+from .config import REPLAY_TIME_SCALE, REPLAY_TRACE_FILE
+from .logger import get_logger
+from .proxies import ProxyEndpoint
+from .storage import write_atomic
+from .tracing import current_span
+
+logger = get_logger()
+
+TRACE_VERSION = 1
+REDACTED = "<redacted>"
+# Attributes read as properties, each read is a WebDriver command.
+PROPERTIES = frozenset({"current_url", "title", "page_source", "current_window_handle", "window_handles", "text"})
+_ELEMENT_KEY = "$element"
+
+
+class ReplayError(WebDriverException):
+    """The replayed flow issued a command that the trace does not contain."""
+
+
+def _is_special_key(char: str) -> bool:
+    """Selenium `Keys` constants are Unicode private-use characters."""
+    return "\ue000" <= char <= "\uf8ff"
+
+
+def redact(command: str, args: List[Any]) -> List[Any]:
+    """
+    Remove secrets from recorded arguments: cookie values and typed text.
+
+    Args:
+        command: Command name, e.g. `add_cookie` or `element.send_keys`.
+        args: JSON-ready positional arguments.
+
+    Returns:
+        list: Arguments safe to store; special keys such as RETURN are kept.
+    """
+    if command == "add_cookie":
+        return [{**arg, "value": REDACTED} if isinstance(arg, dict) else arg for arg in args]
+    if command == "element.send_keys":
+        return [arg if isinstance(arg, str) and all(map(_is_special_key, arg)) else REDACTED for arg in args]
+    return args
+
+
+def _redact_result(command: str, result: Any) -> Any:
+    """Remove cookie values from `get_cookies` results."""
+    if command == "get_cookies" and isinstance(result, list):
+        return [{**cookie, "value": REDACTED} if isinstance(cookie, dict) else cookie for cookie in result]
+    return result
+
+
+def _match_key(command: str, element: Optional[int], args: List[Any]) -> Tuple[str, Optional[int], str]:
+    return command, element, json.dumps(args, sort_keys=True, default=str)
+
+
+class _Recorder:
+    """Collects the commands of one recorded session."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.commands: List[Dict[str, Any]] = []
+        self._elements: Dict[int, int] = {}
+        self._started = time.perf_counter()
+
+    def _element_id(self, element: WebElement) -> int:
+        return self._elements.setdefault(id(element), len(self._elements) + 1)
+
+    def serialize(self, value: Any) -> Any:
+        """Convert a result or argument to JSON, replacing elements by their recorded id."""
+        if isinstance(value, RecordingElement):
+            return {_ELEMENT_KEY: value.element_id}
+        if isinstance(value, WebElement):
+            return {_ELEMENT_KEY: self._element_id(value)}
+        if isinstance(value, dict):
+            return {str(k): self.serialize(v) for k, v in value.items()}
+        if isinstance(value, (list, tuple)):
+            return [self.serialize(v) for v in value]
+        if value is None or isinstance(value, (str, int, float, bool)):
+            return value
+        return repr(value)
+
+    def wrap(self, value: Any) -> Any:
+        """Wrap elements within a result so that their commands are recorded too."""
+        if isinstance(value, WebElement):
+            return RecordingElement(value, self._element_id(value), self)
+        if isinstance(value, list):
+            return [self.wrap(v) for v in value]
+        if isinstance(value, dict):
+            return {k: self.wrap(v) for k, v in value.items()}
+        return value
+
+    def call(self, command: str, element: Optional[int], target: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Run a command against the real browser and record it."""
+        unwrapped = [a.element if isinstance(a, RecordingElement) else a for a in args]
+        span = current_span()
+        entry: Dict[str, Any] = {
+            "command": command,
+            "element": element,
+            "args": redact(command, self.serialize(list(args))),
+            "span": span.name if span is not None else None,
+            "offset": round(time.perf_counter() - self._started, 6),
+        }
+        if kwargs:
+            entry["kwargs"] = self.serialize(kwargs)
+        started = time.perf_counter()
+        try:
+            result = target(*unwrapped, **kwargs)
+        except Exception as e:
+            entry["latency"] = round(time.perf_counter() - started, 6)
+            entry["error"] = {"type": type(e).__name__, "message": str(e).splitlines()[0] if str(e) else ""}
+            self.commands.append(entry)
+            raise
+        entry["latency"] = round(time.perf_counter() - started, 6)
+        entry["result"] = _redact_result(command, self.serialize(result))
+        self.commands.append(entry)
+        return self.wrap(result)
+
+    def save(self) -> None:
+        """Write the trace as JSON lines: a header, then one command per line."""
+        header = {"version": TRACE_VERSION, "recorded": datetime.now(UTC).isoformat(), "commands": len(self.commands)}
+        lines = [json.dumps(header)] + [json.dumps(entry) for entry in self.commands]
+        write_atomic(self.path, ("\n".join(lines) + "\n").encode())
+        logger.info(f"Recorded {len(self.commands)} browser commands to {self.path}")
+
+
+class RecordingElement:
+    """Records the commands issued on an element."""
+
+    def __init__(self, element: WebElement, element_id: int, recorder: _Recorder) -> None:
+        self.element = element
+        self.element_id = element_id
+        self._recorder = recorder
+
+    def __getattr__(self, name: str) -> Any:
+        if name in PROPERTIES:
+            return self._recorder.call(f"element.{name}", self.element_id, lambda: getattr(self.element, name))
+        target = getattr(self.element, name)
+        if not callable(target):
+            return target
+        return lambda *args, **kwargs: self._recorder.call(f"element.{name}", self.element_id, target, *args, **kwargs)
+
+
+class RecordingDriver:
+    """Proxy around a browser that records every command into a trace file, saved on `quit()`."""
+
+    def __init__(self, driver: Browser, path: str) -> None:
+        """
+        Args:
+            driver: The real browser.
+            path: Trace file to write.
+        """
+        self.driver = driver
+        self._recorder = _Recorder(path)
+
+    @property
+    def commands(self) -> List[Dict[str, Any]]:
+        """Commands recorded so far."""
+        return self._recorder.commands
+
+    def __getattr__(self, name: str) -> Any:
+        if name in PROPERTIES:
+            return self._recorder.call(name, None, lambda: getattr(self.driver, name))
+        target = getattr(self.driver, name)
+        if not callable(target):
+            return target
+        return lambda *args, **kwargs: self._recorder.call(name, None, target, *args, **kwargs)
+
+    def quit(self) -> None:
+        """Quit the browser and save the trace."""
+        try:
+            self._recorder.call("quit", None, self.driver.quit)
+        finally:
+            try:
+                self._recorder.save()
+            except OSError as e:
+                logger.warning(f"Cannot save browser trace to {self._recorder.path}: {e}")
+
+
+def load_trace(path: str) -> List[Dict[str, Any]]:
+    """
+    Read the commands of a trace file.
+
+    Args:
+        path: Trace written by `RecordingDriver`.
+
+    Returns:
+        list: Recorded commands, in order.
+
+    Raises:
+        ValueError: If the file is not a supported trace.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        lines = [line for line in f if line.strip()]
+    if not lines:
+        raise ValueError(f"Empty browser trace: {path}")
+    header = json.loads(lines[0])
+    if header.get("version") != TRACE_VERSION:
+        raise ValueError(f"Unsupported browser trace version {header.get('version')!r} in {path}")
+    return [json.loads(line) for line in lines[1:]]
+
+
+class _Player:
+    """Serves recorded responses, keyed by command, element and arguments."""
+
+    def __init__(self, commands: List[Dict[str, Any]], time_scale: float) -> None:
+        self.time_scale = time_scale
+        self.replayed = 0
+        self._queues: Dict[Tuple[str, Optional[int], str], Deque[Dict[str, Any]]] = defaultdict(deque)
+        for entry in commands:
+            self._queues[_match_key(entry["command"], entry.get("element"), entry["args"])].append(entry)
+
+    def _serialize(self, value: Any) -> Any:
+        if isinstance(value, ReplayElement):
+            return {_ELEMENT_KEY: value.element_id}
+        if isinstance(value, dict):
+            return {str(k): self._serialize(v) for k, v in value.items()}
+        if isinstance(value, (list, tuple)):
+            return [self._serialize(v) for v in value]
+        if value is None or isinstance(value, (str, int, float, bool)):
+            return value
+        return repr(value)
+
+    def _materialize(self, value: Any) -> Any:
+        if isinstance(value, dict):
+            if set(value) == {_ELEMENT_KEY}:
+                return ReplayElement(value[_ELEMENT_KEY], self)
+            return {k: self._materialize(v) for k, v in value.items()}
+        if isinstance(value, list):
+            return [self._materialize(v) for v in value]
+        return value
+
+    def call(self, command: str, element: Optional[int], *args: Any) -> Any:
+        """Replay one command: wait for its recorded latency, then return or raise its recorded outcome."""
+        key = _match_key(command, element, redact(command, self._serialize(list(args))))
+        queue = self._queues.get(key)
+        if not queue:
+            raise ReplayError(f"Command not in trace: {command} {key[2]}")
+        entry = queue.popleft() if len(queue) > 1 else queue[0]
+        self.replayed += 1
+        if self.time_scale > 0:
+            time.sleep(entry.get("latency", 0.0) * self.time_scale)
+        error = entry.get("error")
+        if error is not None:
+            exception_type = getattr(selenium_exceptions, error["type"], None)
+            if not (isinstance(exception_type, type) and issubclass(exception_type, WebDriverException)):
+                exception_type = WebDriverException
+            raise exception_type(error["message"])
+        return self._materialize(entry.get("result"))
+
+
+class ReplayElement:
+    """Element of a replayed session."""
+
+    def __init__(self, element_id: int, player: _Player) -> None:
+        self.element_id = element_id
+        self._player = player
+
+    def __getattr__(self, name: str) -> Any:
+        if name in PROPERTIES:
+            return self._player.call(f"element.{name}", self.element_id)
+        return lambda *args: self._player.call(f"element.{name}", self.element_id, *args)
+
+
+class ReplayDriver:
+    """Plays a recorded session back in place of a browser."""
+
+    def __init__(self, commands: List[Dict[str, Any]], time_scale: float = 1.0) -> None:
+        """
+        Args:
+            commands: Recorded commands, see `load_trace`.
+            time_scale: Multiplier of recorded latencies: 1 is faithful, 0 replays instantly.
+        """
+        self._player = _Player(commands, time_scale)
+
+    @property
+    def replayed(self) -> int:
+        """Number of commands replayed so far."""
+        return self._player.replayed
+
+    def __getattr__(self, name: str) -> Any:
+        if name in PROPERTIES:
+            return self._player.call(name, None)
+        return lambda *args: self._player.call(name, None, *args)
+
+
+class ReplayEngine(BrowserEngine):
+    """Launches `ReplayDriver`s playing REPLAY_TRACE_FILE; selected with BROWSER_ENGINE=replay."""
+
+    name = "replay"
+
+    def __init__(self, trace_file: Optional[str] = None, time_scale: Optional[float] = None) -> None:
+        """
+        Args:
+            trace_file: Trace to play, defaults to REPLAY_TRACE_FILE.
+            time_scale: Multiplier of recorded latencies, defaults to REPLAY_TIME_SCALE.
+        """
+        trace_file = REPLAY_TRACE_FILE if trace_file is None else trace_file
+        if not trace_file:
+            raise ValueError("REPLAY_TRACE_FILE must be set for the replay browser engine")
+        self.commands = load_trace(trace_file)
+        self.time_scale = REPLAY_TIME_SCALE if time_scale is None else time_scale
+
+    def launch(self, headless: bool = True, lightweight: bool = True, proxy: Optional[ProxyEndpoint] = None) -> Browser:
+        return cast(Browser, ReplayDriver(self.commands, self.time_scale))
@@ -0,0 +1,270 @@
+"""
+Resource Accounting Module.
+
+Samples the browser process tree (geckodriver, Firefox and their content processes, or
+chromedriver and Chromium) from `/proc` while a refresh cycle runs, and records peak RSS,
+CPU time, process count and open file descriptors. After `driver.quit()` it warns about
+browser processes that survived the cycle.
+
+On systems without `/proc` the accounting is skipped.
+"""
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+from .logger import get_logger
+from .tracing import current_span
+
+logger = get_logger()
+
+PROC_ROOT = "/proc"
+PROC_AVAILABLE = os.path.isdir(os.path.join(PROC_ROOT, "self"))
+
+# Process names (from /proc/<pid>/comm) that belong to a browser session.
+BROWSER_PROCESS_NAMES = ("firefox", "geckodriver", "chrome", "chromedriver", "headless_shell")
+SAMPLE_INTERVAL = 0.5
+# Seconds a browser process may take to exit after `driver.quit()` before it counts as leaked.
+LEAK_GRACE_SECONDS = 2.0
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+_CLOCK_TICKS = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+
+
+class ProcessInfo(NamedTuple):
+    """Point-in-time view of one process."""
+
+    pid: int
+    ppid: int
+    name: str
+    state: str
+    rss_bytes: int
+    cpu_seconds: float
+
+
+def read_process(pid: int) -> Optional[ProcessInfo]:
+    """
+    Read a process from `/proc/<pid>/stat`.
+
+    Args:
+        pid: Process id.
+
+    Returns:
+        ProcessInfo | None: None if the process is gone or unreadable.
+    """
+    try:
+        with open(os.path.join(PROC_ROOT, str(pid), "stat"), "r", encoding="utf-8") as f:
+            stat = f.read()
+    except OSError:
+        return None
+
+    # The command name may contain spaces and parentheses, so split around the last ")".
+    name = stat[stat.find("(") + 1 : stat.rfind(")")]
+    fields = stat[stat.rfind(")") + 2 :].split()
+    utime, stime = int(fields[11]), int(fields[12])
+    return ProcessInfo(
+        pid=pid,
+        ppid=int(fields[1]),
+        name=name,
+        state=fields[0],
+        rss_bytes=int(fields[21]) * _PAGE_SIZE,
+        cpu_seconds=(utime + stime) / _CLOCK_TICKS,
+    )
+
+
+def open_fds(pid: int) -> int:
+    """Number of open file descriptors of a process, 0 if it cannot be inspected."""
+    try:
+        return len(os.listdir(os.path.join(PROC_ROOT, str(pid), "fd")))
+    except OSError:
+        return 0
+
+
+def descendants(root: Optional[int] = None) -> List[ProcessInfo]:
+    """
+    All live descendants of a process.
+
+    Args:
+        root: Process id, defaults to the current process.
+
+    Returns:
+        list: Descendant processes, zombies excluded.
+    """
+    if not PROC_AVAILABLE:
+        return []
+    root = os.getpid() if root is None else root
+
+    by_parent: Dict[int, List[ProcessInfo]] = {}
+    for entry in os.listdir(PROC_ROOT):
+        if entry.isdigit():
+            info = read_process(int(entry))
+            if info is not None:
+                by_parent.setdefault(info.ppid, []).append(info)
+
+    result: List[ProcessInfo] = []
+    pending = [root]
+    while pending:
+        for child in by_parent.get(pending.pop(), []):
+            pending.append(child.pid)
+            if child.state != "Z":
+                result.append(child)
+    return result
+
+
+def _is_browser(info: ProcessInfo, names: Sequence[str]) -> bool:
+    return any(name in info.name.lower() for name in names)
+
+
+def find_leaked_browsers(
+    root: Optional[int] = None, grace: float = LEAK_GRACE_SECONDS, names: Sequence[str] = BROWSER_PROCESS_NAMES
+) -> List[ProcessInfo]:
+    """
+    Browser processes still alive after the grace period.
+
+    Args:
+        root: Process whose descendants are checked, defaults to the current process.
+        grace: Seconds to wait for processes to exit.
+        names: Process name fragments that identify browser processes.
+
+    Returns:
+        list: Surviving browser processes.
+    """
+    deadline = time.monotonic() + grace
+    while True:
+        leaked = [info for info in descendants(root) if _is_browser(info, names)]
+        if not leaked or time.monotonic() >= deadline:
+            return leaked
+        time.sleep(0.1)
+
+
+@dataclass
+class CycleResources:
+    """Resource usage of the browser process tree during one refresh cycle."""
+
+    peak_rss_bytes: int = 0
+    cpu_seconds: float = 0.0
+    max_processes: int = 0
+    max_open_fds: int = 0
+    samples: int = 0
+    leaked: List[str] = field(default_factory=list)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize for logs and `/status`."""
+        return {**asdict(self), "cpu_seconds": round(self.cpu_seconds, 2)}
+
+    def summary(self) -> str:
+        """One-line human-readable summary."""
+        return (
+            f"peak RSS {self.peak_rss_bytes / 1024 / 1024:.1f} MiB, CPU {self.cpu_seconds:.2f}s, "
+            f"{self.max_processes} processes, {self.max_open_fds} open fds, {len(self.leaked)} leaked"
+        )
+
+
+class ResourceMonitor:
+    """Samples the descendants of a process in a background thread."""
+
+    def __init__(self, root: Optional[int] = None, interval: float = SAMPLE_INTERVAL) -> None:
+        """
+        Args:
+            root: Process whose descendants are sampled, defaults to the current process.
+            interval: Seconds between samples.
+        """
+        self.root = os.getpid() if root is None else root
+        self.interval = interval
+        self.usage = CycleResources()
+        self._cpu: Dict[int, float] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def sample(self) -> None:
+        """Take one sample and update the peaks."""
+        tree = descendants(self.root)
+        self.usage.samples += 1
+        self.usage.peak_rss_bytes = max(self.usage.peak_rss_bytes, sum(info.rss_bytes for info in tree))
+        self.usage.max_processes = max(self.usage.max_processes, len(tree))
+        self.usage.max_open_fds = max(self.usage.max_open_fds, sum(open_fds(info.pid) for info in tree))
+        # CPU time is cumulative per process; keep the last value seen, also for processes that exited since.
+        for info in tree:
+            self._cpu[info.pid] = max(self._cpu.get(info.pid, 0.0), info.cpu_seconds)
+        self.usage.cpu_seconds = sum(self._cpu.values())
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.sample()
+
+    def start(self) -> None:
+        """Start sampling in the background."""
+        if not PROC_AVAILABLE:
+            return
+        self.sample()
+        self._thread = threading.Thread(target=self._run, name="resource_monitor", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> CycleResources:
+        """Stop sampling and return the collected usage."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        return self.usage
+
+
+_LAST_CYCLE: Optional[CycleResources] = None
+_GENERATION = 0
+_LAST_CYCLE_LOCK = threading.Lock()
+
+
+def record_cycle(usage: CycleResources) -> None:
+    """Publish the usage of the latest refresh cycle."""
+    global _LAST_CYCLE, _GENERATION  # pylint: disable=global-statement
+
+    with _LAST_CYCLE_LOCK:
+        _LAST_CYCLE = usage
+        _GENERATION += 1
+
+
+def last_cycle() -> Tuple[int, Optional[CycleResources]]:
+    """
+    Return the latest refresh cycle usage.
+
+    Returns:
+        tuple: Generation counter, bumped on every recorded cycle, and the usage (None before the first cycle).
+    """
+    with _LAST_CYCLE_LOCK:
+        return _GENERATION, _LAST_CYCLE
+
+
+@contextmanager
+def track_resources(root: Optional[int] = None) -> Iterator[ResourceMonitor]:
+    """
+    Account the browser process tree for the duration of a block.
+
+    The block is expected to start and quit the browser. On exit, surviving browser
+    processes are reported, and the usage is logged, attached to the current trace span
+    and published for `/status`.
+
+    Args:
+        root: Process whose descendants are tracked, defaults to the current process.
+
+    Yields:
+        ResourceMonitor: The running monitor.
+    """
+    monitor = ResourceMonitor(root)
+    monitor.start()
+    try:
+        yield monitor
+    finally:
+        usage = monitor.stop()
+        if PROC_AVAILABLE:
+            leaked = find_leaked_browsers(monitor.root, LEAK_GRACE_SECONDS, BROWSER_PROCESS_NAMES)
+            usage.leaked = [f"{info.name}[{info.pid}]" for info in leaked]
+            if leaked:
+                logger.warning(f"Browser processes survived driver.quit(): {', '.join(usage.leaked)}")
+            logger.info(f"Refresh cycle resources: {usage.summary()}")
+            active = current_span()
+            if active is not None:
+                active.set_attribute("resources", usage.to_dict())
+            record_cycle(usage)
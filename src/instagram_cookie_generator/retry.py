@@ -5,6 +5,7 @@ Supports:
 - Exponential backoff
 - Cumulative delay limit
 - Detailed structured logging
+- A trace span per attempt
 """
 
 import functools
@@ -13,6 +14,8 @@ import random
 import time
 from typing import Any, Callable, Type, TypeVar, cast
 
+from .tracing import span
+
 logger = logging.getLogger(__name__)
 
 F = TypeVar("F", bound=Callable[..., Any])
@@ -62,7 +65,8 @@ def retry(  # pylint: disable=too-many-positional-arguments
 
             for attempt in range(1, max_attempts + 1):
                 try:
-                    return func(*args, **kwargs)
+                    with span(func.__name__, attempt=attempt, max_attempts=max_attempts):
+                        return func(*args, **kwargs)
                 except Exception as e:  # pylint: disable=broad-exception-caught
                     if on_exceptions is not None and not isinstance(e, on_exceptions):
                         raise
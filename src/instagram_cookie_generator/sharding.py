@@ -0,0 +1,196 @@
+"""
+Sharding Module.
+
+Spreads accounts over a fleet of generator nodes with consistent hashing, so each node
+runs the browser sessions of its shard only and a node joining or leaving moves only the
+accounts of the ring segments it takes or gives up (about 1/N of them).
+
+The fleet is described by CLUSTER_MEMBERS_FILE, one node per line, optionally followed
+by its base URL, which `/status/<account>` uses to redirect to the owner:
+
+    # node id    base url
+    gen-a        http://gen-a:5000
+    gen-b        http://gen-b:5000
+
+The file is re-read whenever it changes. Without it, the node owns every account.
+
+The cookie files of a node's shard are what its health endpoints, history and leader
+hand-over report on.
+"""
+
+import bisect
+import hashlib
+import os
+import threading
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .accounts import Account, get_accounts
+from .config import CLUSTER_MEMBERS_FILE, COOKIES_FILE, INSTAGRAM_ACCOUNTS_FILE, INSTAGRAM_USERNAME, NODE_ID
+from .logger import get_logger
+
+logger = get_logger()
+
+# Points per node on the ring; more points give a more even split.
+VIRTUAL_NODES = 128
+
+
+def _hash(key: str) -> int:
+    """Stable 64-bit position on the ring."""
+    return int.from_bytes(hashlib.sha1(key.encode()).digest()[:8], "big")
+
+
+class HashRing:
+    """Consistent hash ring over node ids."""
+
+    def __init__(self, nodes: Iterable[str], vnodes: int = VIRTUAL_NODES) -> None:
+        """
+        Args:
+            nodes: Node ids.
+            vnodes: Ring points per node.
+        """
+        self.nodes = sorted(set(nodes))
+        points = sorted((_hash(f"{node}#{i}"), node) for node in self.nodes for i in range(vnodes))
+        self._keys = [point for point, _ in points]
+        self._owners = [node for _, node in points]
+
+    def owner(self, key: str) -> Optional[str]:
+        """
+        Return the node owning a key.
+
+        Args:
+            key: Key to place, e.g. an account name.
+
+        Returns:
+            str | None: Owning node id, or None for an empty ring.
+        """
+        if not self._keys:
+            return None
+        index = bisect.bisect(self._keys, _hash(key)) % len(self._keys)
+        return self._owners[index]
+
+    def assign(self, keys: Iterable[str]) -> Dict[str, List[str]]:
+        """Group keys by owning node."""
+        shards: Dict[str, List[str]] = {node: [] for node in self.nodes}
+        for key in keys:
+            node = self.owner(key)
+            if node is not None:
+                shards[node].append(key)
+        return shards
+
+
+@dataclass(frozen=True)
+class Member:
+    """A generator node of the fleet."""
+
+    node_id: str
+    url: str = ""
+
+
+def load_members(path: str) -> List[Member]:
+    """
+    Parse a membership file.
+
+    Args:
+        path: File with one `node_id [base_url]` per line; `#` starts a comment.
+
+    Returns:
+        list: Members in file order.
+    """
+    members = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            parts = line.split("#", 1)[0].split()
+            if parts:
+                members.append(Member(parts[0], parts[1].rstrip("/") if len(parts) > 1 else ""))
+    return members
+
+
+class Cluster:
+    """This node's view of the fleet, reloaded when the membership file changes."""
+
+    def __init__(self, node_id: str = NODE_ID, members_file: str = CLUSTER_MEMBERS_FILE) -> None:
+        """
+        Args:
+            node_id: Id of this node, as listed in the membership file.
+            members_file: Membership file, or empty for a single-node fleet.
+        """
+        self.node_id = node_id
+        self.members_file = members_file
+        self._file_key: Optional[Tuple[int, int]] = None
+        self._members: Dict[str, Member] = {node_id: Member(node_id)}
+        self._ring = HashRing([node_id])
+        self._lock = threading.Lock()
+
+    def _reload(self) -> None:
+        if not self.members_file:
+            return
+        try:
+            st = os.stat(self.members_file)
+        except OSError as e:
+            logger.warning(f"Cannot read cluster members from {self.members_file}: {e}")
+            return
+        file_key = (st.st_mtime_ns, st.st_size)
+        if file_key == self._file_key:
+            return
+
+        members = load_members(self.members_file)
+        self._file_key = file_key
+        self._members = {member.node_id: member for member in members}
+        self._ring = HashRing(self._members)
+        if self.node_id not in self._members:
+            logger.warning(f"Node {self.node_id} is not listed in {self.members_file} and owns no accounts.")
+        logger.info(f"Cluster membership: {', '.join(self._members)}")
+
+    def owner(self, account: str) -> Optional[Member]:
+        """Return the member owning an account."""
+        with self._lock:
+            self._reload()
+            node = self._ring.owner(account)
+            return self._members.get(node) if node is not None else None
+
+    def owns(self, account: str) -> bool:
+        """True if this node is responsible for an account."""
+        owner = self.owner(account)
+        return owner is not None and owner.node_id == self.node_id
+
+    def shard(self, accounts: Sequence[Account]) -> List[Account]:
+        """Return the accounts this node refreshes."""
+        return [account for account in accounts if self.owns(account.username)]
+
+
+_CLUSTER: Optional[Cluster] = None
+_CLUSTER_LOCK = threading.Lock()
+
+
+def get_cluster() -> Cluster:
+    """Return the process-wide cluster view."""
+    global _CLUSTER  # pylint: disable=global-statement
+
+    with _CLUSTER_LOCK:
+        if _CLUSTER is None:
+            _CLUSTER = Cluster()
+        return _CLUSTER
+
+
+def shard_accounts(cookies_file: str = COOKIES_FILE) -> List[Account]:
+    """
+    Return the accounts whose cookie files this node keeps fresh.
+
+    With INSTAGRAM_ACCOUNTS_FILE, these are the accounts of this node's shard, each saved to
+    its own file. Otherwise it is the single account saved to `cookies_file`, which serve-only
+    replicas report on as well.
+
+    Args:
+        cookies_file: Cookies file of the single-account setup.
+
+    Returns:
+        list: Accounts, empty if none is assigned to this node.
+
+    Raises:
+        OSError: If the accounts file cannot be read.
+        ValueError: If the accounts file is malformed.
+    """
+    if not INSTAGRAM_ACCOUNTS_FILE:
+        return [Account(INSTAGRAM_USERNAME or "", "", cookies_file)]
+    return get_cluster().shard(get_accounts())
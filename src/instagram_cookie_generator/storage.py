@@ -0,0 +1,551 @@
+"""
+Cookie Storage Module.
+
+Defines the `Cookie` record, Netscape cookie file (de)serialization and pluggable cookie
+stores keyed by account:
+
+- `NetscapeFileStore`: one Netscape file per account (the historical format, yt-dlp compatible)
+- `SQLiteStore`: a SQLite database indexed by account, name and expiry
+- `MemoryStore`: process-local store, mostly for tests and ephemeral replicas
+
+Any store can export an account's jar as a Netscape file.
+"""
+
+import glob
+import mmap
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from .config import COOKIE_STORE_BACKEND, COOKIE_STORE_PATH, COOKIES_FILE
+from .logger import get_logger
+
+logger = get_logger()
+
+NETSCAPE_HEADER = (
+    "# Netscape HTTP Cookie File\n"
+    "# This file was generated by a script.\n"
+    "# http://curl.haxx.se/docs/http-cookies.html\n\n"
+)
+
+# Expiry assigned to session cookies that come without one.
+SESSION_COOKIE_TTL = 3600
+
+CookieKey = Tuple[str, str, str]
+
+# Process umask, applied to temporary files from `mkstemp`, which are created 0600.
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+# Tab-separated columns of a Netscape cookie file line.
+NETSCAPE_FIELDS = ("domain", "include_subdomains", "path", "secure", "expiry", "name", "value")
+# Bytes of the memory-mapped file copied at once by `scan_netscape`.
+SCAN_CHUNK_BYTES = 1024 * 1024
+
+
+@dataclass(frozen=True)
+class Cookie:
+    """A single browser cookie."""
+
+    domain: str
+    path: str
+    secure: bool
+    expiry: int
+    name: str
+    value: str
+
+    @property
+    def key(self) -> CookieKey:
+        """Identity of the cookie within a jar: (domain, path, name)."""
+        return self.domain, self.path, self.name
+
+    @classmethod
+    def from_webdriver(cls, cookie: Dict[str, Any]) -> "Cookie":
+        """Build a cookie from a Selenium `get_cookies()` entry."""
+        return cls(
+            domain=cookie["domain"],
+            path=cookie["path"],
+            secure=bool(cookie.get("secure", False)),
+            expiry=int(cookie.get("expiry", int(time.time()) + SESSION_COOKIE_TTL)),
+            name=cookie["name"],
+            value=cookie["value"],
+        )
+
+    def to_webdriver(self) -> Dict[str, Any]:
+        """Convert to the dictionary accepted by Selenium `add_cookie()`."""
+        return {
+            "domain": self.domain,
+            "path": self.path,
+            "secure": self.secure,
+            "expiry": self.expiry,
+            "name": self.name,
+            "value": self.value,
+        }
+
+    @classmethod
+    def from_netscape_line(cls, line: str) -> Optional["Cookie"]:
+        """
+        Parse a Netscape cookie file line.
+
+        Args:
+            line: Raw line from the file.
+
+        Returns:
+            Cookie | None: The cookie, or None for comments and blank lines.
+
+        Raises:
+            ValueError: If the line is not a valid cookie line.
+        """
+        if line.startswith("#") or not line.strip():
+            return None
+        domain, _, path, secure, expiry, name, value = line.strip().split("\t")
+        return cls(domain=domain, path=path, secure=secure == "TRUE", expiry=int(expiry), name=name, value=value)
+
+    @classmethod
+    def from_netscape_fields(cls, fields: Sequence[bytes]) -> "Cookie":
+        """
+        Build a cookie from the raw columns yielded by `scan_netscape`.
+
+        Args:
+            fields: All seven columns, in NETSCAPE_FIELDS order.
+
+        Returns:
+            Cookie: The parsed cookie.
+
+        Raises:
+            ValueError: If the expiry is not an integer or a column is not valid UTF-8.
+        """
+        domain, _, path, secure, expiry, name, value = fields
+        return cls(
+            domain=domain.decode(),
+            path=path.decode(),
+            secure=secure == b"TRUE",
+            expiry=int(expiry),
+            name=name.decode(),
+            value=value.decode(),
+        )
+
+    def to_netscape_line(self) -> str:
+        """Render the cookie as a Netscape cookie file line, without the trailing newline."""
+        flag = "TRUE" if self.domain.startswith(".") else "FALSE"
+        secure = "TRUE" if self.secure else "FALSE"
+        return f"{self.domain}\t{flag}\t{self.path}\t{secure}\t{self.expiry}\t{self.name}\t{self.value}"
+
+
+def scan_netscape(filename: str, fields: Sequence[str] = NETSCAPE_FIELDS) -> Iterator[Optional[Tuple[bytes, ...]]]:
+    """
+    Stream the data lines of a Netscape cookie file without loading it as Python strings.
+
+    The file is memory-mapped and scanned in line-aligned chunks of SCAN_CHUNK_BYTES, so
+    the whole file is never held in memory. Columns are returned as undecoded bytes and
+    only the requested ones are kept, so a health check reading expiries never decodes
+    cookie values.
+
+    Args:
+        filename: Path to the cookies file.
+        fields: Columns to extract, see NETSCAPE_FIELDS.
+
+    Yields:
+        tuple | None: Requested columns of each data line, or None for a line that does not
+            have exactly seven columns. Comments and blank lines are skipped.
+
+    Raises:
+        OSError: If the file cannot be opened.
+        ValueError: If an unknown column is requested.
+    """
+    indexes = [NETSCAPE_FIELDS.index(name) for name in fields]
+    with open(filename, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            size = len(mm)
+            pos = 0
+            while pos < size:
+                # Copy one line-aligned chunk at a time, so memory stays bounded for any file size.
+                end = mm.find(b"\n", min(pos + SCAN_CHUNK_BYTES, size))
+                end = size if end == -1 else end + 1
+                chunk = mm[pos:end]
+                pos = end
+                for line in chunk.splitlines():
+                    line = line.strip()
+                    if not line or line.startswith(b"#"):
+                        continue
+                    columns = line.split(b"\t")
+                    if len(columns) != len(NETSCAPE_FIELDS):
+                        yield None
+                        continue
+                    yield tuple(columns[i] for i in indexes)
+
+
+def iter_netscape(filename: str) -> Iterator[Cookie]:
+    """
+    Stream the valid cookies of a Netscape cookie file.
+
+    Invalid lines are logged and skipped.
+
+    Args:
+        filename: Path to the cookies file.
+
+    Yields:
+        Cookie: Cookies in file order.
+
+    Raises:
+        OSError: If the file cannot be opened.
+    """
+    for fields in scan_netscape(filename):
+        if fields is None:
+            logger.warning(f"Skipping invalid cookie line in {filename}: expected {len(NETSCAPE_FIELDS)} columns")
+            continue
+        try:
+            yield Cookie.from_netscape_fields(fields)
+        except ValueError as e:
+            logger.warning(f"Skipping invalid cookie line in {filename}: {e}")
+
+
+def read_netscape(filename: str) -> List[Cookie]:
+    """
+    Read all valid cookies from a Netscape cookie file.
+
+    Invalid lines are logged and skipped. A missing file yields an empty list.
+
+    Args:
+        filename: Path to the cookies file.
+
+    Returns:
+        list: Cookies in file order.
+    """
+    if not os.path.exists(filename):
+        return []
+    return list(iter_netscape(filename))
+
+
+def write_netscape(filename: str, cookies: Iterable[Cookie]) -> None:
+    """
+    Write cookies to a Netscape cookie file.
+
+    The file is written to a temporary sibling and renamed into place, so readers never
+    see a partially written jar.
+
+    Args:
+        filename: Path to the cookies file.
+        cookies: Cookies to write.
+    """
+    tmp_filename = f"{filename}.tmp"
+    try:
+        with open(tmp_filename, "w", encoding="utf-8") as f:
+            f.write(NETSCAPE_HEADER)
+            for cookie in cookies:
+                f.write(cookie.to_netscape_line() + "\n")
+        os.replace(tmp_filename, filename)
+    except BaseException:
+        if os.path.exists(tmp_filename):
+            os.unlink(tmp_filename)
+        raise
+
+
+def write_atomic(filename: str, data: bytes) -> None:
+    """
+    Write a file through a temporary sibling renamed into place, like `write_netscape`.
+
+    The temporary file has a unique name, so concurrent writers of the same file never
+    write into each other's temporary file.
+
+    Args:
+        filename: Destination path.
+        data: File contents.
+    """
+    fd, tmp_filename = tempfile.mkstemp(
+        dir=os.path.dirname(filename) or ".", prefix=f"{os.path.basename(filename)}.", suffix=".tmp"
+    )
+    try:
+        with os.fdopen(fd, "wb") as f:
+            os.fchmod(f.fileno(), 0o666 & ~_UMASK)
+            f.write(data)
+        os.replace(tmp_filename, filename)
+    except BaseException:
+        if os.path.exists(tmp_filename):
+            os.unlink(tmp_filename)
+        raise
+
+
+class CookieStore(ABC):
+    """Interface for cookie persistence keyed by account."""
+
+    @abstractmethod
+    def load(self, account: str) -> List[Cookie]:
+        """Return all cookies of an account."""
+
+    @abstractmethod
+    def save(self, account: str, cookies: Iterable[Cookie]) -> None:
+        """Replace the whole jar of an account."""
+
+    @abstractmethod
+    def upsert(self, account: str, cookies: Iterable[Cookie]) -> None:
+        """Insert or update individual cookies, matched by (domain, path, name)."""
+
+    @abstractmethod
+    def delete(self, account: str, keys: Iterable[CookieKey]) -> None:
+        """Remove individual cookies, matched by (domain, path, name)."""
+
+    @abstractmethod
+    def accounts(self) -> List[str]:
+        """Return all accounts with stored cookies."""
+
+    def query(
+        self, account: Optional[str] = None, name: Optional[str] = None, expires_before: Optional[int] = None
+    ) -> List[Tuple[str, Cookie]]:
+        """
+        Find cookies by account, name and expiry.
+
+        Args:
+            account: Only this account, if given.
+            name: Only cookies with this name, if given.
+            expires_before: Only cookies expiring before this Unix timestamp, if given.
+
+        Returns:
+            list: (account, cookie) pairs.
+        """
+        results = []
+        for acc in [account] if account is not None else self.accounts():
+            for cookie in self.load(acc):
+                if name is not None and cookie.name != name:
+                    continue
+                if expires_before is not None and cookie.expiry >= expires_before:
+                    continue
+                results.append((acc, cookie))
+        return results
+
+    def export_netscape(self, account: str, filename: str) -> None:
+        """
+        Export an account's jar as a Netscape cookie file (yt-dlp, gallery-dl, cURL).
+
+        Args:
+            account: Account to export.
+            filename: Destination file.
+        """
+        write_netscape(filename, self.load(account))
+
+
+def _merge(current: Iterable[Cookie], updates: Iterable[Cookie]) -> List[Cookie]:
+    """Merge cookie updates into a jar, keeping the jar order for existing cookies."""
+    merged: Dict[CookieKey, Cookie] = {c.key: c for c in current}
+    for cookie in updates:
+        merged[cookie.key] = cookie
+    return list(merged.values())
+
+
+class NetscapeFileStore(CookieStore):
+    """
+    Store each account's jar in its own Netscape cookie file.
+
+    `path_template` may contain an `{account}` placeholder. Without it, all accounts share
+    one file, which matches the single-account `COOKIES_FILE` deployment, and the stored
+    accounts cannot be listed.
+    """
+
+    def __init__(self, path_template: str = COOKIES_FILE) -> None:
+        self.path_template = path_template
+        self._lock = threading.Lock()
+
+    def path_for(self, account: str) -> str:
+        """Return the cookies file of an account."""
+        return self.path_template.format(account=account)
+
+    def load(self, account: str) -> List[Cookie]:
+        return read_netscape(self.path_for(account))
+
+    def save(self, account: str, cookies: Iterable[Cookie]) -> None:
+        with self._lock:
+            write_netscape(self.path_for(account), cookies)
+
+    def upsert(self, account: str, cookies: Iterable[Cookie]) -> None:
+        with self._lock:
+            filename = self.path_for(account)
+            write_netscape(filename, _merge(read_netscape(filename), cookies))
+
+    def delete(self, account: str, keys: Iterable[CookieKey]) -> None:
+        drop = set(keys)
+        with self._lock:
+            filename = self.path_for(account)
+            write_netscape(filename, [c for c in read_netscape(filename) if c.key not in drop])
+
+    def accounts(self) -> List[str]:
+        """Return the accounts whose files match the path template, also those saved before a restart."""
+        if "{account}" not in self.path_template:
+            return []
+        prefix, suffix = self.path_template.split("{account}", 1)
+        found = []
+        for path in glob.glob(glob.escape(prefix) + "*" + glob.escape(suffix)):
+            account = path[len(prefix) : len(path) - len(suffix)]
+            if account and self.path_for(account) == path:
+                found.append(account)
+        return sorted(found)
+
+
+class SQLiteStore(CookieStore):
+    """Store cookies in a SQLite database with indexes on account, name and expiry."""
+
+    _SCHEMA = (
+        """
+        CREATE TABLE IF NOT EXISTS cookies (
+            account TEXT NOT NULL,
+            domain TEXT NOT NULL,
+            path TEXT NOT NULL,
+            name TEXT NOT NULL,
+            value TEXT NOT NULL,
+            secure INTEGER NOT NULL,
+            expiry INTEGER NOT NULL,
+            PRIMARY KEY (account, domain, path, name)
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS cookies_name ON cookies (name)",
+        "CREATE INDEX IF NOT EXISTS cookies_expiry ON cookies (expiry)",
+    )
+    _COLUMNS = "account, domain, path, name, value, secure, expiry"
+
+    def __init__(self, path: str = COOKIE_STORE_PATH) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        for statement in self._SCHEMA:
+            self._conn.execute(statement)
+
+    @staticmethod
+    def _row(account: str, cookie: Cookie) -> Tuple[str, str, str, str, str, int, int]:
+        return account, cookie.domain, cookie.path, cookie.name, cookie.value, int(cookie.secure), cookie.expiry
+
+    @staticmethod
+    def _cookie(row: Tuple[Any, ...]) -> Cookie:
+        _, domain, path, name, value, secure, expiry = row
+        return Cookie(domain=domain, path=path, secure=bool(secure), expiry=expiry, name=name, value=value)
+
+    def _upsert_rows(self, account: str, cookies: Iterable[Cookie]) -> None:
+        self._conn.executemany(
+            f"INSERT OR REPLACE INTO cookies ({self._COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [self._row(account, c) for c in cookies],
+        )
+
+    def load(self, account: str) -> List[Cookie]:
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {self._COLUMNS} FROM cookies WHERE account = ? ORDER BY rowid", (account,)
+            ).fetchall()
+        return [self._cookie(row) for row in rows]
+
+    def save(self, account: str, cookies: Iterable[Cookie]) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("BEGIN")
+            self._conn.execute("DELETE FROM cookies WHERE account = ?", (account,))
+            self._upsert_rows(account, cookies)
+
+    def upsert(self, account: str, cookies: Iterable[Cookie]) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("BEGIN")
+            self._upsert_rows(account, cookies)
+
+    def delete(self, account: str, keys: Iterable[CookieKey]) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("BEGIN")
+            self._conn.executemany(
+                "DELETE FROM cookies WHERE account = ? AND domain = ? AND path = ? AND name = ?",
+                [(account, *key) for key in keys],
+            )
+
+    def accounts(self) -> List[str]:
+        with self._lock:
+            rows = self._conn.execute("SELECT DISTINCT account FROM cookies ORDER BY account").fetchall()
+        return [row[0] for row in rows]
+
+    def query(
+        self, account: Optional[str] = None, name: Optional[str] = None, expires_before: Optional[int] = None
+    ) -> List[Tuple[str, Cookie]]:
+        clauses, params = [], []
+        for clause, param in (("account = ?", account), ("name = ?", name), ("expiry < ?", expires_before)):
+            if param is not None:
+                clauses.append(clause)
+                params.append(param)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {self._COLUMNS} FROM cookies{where} ORDER BY account, rowid", params
+            ).fetchall()
+        return [(row[0], self._cookie(row)) for row in rows]
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+
+class MemoryStore(CookieStore):
+    """Keep cookies in process memory."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._jars: Dict[str, Dict[CookieKey, Cookie]] = {}
+
+    def load(self, account: str) -> List[Cookie]:
+        with self._lock:
+            return list(self._jars.get(account, {}).values())
+
+    def save(self, account: str, cookies: Iterable[Cookie]) -> None:
+        with self._lock:
+            self._jars[account] = {c.key: c for c in cookies}
+
+    def upsert(self, account: str, cookies: Iterable[Cookie]) -> None:
+        with self._lock:
+            jar = self._jars.setdefault(account, {})
+            for cookie in cookies:
+                jar[cookie.key] = cookie
+
+    def delete(self, account: str, keys: Iterable[CookieKey]) -> None:
+        with self._lock:
+            jar = self._jars.get(account, {})
+            for key in keys:
+                jar.pop(key, None)
+
+    def accounts(self) -> List[str]:
+        with self._lock:
+            return sorted(account for account, jar in self._jars.items() if jar)
+
+
+def create_store(backend: str = COOKIE_STORE_BACKEND) -> CookieStore:
+    """
+    Create a cookie store for the configured backend.
+
+    Args:
+        backend: One of "file", "sqlite" or "memory".
+
+    Returns:
+        CookieStore: The store instance.
+
+    Raises:
+        ValueError: If the backend is unknown.
+    """
+    if backend == "file":
+        return NetscapeFileStore(COOKIES_FILE)
+    if backend == "sqlite":
+        return SQLiteStore(COOKIE_STORE_PATH)
+    if backend == "memory":
+        return MemoryStore()
+    raise ValueError(f"Unknown cookie store backend: {backend}")
+
+
+_STORE: Optional[CookieStore] = None
+_STORE_LOCK = threading.Lock()
+
+
+def get_store() -> CookieStore:
+    """Return the process-wide cookie store for the configured backend."""
+    global _STORE  # pylint: disable=global-statement
+
+    with _STORE_LOCK:
+        if _STORE is None:
+            _STORE = create_store()
+        return _STORE
@@ -0,0 +1,172 @@
+"""
+Tracing Module.
+
+Lightweight spans for the refresh path: each refresh cycle is a root span with nested
+spans for retry attempts, browser launch, page loads, locator waits and login steps.
+Finished spans are kept in an in-memory ring buffer (queried by `/debug/traces`) and
+optionally appended to a local JSONL file, so no external collector is required. Opening
+and closing spans also counts as refresh worker progress for `/livez`.
+"""
+
+import json
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from typing import Any, Deque, Dict, Iterator, List, Optional
+
+from .config import TRACE_BUFFER_SIZE, TRACE_FILE
+from .heartbeat import get_heartbeat
+from .logger import get_logger
+
+logger = get_logger()
+
+
+@dataclass
+class Span:
+    """A timed operation within a trace."""
+
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str] = None
+    start: float = field(default_factory=time.time)
+    duration_ms: float = 0.0
+    status: str = "ok"
+    error: Optional[str] = None
+    attributes: Dict[str, Any] = field(default_factory=dict)
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        """Attach an attribute, e.g. an attempt number or locator group."""
+        self.attributes[key] = value
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize the span for export."""
+        return asdict(self)
+
+
+_CURRENT_SPAN: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+class Tracer:
+    """Collects finished spans into a ring buffer and an optional JSONL file."""
+
+    def __init__(self, path: Optional[str] = None, capacity: int = TRACE_BUFFER_SIZE) -> None:
+        """
+        Args:
+            path: JSONL file finished spans are appended to, or None to keep them in memory only.
+            capacity: Number of most recent spans kept in memory.
+        """
+        self.path = path
+        self._spans: Deque[Span] = deque(maxlen=max(1, capacity))
+        self._lock = threading.Lock()
+
+    def export(self, finished: Span) -> None:
+        """Store a finished span."""
+        with self._lock:
+            self._spans.append(finished)
+            if not self.path:
+                return
+            try:
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(finished.to_dict(), separators=(",", ":")) + "\n")
+            except OSError as e:
+                logger.warning(f"Cannot write trace span to {self.path}: {e}")
+
+    def spans(self) -> List[Span]:
+        """Finished spans in the ring buffer, oldest first."""
+        with self._lock:
+            return list(self._spans)
+
+    def traces(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """
+        Group buffered spans by trace.
+
+        Args:
+            limit: Maximum number of traces to return.
+
+        Returns:
+            list: Most recent traces first, each with its spans ordered by start time.
+        """
+        grouped: "OrderedDict[str, List[Span]]" = OrderedDict()
+        for finished in self.spans():
+            grouped.setdefault(finished.trace_id, []).append(finished)
+
+        result = []
+        for trace_id, spans in reversed(grouped.items()):
+            spans.sort(key=lambda s: s.start)
+            root = next((s for s in spans if s.parent_id is None), spans[0])
+            result.append(
+                {
+                    "trace_id": trace_id,
+                    "name": root.name,
+                    "start": root.start,
+                    "duration_ms": root.duration_ms,
+                    "status": root.status,
+                    "spans": [s.to_dict() for s in spans],
+                }
+            )
+            if len(result) >= limit:
+                break
+        return result
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Span]:
+    """
+    Trace a block as a child of the current span, or as a new root span.
+
+    Exceptions are recorded on the span and re-raised.
+
+    Args:
+        name: Span name, e.g. `browser.launch`.
+        **attributes: Initial span attributes.
+
+    Yields:
+        Span: The active span, to add attributes while it runs.
+    """
+    parent = _CURRENT_SPAN.get()
+    current = Span(
+        name=name,
+        trace_id=parent.trace_id if parent else os.urandom(16).hex(),
+        span_id=os.urandom(8).hex(),
+        parent_id=parent.span_id if parent else None,
+        attributes=dict(attributes),
+    )
+    token = _CURRENT_SPAN.set(current)
+    heartbeat = get_heartbeat()
+    heartbeat.progress(name)
+    started = time.perf_counter()
+    try:
+        yield current
+    except BaseException as e:
+        current.status = "error"
+        current.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        current.duration_ms = round((time.perf_counter() - started) * 1000, 3)
+        _CURRENT_SPAN.reset(token)
+        get_tracer().export(current)
+        heartbeat.progress(parent.name if parent else name)
+
+
+def current_span() -> Optional[Span]:
+    """Return the active span of the calling thread, if any."""
+    return _CURRENT_SPAN.get()
+
+
+_TRACER: Optional[Tracer] = None
+_TRACER_LOCK = threading.Lock()
+
+
+def get_tracer() -> Tracer:
+    """Return the process-wide tracer."""
+    global _TRACER  # pylint: disable=global-statement
+
+    with _TRACER_LOCK:
+        if _TRACER is None:
+            _TRACER = Tracer(TRACE_FILE or None)
+        return _TRACER
@@ -1,86 +1,301 @@
 """
 Flask server to expose a healthcheck endpoint for Instagram cookies.
+
+Response bodies are pre-serialized once per cookies file change; only the time-dependent
+`expires_in` value is spliced in per request.
 """
 
+import hmac
+import json
+import math
 import os
+import threading
 import time
 from datetime import UTC, datetime
 from importlib.metadata import version as dist_version
-from typing import Any, Dict, Tuple
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+from urllib.parse import quote
 
-from flask import Flask, Response, jsonify
+from flask import Flask, Response, jsonify, request
+from werkzeug.serving import make_server
 
-from .cookie_manager import COOKIES_FILE
+from .accounts import Account, find_account
+from .config import (
+    COOKIE_EXPORT_TOKEN,
+    COOKIES_FILE,
+    DEBUG_ENDPOINTS,
+    INSTAGRAM_ACCOUNTS_FILE,
+    SERVER_HOST,
+    SERVER_PORT,
+)
+from .export import FORMATS, get_exports
+from .heartbeat import get_heartbeat
+from .history import get_history
+from .journal import get_journal, redact_entry
+from .leader import leader_status
+from .lifecycle import get_lifecycle
 from .logger import get_logger
+from .profiler import ProfilerBusyError, sample
+from .proxies import get_proxy_pool
+from .ratelimit import get_governor
+from .resources import last_cycle
+from .sharding import get_cluster, shard_accounts
+from .storage import scan_netscape
+from .tracing import get_tracer
 
 logger = get_logger()
 
 app = Flask(__name__)
 
+_JSON_MIMETYPE = "application/json"
+_EXPIRES_IN_PLACEHOLDER = "__EXPIRES_IN__"
+_PROXIES_PLACEHOLDER = "__PROXIES__"
 
-def get_cookie_metadata() -> Dict[str, Any]:
+HEALTHY_BODY = json.dumps({"status": "healthy"}).encode()
+UNHEALTHY_BODY = json.dumps({"status": "unhealthy"}).encode()
+
+
+def _resolve_version() -> str:
+    """Resolve the installed package version, falling back to "unknown"."""
+    try:
+        return dist_version("instagram-cookie-generator")
+    except Exception as e:  # pylint: disable=broad-exception-caught
+        logger.warning(f"{type(e)} Cannot get package version: {e}")
+        return "unknown"
+
+
+PACKAGE_VERSION = _resolve_version()
+
+
+# Version of the cookie files a snapshot was built from: path and (mtime_ns, size) per file.
+FilesKey = Tuple[Tuple[str, Optional[Tuple[int, int]]], ...]
+
+
+class StatusSnapshot(NamedTuple):
     """
-    Extract metadata from the cookies file for status reporting.
+    Pre-serialized `/status` payload for one version of the cookie files.
 
-    Returns:
-        dict: Dictionary containing TTL, cookie count, names, expiry, etc.
+    `fresh_parts` and `stale_parts` are the JSON body split around the `expires_in` value and
+    the proxy pool state, which change with time and are rendered on every request.
     """
-    try:
-        if not os.path.exists(COOKIES_FILE) or os.path.getsize(COOKIES_FILE) == 0:
-            return {
-                "valid": False,
-                "cookie_count": 0,
-                "cookie_names": [],
-                "expires_in": 0,
-                "earliest_expiry": None,
-                "last_updated": None,
-            }
 
-        with open(COOKIES_FILE, "r", encoding="utf-8") as f:
-            lines = f.readlines()
+    file_key: Optional[FilesKey]
+    cycle_key: int
+    earliest_expiry: Optional[int]
+    fresh_parts: Tuple[bytes, bytes, bytes]
+    stale_parts: Tuple[bytes, bytes, bytes]
+
+
+_SNAPSHOT: Optional[StatusSnapshot] = None
+_SNAPSHOT_LOCK = threading.Lock()
+
 
-        cookies = [line.strip().split("\t") for line in lines if line.strip() and not line.startswith("#")]
+def _empty_metadata(cookie_count: int = 0, cookie_names: Optional[List[str]] = None) -> Dict[str, Any]:
+    """Metadata for a missing, empty or unparsable cookies file."""
+    return {
+        "valid": False,
+        "cookie_count": cookie_count,
+        "cookie_names": cookie_names or [],
+        "expires_in": 0,
+        "earliest_expiry": None,
+        "last_updated": None,
+    }
 
-        cookie_names = [c[5] for c in cookies if len(c) >= 7]
-        expiry_times = [int(c[4]) for c in cookies if len(c) >= 7]
+
+def _read_cookie_metadata(cookies_file: Optional[str] = None) -> Tuple[Dict[str, Any], Optional[int]]:
+    """
+    Parse the cookies file into status metadata.
+
+    Args:
+        cookies_file: File to read, defaults to COOKIES_FILE.
+
+    Returns:
+        tuple: Metadata dictionary and the earliest expiry as a Unix timestamp (None if unknown).
+    """
+    cookies_file = cookies_file or COOKIES_FILE
+    try:
+        if not os.path.exists(cookies_file) or os.path.getsize(cookies_file) == 0:
+            return _empty_metadata(), None
+
+        cookie_count = 0
+        cookie_names = []
+        expiry_times = []
+        for fields in scan_netscape(cookies_file, ("name", "expiry")):
+            cookie_count += 1
+            if fields is not None:
+                cookie_names.append(fields[0].decode())
+                expiry_times.append(int(fields[1]))
 
         now_ts = int(time.time())
         if not expiry_times:
-            return {
-                "valid": False,
-                "cookie_count": len(cookies),
-                "cookie_names": cookie_names,
-                "expires_in": 0,
-                "earliest_expiry": None,
-                "last_updated": None,
-            }
+            return _empty_metadata(cookie_count, cookie_names), None
 
         earliest_expiry = min(expiry_times)
         expires_in = max(0, earliest_expiry - now_ts)
 
-        mtime = os.path.getmtime(COOKIES_FILE)
+        mtime = os.path.getmtime(cookies_file)
         last_updated = datetime.fromtimestamp(mtime, UTC).isoformat()
 
         return {
             "valid": expires_in > 0,
-            "cookie_count": len(cookies),
+            "cookie_count": cookie_count,
             "cookie_names": cookie_names,
             "expires_in": expires_in,
             "earliest_expiry": datetime.fromtimestamp(earliest_expiry, UTC).isoformat(),
             "last_updated": last_updated,
-        }
+        }, earliest_expiry
 
     except Exception as e:  # pylint: disable=broad-exception-caught
         logger.exception(f"{type(e)}Failed to read or parse cookies file: {e}")
-        return {
-            "valid": False,
-            "cookie_count": 0,
-            "cookie_names": [],
-            "expires_in": 0,
-            "earliest_expiry": None,
-            "last_updated": None,
-            "error": str(e),
+        return {**_empty_metadata(), "error": str(e)}, None
+
+
+def get_cookie_metadata() -> Dict[str, Any]:
+    """
+    Extract metadata from the cookies file for status reporting.
+
+    Returns:
+        dict: Dictionary containing TTL, cookie count, names, expiry, etc.
+    """
+    return _read_cookie_metadata()[0]
+
+
+def _tracked_accounts() -> Tuple[List[Account], Optional[str]]:
+    """
+    Return the accounts whose cookie files `/status` and `/healthz` report on.
+
+    Returns:
+        tuple: This node's accounts (see `shard_accounts`), and the error if they cannot be loaded.
+    """
+    try:
+        return shard_accounts(COOKIES_FILE), None
+    except (OSError, ValueError) as e:
+        logger.warning(f"{type(e)}: Cannot load accounts: {e}")
+        return [], str(e)
+
+
+def _cookies_file_key(cookies_files: Sequence[str]) -> FilesKey:
+    """
+    Identify the current version of the cookie files by modification time and size.
+
+    Args:
+        cookies_files: Files to identify.
+
+    Returns:
+        tuple: Path and (mtime_ns, size) per file; None for files that cannot be stat-ed.
+    """
+    key: List[Tuple[str, Optional[Tuple[int, int]]]] = []
+    for cookies_file in cookies_files:
+        try:
+            st = os.stat(cookies_file)
+        except OSError:
+            key.append((cookies_file, None))
+            continue
+        key.append((cookies_file, (st.st_mtime_ns, st.st_size)))
+    return tuple(key)
+
+
+def _split_body(payload: Dict[str, Any]) -> Tuple[bytes, bytes, bytes]:
+    """Serialize a payload and split it around the `expires_in` and proxies placeholders."""
+    head, rest = json.dumps(payload).split(json.dumps(_EXPIRES_IN_PLACEHOLDER), 1)
+    middle, tail = rest.split(json.dumps(_PROXIES_PLACEHOLDER), 1)
+    return head.encode(), middle.encode(), tail.encode()
+
+
+def build_status_snapshot(
+    file_key: Optional[FilesKey], accounts: Optional[List[Account]] = None, error: Optional[str] = None
+) -> StatusSnapshot:
+    """
+    Parse the cookie files and pre-serialize both fresh and stale `/status` bodies.
+
+    With several accounts, the least fresh jar decides: a missing or unparsable one first, then
+    the earliest expiry; `accounts` in the body summarizes every jar. The bodies also carry the
+    resource usage of the latest refresh cycle.
+
+    Args:
+        file_key: Cookie files version the snapshot is built for.
+        accounts: Accounts to report on, defaults to this node's accounts.
+        error: Why the accounts could not be loaded, if they could not.
+
+    Returns:
+        StatusSnapshot: Serialized payload templates.
+    """
+    if accounts is None:
+        accounts, error = _tracked_accounts()
+    jars = [(account, *_read_cookie_metadata(account.cookies_file)) for account in accounts]
+    if jars:
+        _, cookie_info, earliest_expiry = min(jars, key=lambda jar: -1 if jar[2] is None else jar[2])
+    else:
+        cookie_info = {**_empty_metadata(), "error": error or "no accounts assigned to this node"}
+        earliest_expiry = None
+    summary = None
+    if INSTAGRAM_ACCOUNTS_FILE:
+        summary = {
+            account.username: {k: info[k] for k in ("cookie_count", "earliest_expiry", "last_updated")}
+            for account, info, _ in jars
         }
+    cycle_key, usage = last_cycle()
+
+    def render(fresh: bool) -> Tuple[bytes, bytes, bytes]:
+        return _split_body(
+            {
+                "fresh": fresh,
+                "message": "Cookies file found and valid." if fresh else "Cookies invalid or expired.",
+                "cookies": {**cookie_info, "valid": fresh, "expires_in": _EXPIRES_IN_PLACEHOLDER},
+                **({"accounts": summary} if summary is not None else {}),
+                "version": PACKAGE_VERSION,
+                "resources": usage.to_dict() if usage is not None else None,
+                "proxies": _PROXIES_PLACEHOLDER,
+            }
+        )
+
+    return StatusSnapshot(
+        file_key=file_key,
+        cycle_key=cycle_key,
+        earliest_expiry=earliest_expiry,
+        fresh_parts=render(True),
+        stale_parts=render(False),
+    )
+
+
+def get_status_snapshot() -> StatusSnapshot:
+    """
+    Return the cached status snapshot, rebuilding it if a cookies file or the accounts of
+    this node changed or a refresh cycle recorded new resource usage.
+
+    Returns:
+        StatusSnapshot: Snapshot matching the current cookie files.
+    """
+    global _SNAPSHOT  # pylint: disable=global-statement
+
+    accounts, error = _tracked_accounts()
+    file_key = None if error else _cookies_file_key([account.cookies_file for account in accounts])
+    key = (file_key, last_cycle()[0])
+    snapshot = _SNAPSHOT
+    if snapshot is not None and file_key is not None and (snapshot.file_key, snapshot.cycle_key) == key:
+        return snapshot
+
+    with _SNAPSHOT_LOCK:
+        snapshot = _SNAPSHOT
+        if snapshot is not None and file_key is not None and (snapshot.file_key, snapshot.cycle_key) == key:
+            return snapshot
+        _SNAPSHOT = build_status_snapshot(file_key, accounts, error)
+        return _SNAPSHOT
+
+
+def invalidate_status_snapshot() -> None:
+    """Drop the cached status snapshot so the next request re-reads the cookie files."""
+    global _SNAPSHOT  # pylint: disable=global-statement
+
+    with _SNAPSHOT_LOCK:
+        _SNAPSHOT = None
+
+
+def _expires_in(snapshot: StatusSnapshot) -> int:
+    """Seconds until the earliest cookie expiry, never negative."""
+    if snapshot.earliest_expiry is None:
+        return 0
+    return max(0, snapshot.earliest_expiry - int(time.time()))
 
 
 @app.route("/status", methods=["GET"])
@@ -91,51 +306,262 @@ def status() -> Tuple[Response, int]:
     Returns:
         JSON: Cookie health status and metadata.
     """
-    cookie_info = get_cookie_metadata()
-    status_code = 200 if cookie_info.get("valid") else 503
+    snapshot = get_status_snapshot()
+    expires_in = _expires_in(snapshot)
+    head, middle, tail = snapshot.fresh_parts if expires_in > 0 else snapshot.stale_parts
+    pool = get_proxy_pool()
+    proxies = json.dumps(pool.state() if pool is not None else None).encode()
+    body = b"".join((head, str(expires_in).encode(), middle, proxies, tail))
+    return Response(body, mimetype=_JSON_MIMETYPE), 200 if expires_in > 0 else 503
+
+
+@app.route("/healthz", methods=["GET"])
+def healthz() -> Tuple[Response, int]:
+    """
+    Minimal readiness probe.
+
+    Returns:
+        JSON: Up/down readiness probe.
+    """
+    if _expires_in(get_status_snapshot()) <= 0:
+        logger.warning("/healthz: cookies invalid or expired.")
+        return Response(UNHEALTHY_BODY, mimetype=_JSON_MIMETYPE), 503
+
+    logger.debug("/healthz: healthy")
+    return Response(HEALTHY_BODY, mimetype=_JSON_MIMETYPE), 200
+
+
+@app.route("/livez", methods=["GET"])
+def livez() -> Tuple[Response, int]:
+    """
+    Liveness probe: fails when the refresh worker is stuck or dead, independent of cookie validity.
+
+    Returns:
+        JSON: Worker stage and progress, 200 if alive, 503 otherwise.
+    """
+    state = get_heartbeat().status()
+    if not state["alive"]:
+        logger.warning(
+            f"/livez: refresh worker made no progress in {state['stage']} for {state['seconds_since_progress']}s."
+        )
+        return jsonify({"status": "stuck", **state}), 503
+    return jsonify({"status": "alive", **state}), 200
 
-    try:
-        pkg_version = dist_version("instagram-cookie-generator")
-    except Exception as e:  # pylint: disable=broad-exception-caught
-        logger.warning(f"{type(e)} Cannot get package version: {e}")
-        pkg_version = "unknown"
 
+@app.route("/status/journal", methods=["GET"])
+def status_journal() -> Tuple[Response, int]:
+    """
+    Recent cookie changes between refreshes, without cookie values.
+
+    Query parameters:
+        limit: Maximum number of journal entries (default 50).
+
+    Returns:
+        JSON: Journal entries and rotation counts per account and cookie.
+    """
+    limit = request.args.get("limit", default=50, type=int)
+    journal = get_journal()
     return (
         jsonify(
             {
-                "fresh": cookie_info.get("valid", False),
-                "message": (
-                    "Cookies file found and valid." if cookie_info.get("valid") else "Cookies invalid or expired."
-                ),
-                "cookies": cookie_info,
-                "version": pkg_version,
+                "entries": [redact_entry(entry) for entry in journal.recent(max(1, limit))],
+                "rotations": journal.rotation_counts(),
             }
         ),
-        status_code,
+        200,
     )
 
 
-@app.route("/healthz", methods=["GET"])
-def healthz() -> Tuple[Response, int]:
+@app.route("/status/history", methods=["GET"])
+def status_history() -> Tuple[Response, int]:
     """
-    Minimal readiness probe.
+    Cookie-health history: cookie count, earliest expiry and refresh durations and outcomes over time.
+
+    Query parameters:
+        since: Only the last N seconds (default: everything kept).
+        points: Maximum number of points; older history is downsampled into equal time buckets (default 200).
 
     Returns:
-        JSON: Up/down readiness probe.
+        JSON: Buffer capacity and size, bucket width and points, oldest first.
     """
-    cookie_info = get_cookie_metadata()
+    since = request.args.get("since", type=float)
+    points = request.args.get("points", default=200, type=int)
+    history = get_history().query(since=time.time() - since if since else None, max_points=points)
+    return jsonify(history), 200
 
-    if not cookie_info.get("valid") or cookie_info.get("expires_in", 0) < 0:
-        logger.warning("/healthz: cookies invalid or expired.")
-        return jsonify({"status": "unhealthy"}), 503
 
-    logger.debug("/healthz: healthy")
-    return jsonify({"status": "healthy"}), 200
+@app.route("/status/limits", methods=["GET"])
+def status_limits() -> Tuple[Response, int]:
+    """
+    Login rate limiter and concurrency governor state.
+
+    Returns:
+        JSON: Global and per-account token buckets and browser/login concurrency usage.
+    """
+    return jsonify(get_governor().state()), 200
+
+
+@app.route("/status/<account>", methods=["GET"])
+def status_account(account: str) -> Tuple[Response, int]:
+    """
+    Cookie health of one account, answered by the node owning the account's shard.
+
+    Args:
+        account: Instagram username.
+
+    Returns:
+        JSON: Account status (200/503) if this node owns it, a redirect to the owner (307) or a
+        hint naming the owner if its URL is unknown (421), 404 for an unknown account, or 503 if
+        the accounts cannot be loaded.
+    """
+    try:
+        configured = find_account(account)
+    except (OSError, ValueError) as e:
+        logger.warning(f"{type(e)}: Cannot load accounts: {e}")
+        return jsonify({"error": "accounts unavailable"}), 503
+    if configured is None:
+        return jsonify({"error": f"unknown account {account}"}), 404
+
+    cluster = get_cluster()
+    owner = cluster.owner(account)
+    if owner is None or owner.node_id != cluster.node_id:
+        hint = {"account": account, "owner": owner.node_id if owner else None, "url": None}
+        if owner is not None and owner.url:
+            hint["url"] = f"{owner.url}/status/{quote(account, safe='')}"
+            response = jsonify(hint)
+            response.headers["Location"] = hint["url"]
+            return response, 307
+        return jsonify(hint), 421
+
+    cookie_info, _ = _read_cookie_metadata(configured.cookies_file)
+    fresh = bool(cookie_info["valid"])
+    payload = {"account": account, "node": cluster.node_id, "fresh": fresh, "cookies": cookie_info}
+    return jsonify(payload), 200 if fresh else 503
+
+
+@app.route("/status/leader", methods=["GET"])
+def status_leader() -> Tuple[Response, int]:
+    """
+    Leader election state of the refresh worker.
+
+    Returns:
+        JSON: This node's id, the current lease holder, term and seconds until the lease expires.
+    """
+    return jsonify(leader_status()), 200
+
+
+@app.route("/debug/traces", methods=["GET"])
+def debug_traces() -> Tuple[Response, int]:
+    """
+    Recent refresh traces from the in-memory span buffer. Only available with DEBUG_ENDPOINTS enabled,
+    since spans carry account names, URLs and proxy addresses.
+
+    Query parameters:
+        limit: Maximum number of traces (default 20).
+
+    Returns:
+        JSON: Traces, most recent first, each with its spans; 404 if disabled.
+    """
+    if not DEBUG_ENDPOINTS:
+        return jsonify({"error": "debug endpoints are disabled"}), 404
+
+    limit = request.args.get("limit", default=20, type=int)
+    return jsonify({"traces": get_tracer().traces(max(1, limit))}), 200
+
+
+@app.route("/cookies/<view>.<extension>", methods=["GET"])
+def cookie_export(view: str, extension: str) -> Tuple[Response, int]:  # pylint: disable=too-many-return-statements
+    """
+    Serve a pre-rendered cookie export from memory, e.g. `/cookies/full.header`.
+
+    Requires `Authorization: Bearer <COOKIE_EXPORT_TOKEN>`; supports `If-None-Match`.
+
+    Query parameters:
+        account: Account whose jar to serve, defaults to the COOKIES_FILE jar; required with
+            INSTAGRAM_ACCOUNTS_FILE, where every account has its own jar.
+
+    Returns:
+        The export in its format; 400 without a required account, 401 without a valid token,
+        404 if disabled or unknown, 503 if the accounts cannot be loaded or COOKIE_VIEWS or
+        COOKIE_EXPORT_FORMATS is invalid.
+    """
+    if not COOKIE_EXPORT_TOKEN:
+        return jsonify({"error": "cookie exports are disabled"}), 404
+    token = request.headers.get("Authorization", "").removeprefix("Bearer ")
+    if not hmac.compare_digest(token.encode(), COOKIE_EXPORT_TOKEN.encode()):
+        return jsonify({"error": "unauthorized"}), 401
+
+    cookies_file = COOKIES_FILE
+    username = request.args.get("account")
+    if not username and INSTAGRAM_ACCOUNTS_FILE:
+        return jsonify({"error": "account parameter required with multiple accounts"}), 400
+    if username:
+        try:
+            account = find_account(username)
+        except (OSError, ValueError) as e:
+            logger.warning(f"{type(e)}: Cannot load accounts: {e}")
+            return jsonify({"error": "accounts unavailable"}), 503
+        if account is None:
+            return jsonify({"error": f"unknown account {username}"}), 404
+        cookies_file = account.cookies_file
+
+    try:
+        exports = get_exports().get(cookies_file)
+    except ValueError as e:
+        logger.error(f"Invalid cookie export configuration: {e}")
+        return jsonify({"error": "cookie exports are misconfigured"}), 503
+    body = exports.body(view, extension) if exports is not None else None
+    if exports is None or body is None:
+        return jsonify({"error": f"no export {view}.{extension}"}), 404
+
+    response = Response(body, mimetype=FORMATS[extension].mimetype)
+    response.set_etag(f"{exports.digest}-{view}-{extension}")
+    response.headers["Cache-Control"] = "no-store"
+    response.make_conditional(request)
+    return response, response.status_code
+
+
+@app.route("/debug/profile", methods=["GET"])
+def debug_profile() -> Tuple[Response, int]:
+    """
+    Sample all threads for a bounded window. Only available with DEBUG_ENDPOINTS enabled.
+
+    Query parameters:
+        seconds: Profiling window (default 5, capped).
+        format: `collapsed` (default) for flame graph tools, or `json` for a per-function summary.
+
+    Returns:
+        Collapsed stacks as text or a JSON summary; 400 on an invalid window, 404 if disabled, 409 if a profile
+        is already running.
+    """
+    if not DEBUG_ENDPOINTS:
+        return jsonify({"error": "debug endpoints are disabled"}), 404
+
+    seconds = request.args.get("seconds", default=5.0, type=float)
+    if not math.isfinite(seconds):
+        return jsonify({"error": "seconds must be a finite number"}), 400
+    try:
+        profile = sample(seconds)
+    except ProfilerBusyError as e:
+        return jsonify({"error": str(e)}), 409
+
+    logger.info(f"/debug/profile: {profile.samples} samples over {profile.seconds:.1f}s")
+    if request.args.get("format") == "json":
+        return jsonify(profile.to_dict()), 200
+    return Response(profile.collapsed(), mimetype="text/plain"), 200
 
 
 def start_server() -> None:
     """
-    Start the Flask web server.
+    Start the Flask web server and serve until a shutdown is requested.
+
+    The server runs in its own thread, so the main thread stays free to handle signals.
     """
     logger.info("Starting Flask server...")
-    app.run(host="0.0.0.0", port=5000)
+    server = make_server(SERVER_HOST, SERVER_PORT, app, threaded=True)
+    thread = threading.Thread(target=server.serve_forever, name="http_server", daemon=True)
+    thread.start()
+    get_lifecycle().wait_for_stop()
+    logger.info("Stopping Flask server...")
+    server.shutdown()
+    thread.join()
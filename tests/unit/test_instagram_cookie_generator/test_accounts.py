@@ -0,0 +1,44 @@
+"""
+Unit tests for accounts module.
+"""
+
+import json
+from pathlib import Path
+
+import pytest
+
+from instagram_cookie_generator.accounts import Account, load_accounts
+
+
+def test_load_accounts_from_file(tmp_path: Path) -> None:
+    """Test accounts and their cookies files are read from the JSON accounts file."""
+    path = tmp_path / "accounts.json"
+    path.write_text(
+        json.dumps(
+            [{"username": "alice", "password": "a"}, {"username": "bob", "password": "b", "cookies_file": "bob.txt"}]
+        ),
+        encoding="utf-8",
+    )
+
+    assert load_accounts(str(path)) == [
+        Account("alice", "a", "instagram_cookies.alice.txt"),
+        Account("bob", "b", "bob.txt"),
+    ]
+    assert "hunter2" not in repr(Account("x", "hunter2"))
+
+
+@pytest.mark.parametrize(
+    "content",
+    [
+        {"username": "alice", "password": "a"},
+        [{"username": "alice"}],
+        [{"username": "alice", "password": "a"}, {"username": "alice", "password": "b"}],
+    ],
+)
+def test_load_accounts_rejects_invalid_files(tmp_path: Path, content: object) -> None:
+    """Test malformed accounts files are rejected."""
+    path = tmp_path / "accounts.json"
+    path.write_text(json.dumps(content), encoding="utf-8")
+
+    with pytest.raises(ValueError):
+        load_accounts(str(path))
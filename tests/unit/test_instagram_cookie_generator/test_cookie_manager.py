@@ -17,6 +17,7 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.remote.webdriver import WebDriver
 
 import instagram_cookie_generator.cookie_manager as cm
+from instagram_cookie_generator import config
 from instagram_cookie_generator.cookie_manager import (
     _dismiss_cookie_banner,
     _find_first_element,
@@ -26,6 +27,7 @@ from instagram_cookie_generator.cookie_manager import (
     save_cookies,
     setup_browser,
 )
+from instagram_cookie_generator.locators import LocatorStats
 
 
 @pytest.fixture()
@@ -39,7 +41,7 @@ def mock_geckodriver_manager(monkeypatch: pytest.MonkeyPatch) -> MagicMock:
     """Fixture for mocking GeckoDriverManager."""
     manager = MagicMock()
     manager.install.return_value = "/path/to/geckodriver"
-    monkeypatch.setattr("instagram_cookie_generator.cookie_manager.GeckoDriverManager", lambda: manager)
+    monkeypatch.setattr("instagram_cookie_generator.browser.GeckoDriverManager", lambda: manager)
     return manager
 
 
@@ -48,8 +50,8 @@ def test_setup_browser_creates_driver(monkeypatch: pytest.MonkeyPatch, mock_geck
     del mock_geckodriver_manager
     driver_mock = MagicMock(spec=WebDriver)
     service_mock = MagicMock()
-    monkeypatch.setattr("instagram_cookie_generator.cookie_manager.Service", lambda *a, **kw: service_mock)
-    monkeypatch.setattr("instagram_cookie_generator.cookie_manager.webdriver.Firefox", lambda *a, **kw: driver_mock)
+    monkeypatch.setattr("instagram_cookie_generator.browser.FirefoxService", lambda *a, **kw: service_mock)
+    monkeypatch.setattr("instagram_cookie_generator.browser.webdriver.Firefox", lambda *a, **kw: driver_mock)
 
     driver = setup_browser()
     assert driver is not None
@@ -104,13 +106,32 @@ def test_save_cookies_writes_file(tmp_path: Path, mock_driver: MagicMock) -> Non
     assert "fake_value" in contents
 
 
+def test_save_cookies_drops_duplicates_and_expired(tmp_path: Path, mock_driver: MagicMock) -> None:
+    """Test save_cookies writes a deduplicated jar without expired cookies."""
+    expiry = int(time.time()) + 3600
+    mock_driver.get_cookies.return_value = [
+        {"domain": ".instagram.com", "path": "/", "expiry": expiry, "name": "csrftoken", "value": "a"},
+        {"domain": ".instagram.com", "path": "/", "expiry": expiry - 60, "name": "csrftoken", "value": "b"},
+        {"domain": ".instagram.com", "path": "/", "expiry": 1, "name": "rur", "value": "old"},
+    ]
+    cookies_file = tmp_path / "cookies.txt"
+
+    saved = save_cookies(mock_driver, str(cookies_file))
+
+    assert saved is not None
+    assert [(c.name, c.value) for c in saved] == [("csrftoken", "a")]
+    assert "rur" not in cookies_file.read_text(encoding="utf-8")
+
+
 def test_login_instagram_success(monkeypatch: pytest.MonkeyPatch, mock_driver: MagicMock) -> None:
     """Test login_instagram succeeds with valid username and password fields."""
     mock_username = MagicMock()
     mock_password = MagicMock()
 
-    def fake_find_first_element(driver: Any, locators: Any, wait_seconds: int = 15) -> MagicMock:  # noqa: ARG001
-        del wait_seconds, driver
+    def fake_find_first_element(
+        driver: Any, locators: Any, wait_seconds: int = 15, group: Any = None
+    ) -> MagicMock:  # noqa: ARG001
+        del wait_seconds, driver, group
         selector_values = [value for _, value in locators]
         if any("username" in value for value in selector_values):
             return mock_username
@@ -184,22 +205,65 @@ def test_find_first_element_returns_first_available() -> None:
     assert result is found_mock
 
 
+def test_find_first_element_batched_records_hit(monkeypatch: pytest.MonkeyPatch) -> None:
+    """_find_first_element should resolve candidates in one script call and learn the hit."""
+    stats = LocatorStats()
+    monkeypatch.setattr(cm, "get_locator_stats", lambda: stats)
+    driver = MagicMock(spec=WebDriver)
+    found_mock = MagicMock(name="found")
+    driver.execute_script.return_value = [1, found_mock]
+
+    result = _find_first_element(driver, [("css selector", "first"), ("name", "second")], wait_seconds=1, group="g")
+
+    assert result is found_mock
+    driver.find_element.assert_not_called()
+    assert stats.order("g", [("css selector", "first"), ("name", "second")])[0] == ("name", "second")
+
+
+def test_find_first_element_does_not_write_stats_file(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Lookups only record hit rates in memory; the stats file is written once per refresh."""
+    stats = LocatorStats(str(tmp_path / "stats.json"))
+    monkeypatch.setattr(cm, "get_locator_stats", lambda: stats)
+    driver = MagicMock(spec=WebDriver)
+    driver.execute_script.return_value = [0, MagicMock(name="found")]
+
+    for _ in range(3):
+        _find_first_element(driver, [("css selector", "first")], wait_seconds=1, group="g")
+
+    assert not (tmp_path / "stats.json").exists()
+    stats.save()
+    assert (tmp_path / "stats.json").exists()
+
+
 def test_cookie_manager_smoke(monkeypatch: pytest.MonkeyPatch) -> None:
-    """Test cookie_manager main flow does not crash under mocks."""
+    """Test cookie_manager main flow does not crash under mocks and reserves its login before the browser."""
     # Patch env FIRST
     monkeypatch.setitem(os.environ, "INSTAGRAM_USERNAME", "dummyuser")
     monkeypatch.setitem(os.environ, "INSTAGRAM_PASSWORD", "dummypass")
 
-    # Reload the module to pick up env
+    # Reload the modules to pick up env
+    importlib.reload(config)
     importlib.reload(cm)
 
     driver = MagicMock(spec=WebDriver)
-    monkeypatch.setattr(cm, "setup_browser", lambda: driver)
+    governor = MagicMock()
+    monkeypatch.setattr(cm, "get_governor", lambda: governor)
+
+    def setup_browser(**_kwargs: Any) -> MagicMock:
+        governor.login_reservation.assert_called_once_with("dummyuser")
+        governor.browser_slot.return_value.__enter__.assert_called_once()
+        return driver
+
+    monkeypatch.setattr(cm, "setup_browser", setup_browser)
     monkeypatch.setattr(cm, "load_cookies", lambda _driver, _file: None)
-    monkeypatch.setattr(cm, "save_cookies", lambda _driver, _file: None)
+    monkeypatch.setattr(cm, "save_cookies", lambda _driver, _file: [])
     monkeypatch.setattr(cm, "already_logged_in", lambda _driver: True)
+    monkeypatch.setattr(cm, "get_exports", MagicMock)
+    stats = MagicMock()
+    monkeypatch.setattr(cm, "get_locator_stats", lambda: stats)
 
     cm.cookie_manager()
+    stats.save.assert_called_once()
 
 
 def test_load_cookies_failure(monkeypatch: pytest.MonkeyPatch, mock_driver: MagicMock) -> None:
@@ -211,4 +275,78 @@ def test_load_cookies_failure(monkeypatch: pytest.MonkeyPatch, mock_driver: Magi
 def test_save_cookies_failure(monkeypatch: pytest.MonkeyPatch, mock_driver: MagicMock) -> None:
     """Test save_cookies handles file write error."""
     monkeypatch.setattr("builtins.open", lambda *args, **kwargs: (_ for _ in ()).throw(OSError("fail")))
-    save_cookies(mock_driver, "dummy_path")
+    assert save_cookies(mock_driver, "dummy_path") is None
+
+
+def test_persist_cookies_updates_store_incrementally(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test the store is the previous jar with a non-file backend and only receives changed cookies."""
+    # pylint: disable=import-outside-toplevel
+    from instagram_cookie_generator.accounts import Account
+    from instagram_cookie_generator.journal import CookieJournal
+    from instagram_cookie_generator.storage import Cookie, MemoryStore
+
+    session = Cookie(".instagram.com", "/", True, 2_000_000_000, "sessionid", "s1")
+    csrf = Cookie(".instagram.com", "/", True, 2_000_000_000, "csrftoken", "c1")
+    rotated = Cookie(".instagram.com", "/", True, 2_000_000_000, "sessionid", "s2")
+    store = MagicMock(wraps=MemoryStore())
+    journal = CookieJournal()
+    jars = [[session, csrf], [rotated]]
+    monkeypatch.setattr(cm, "save_cookies", lambda _driver, _file: jars.pop(0))
+    monkeypatch.setattr(cm, "get_journal", lambda: journal)
+    monkeypatch.setattr(cm, "get_exports", MagicMock)
+    monkeypatch.setattr(cm, "get_store", lambda: store)
+    monkeypatch.setattr(cm, "COOKIE_STORE_BACKEND", "memory")
+    account = Account("alice", "pass", str(tmp_path / "missing.txt"))
+
+    cm.persist_cookies(MagicMock(), account)
+    store.save.assert_called_once_with("alice", [session, csrf])
+    assert cm.stored_cookies(account) == [session, csrf]
+
+    cm.persist_cookies(MagicMock(), account)
+    store.save.assert_called_once()
+    store.upsert.assert_called_once_with("alice", [rotated])
+    store.delete.assert_called_once_with("alice", [csrf.key])
+    assert store.load("alice") == [rotated]
+    assert journal.recent()[-1]["removed"][0]["name"] == "csrftoken"
+
+
+def test_persist_cookies_skips_journal_when_save_fails(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test nothing is journaled, exported or stored for a jar that was not written."""
+    # pylint: disable=import-outside-toplevel
+    from instagram_cookie_generator.accounts import Account
+
+    monkeypatch.setattr(cm, "save_cookies", lambda _driver, _file: None)
+    journal, exports, store = MagicMock(), MagicMock(), MagicMock()
+    monkeypatch.setattr(cm, "get_journal", lambda: journal)
+    monkeypatch.setattr(cm, "get_exports", lambda: exports)
+    monkeypatch.setattr(cm, "get_store", lambda: store)
+    monkeypatch.setattr(cm, "COOKIE_STORE_BACKEND", "sqlite")
+
+    cm.persist_cookies(MagicMock(), Account("user", "pass", str(tmp_path / "cookies.txt")))
+
+    journal.record.assert_not_called()
+    exports.publish.assert_not_called()
+    store.save.assert_not_called()
+
+
+def test_persist_cookies_survives_export_failure(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test a failing export does not fail the refresh once the jar is saved."""
+    # pylint: disable=import-outside-toplevel
+    from instagram_cookie_generator.accounts import Account
+
+    saved: list[Any] = []
+
+    def save_cookies(_driver: Any, file: str) -> list[Any]:
+        saved.append(file)
+        return []
+
+    monkeypatch.setattr(cm, "save_cookies", save_cookies)
+    monkeypatch.setattr(cm, "get_journal", MagicMock)
+    exports = MagicMock()
+    exports.publish.side_effect = ValueError("Unknown cookie view: 'typo'")
+    monkeypatch.setattr(cm, "get_exports", lambda: exports)
+
+    cm.persist_cookies(MagicMock(), Account("user", "pass", str(tmp_path / "cookies.txt")))
+
+    assert saved == [str(tmp_path / "cookies.txt")]
+    exports.publish.assert_called_once()
@@ -0,0 +1,169 @@
+"""
+Unit tests for export module.
+"""
+
+import importlib
+import json
+import os
+from pathlib import Path
+
+import pytest
+from pytest_mock import MockerFixture
+
+from instagram_cookie_generator import config
+from instagram_cookie_generator.export import (
+    BUILTIN_VIEWS,
+    FORMATS,
+    CookieView,
+    ExportCache,
+    dedupe_cookies,
+    drop_expired,
+    export_path,
+    export_views,
+    parse_formats,
+    parse_views,
+    prepare_jar,
+    render_header,
+    render_json,
+    view_path,
+)
+from instagram_cookie_generator.storage import Cookie, read_netscape, write_netscape
+
+SESSION = Cookie(".instagram.com", "/", True, 2_000_000_000, "sessionid", "s1")
+CSRF = Cookie(".instagram.com", "/", True, 1_900_000_000, "csrftoken", "c1")
+MID = Cookie(".instagram.com", "/", True, 1_900_000_000, "mid", "m1")
+
+
+def test_dedupe_cookies_keeps_latest_expiry() -> None:
+    """Test duplicates of the same (domain, path, name) collapse to the later-expiring one."""
+    renewed = Cookie(".instagram.com", "/", True, 1_950_000_000, "csrftoken", "c2")
+
+    assert dedupe_cookies([CSRF, SESSION, renewed, SESSION]) == [renewed, SESSION]
+
+
+def test_dedupe_cookies_keeps_host_only_and_domain_wide() -> None:
+    """Test a host-only www cookie never replaces the domain-wide cookie of the same name."""
+    domain_wide = Cookie(".instagram.com", "/", True, 2_000_000_000, "csrftoken", "DOMAINWIDE")
+    host_only = Cookie("www.instagram.com", "/", True, 2_000_000_100, "csrftoken", "HOSTONLY")
+
+    assert dedupe_cookies([domain_wide, host_only]) == [domain_wide, host_only]
+
+
+def test_default_export_format_is_netscape_only(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test JSON and header copies of the session cookies are only written when configured."""
+    monkeypatch.delenv("COOKIE_EXPORT_FORMATS", raising=False)
+    importlib.reload(config)
+
+    assert parse_formats(config.COOKIE_EXPORT_FORMATS) == [FORMATS["txt"]]
+
+
+def test_drop_expired() -> None:
+    """Test cookies expiring at or before now are dropped."""
+    assert drop_expired([SESSION, CSRF], now=1_900_000_000) == [SESSION]
+    assert prepare_jar([SESSION, SESSION, CSRF], now=0) == [SESSION, CSRF]
+
+
+def test_parse_views() -> None:
+    """Test built-in, custom and wildcard views."""
+    views = parse_views("minimal; bots=sessionid, csrftoken ;everything=*")
+
+    assert views[0] is BUILTIN_VIEWS["minimal"]
+    assert views[1] == CookieView("bots", frozenset({"sessionid", "csrftoken"}))
+    assert views[2].names is None
+    assert not parse_views("")
+
+    with pytest.raises(ValueError):
+        parse_views("unknown")
+    with pytest.raises(ValueError):
+        parse_views("=sessionid")
+
+
+def test_export_views_writes_one_file_per_view(tmp_path: Path) -> None:
+    """Test each view lands in its own Netscape file next to the main jar."""
+    base = tmp_path / "instagram_cookies.txt"
+
+    written = export_views([SESSION, CSRF, MID], parse_views("minimal;full"), str(base))
+
+    assert written == {
+        "minimal": str(tmp_path / "instagram_cookies.minimal.txt"),
+        "full": str(tmp_path / "instagram_cookies.full.txt"),
+    }
+    assert read_netscape(written["minimal"]) == [SESSION, CSRF]
+    assert read_netscape(written["full"]) == [SESSION, CSRF, MID]
+    assert view_path(CookieView("x"), "cookies") == "cookies.x.txt"
+
+
+def test_render_formats() -> None:
+    """Test the JSON and Cookie header renderings."""
+    assert render_header([SESSION, CSRF]) == b"Cookie: sessionid=s1; csrftoken=c1\n"
+    assert json.loads(render_json([SESSION])) == [
+        {
+            "name": "sessionid",
+            "value": "s1",
+            "domain": ".instagram.com",
+            "path": "/",
+            "secure": True,
+            "expires": 2_000_000_000,
+        }
+    ]
+
+
+def test_parse_formats() -> None:
+    """Test format lists and unknown formats."""
+    assert parse_formats(" TXT, json ") == [FORMATS["txt"], FORMATS["json"]]
+    with pytest.raises(ValueError):
+        parse_formats("xml")
+
+
+def test_export_path() -> None:
+    """Test the main jar keeps its file for Netscape and views get a suffix."""
+    minimal = BUILTIN_VIEWS["minimal"]
+
+    assert export_path(None, FORMATS["txt"], "cookies.txt") == "cookies.txt"
+    assert export_path(None, FORMATS["header"], "cookies.txt") == "cookies.header"
+    assert export_path(minimal, FORMATS["txt"], "cookies.txt") == "cookies.minimal.txt"
+    assert export_path(minimal, FORMATS["json"], "cookies.txt") == "cookies.minimal.json"
+
+
+def test_export_cache_publish_renders_once_per_change(tmp_path: Path, mocker: MockerFixture) -> None:
+    """Test exports are written for every view and format, and not re-rendered for an unchanged jar."""
+    base = tmp_path / "instagram_cookies.txt"
+    cache = ExportCache(parse_views("minimal"), parse_formats("txt,json,header"))
+    write_netscape(str(base), [SESSION, CSRF, MID])
+
+    rendered = cache.publish([SESSION, CSRF, MID], str(base))
+
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        "instagram_cookies.header",
+        "instagram_cookies.json",
+        "instagram_cookies.minimal.header",
+        "instagram_cookies.minimal.json",
+        "instagram_cookies.minimal.txt",
+        "instagram_cookies.txt",
+    ]
+    assert (tmp_path / "instagram_cookies.minimal.header").read_bytes() == b"Cookie: sessionid=s1; csrftoken=c1\n"
+    assert rendered.body("full", "txt") == base.read_bytes()
+    assert rendered.body("minimal", "xml") is None
+
+    render = mocker.patch("instagram_cookie_generator.export.render_exports")
+    again = cache.publish([SESSION, CSRF, MID], str(base))
+    render.assert_not_called()
+    assert again.bodies is rendered.bodies
+
+
+def test_export_cache_get_renders_from_disk(tmp_path: Path) -> None:
+    """Test a jar that was not published in this process, or changed on disk, is rendered from the file."""
+    base = tmp_path / "instagram_cookies.txt"
+    cache = ExportCache([], parse_formats("header"))
+    assert cache.get(str(base)) is None
+
+    write_netscape(str(base), [SESSION])
+    first = cache.get(str(base))
+    assert first is not None and first.body("full", "header") == b"Cookie: sessionid=s1\n"
+    assert cache.get(str(base)) is first
+
+    write_netscape(str(base), [SESSION, CSRF])
+    os.utime(base, ns=(0, 0))
+    second = cache.get(str(base))
+    assert second is not None and second.body("full", "header") == b"Cookie: sessionid=s1; csrftoken=c1\n"
+    assert not list(tmp_path.glob("*.header"))
@@ -0,0 +1,122 @@
+"""
+Unit tests for heartbeat module.
+"""
+
+import threading
+import time
+
+import pytest
+
+from instagram_cookie_generator.heartbeat import Heartbeat, get_heartbeat
+
+
+def _advance(monkeypatch: pytest.MonkeyPatch, seconds: float) -> None:
+    """Move the monotonic clock forward."""
+    now = time.monotonic() + seconds
+    monkeypatch.setattr("instagram_cookie_generator.heartbeat.time.monotonic", lambda: now)
+
+
+def test_heartbeat_alive_without_worker() -> None:
+    """Test that no attached worker is reported as alive, e.g. during startup."""
+    state = Heartbeat(deadline=1).status()
+
+    assert state["alive"] is True
+    assert state["worker"] == "none"
+
+
+def test_heartbeat_stuck_after_deadline(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that a worker without progress past the deadline is reported as stuck in its stage."""
+    heartbeat = Heartbeat(deadline=60)
+    heartbeat.attach()
+    heartbeat.beat("navigate")
+    assert heartbeat.status()["alive"] is True
+
+    _advance(monkeypatch, 61)
+    state = heartbeat.status()
+
+    assert state["alive"] is False
+    assert state["stage"] == "navigate"
+    assert state["seconds_since_progress"] >= 61
+
+
+def test_heartbeat_idle_extends_deadline(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that planned waits do not count against the deadline, but overrunning them does."""
+    heartbeat = Heartbeat(deadline=60)
+    heartbeat.attach()
+    heartbeat.idle(3600)
+
+    _advance(monkeypatch, 3000)
+    assert heartbeat.status()["alive"] is True
+    assert heartbeat.status()["idle"] is True
+
+    _advance(monkeypatch, 3661)
+    assert heartbeat.status()["alive"] is False
+
+
+def test_heartbeat_open_ended_idle(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that an open-ended wait, such as following a leader, never expires."""
+    heartbeat = Heartbeat(deadline=60)
+    heartbeat.attach()
+    heartbeat.idle(None, "following")
+
+    _advance(monkeypatch, 86400)
+
+    assert heartbeat.status()["alive"] is True
+    assert heartbeat.status()["stage"] == "following"
+
+
+def test_heartbeat_dead_worker() -> None:
+    """Test that a worker thread that exited is reported as not alive."""
+    heartbeat = Heartbeat(deadline=60)
+    worker = threading.Thread(target=heartbeat.attach)
+    worker.start()
+    worker.join()
+
+    state = heartbeat.status()
+
+    assert state["alive"] is False
+    assert state["worker"] == "stopped"
+
+
+def test_heartbeat_progress_only_from_worker() -> None:
+    """Test that spans from other threads (e.g. request handlers) do not count as worker progress."""
+    heartbeat = Heartbeat(deadline=60)
+    heartbeat.attach()
+    heartbeat.beat("navigate")
+
+    other = threading.Thread(target=heartbeat.progress, args=("http.request",))
+    other.start()
+    other.join()
+    assert heartbeat.status()["stage"] == "navigate"
+
+    heartbeat.progress("cookies.save")
+    assert heartbeat.status()["stage"] == "cookies.save"
+
+
+def test_heartbeat_cycles() -> None:
+    """Test cycle counters."""
+    heartbeat = Heartbeat()
+    heartbeat.cycle_started(1)
+    heartbeat.cycle_finished()
+
+    state = heartbeat.status()
+
+    assert state["cycle"] == 1
+    assert state["cycles_completed"] == 1
+    assert state["last_cycle_finished"] is not None
+
+
+def test_tracing_spans_count_as_progress() -> None:
+    """Test that spans opened by the attached worker record progress."""
+    # pylint: disable=import-outside-toplevel
+    from instagram_cookie_generator.tracing import span
+
+    heartbeat = get_heartbeat()
+    heartbeat.attach()
+    with span("navigate"):
+        assert heartbeat.status()["stage"] == "navigate"
+    assert heartbeat.status()["stage"] == "navigate"
+    with span("refresh_cycle"):
+        with span("browser.launch"):
+            pass
+        assert heartbeat.status()["stage"] == "refresh_cycle"
@@ -0,0 +1,137 @@
+"""
+Unit tests for history module.
+"""
+
+import threading
+from pathlib import Path
+
+import pytest
+
+from instagram_cookie_generator import history as history_module
+from instagram_cookie_generator.accounts import Account
+from instagram_cookie_generator.history import History, HistorySampler, jar_stats
+from instagram_cookie_generator.storage import Cookie, write_netscape
+
+
+def test_jar_stats(tmp_path: Path) -> None:
+    """Test the cookie count and earliest expiry of a cookies file."""
+    cookies_file = tmp_path / "cookies.txt"
+    write_netscape(
+        str(cookies_file),
+        [
+            Cookie(".instagram.com", "/", True, 2_000_000_000, "sessionid", "s"),
+            Cookie(".instagram.com", "/", True, 1_900_000_000, "csrftoken", "c"),
+        ],
+    )
+
+    assert jar_stats(str(cookies_file)) == (2, 1_900_000_000)
+    assert jar_stats(str(tmp_path / "missing.txt")) == (0, 0)
+
+
+def test_history_samples_shard_jars(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test samples cover the jars of every account of this node."""
+    alice, bob = tmp_path / "alice.txt", tmp_path / "bob.txt"
+    write_netscape(str(alice), [Cookie(".instagram.com", "/", True, 2_000_000_000, "sessionid", "s")])
+    write_netscape(
+        str(bob),
+        [
+            Cookie(".instagram.com", "/", True, 1_900_000_000, "sessionid", "s"),
+            Cookie(".instagram.com", "/", True, 2_100_000_000, "csrftoken", "c"),
+        ],
+    )
+    shard = [Account("alice", "", str(alice)), Account("bob", "", str(bob))]
+    monkeypatch.setattr(history_module, "shard_accounts", lambda: shard)
+    history = History(path="")
+
+    history.sample()
+    history.record_cycle(12.5, ok=True)
+
+    points = history.query()["points"]
+    assert [p["cookie_count"] for p in points] == [3, 3]
+    assert points[0]["earliest_expiry"] == "2030-03-17T17:46:40+00:00"
+
+    def unavailable() -> list[Account]:
+        raise ValueError("broken accounts file")
+
+    monkeypatch.setattr(history_module, "shard_accounts", unavailable)
+    history.sample()
+    assert history.query()["points"][-1]["cookie_count"] == 0
+
+
+def test_history_ring_buffer_overwrites_oldest() -> None:
+    """Test the buffer keeps the newest points up to its capacity."""
+    history = History(capacity=3, path="")
+    for i in range(5):
+        history.record(i, 0, at=1000 + i)
+
+    result = history.query()
+
+    assert len(history) == 3
+    assert [p["cookie_count"] for p in result["points"]] == [2, 3, 4]
+    assert result["step"] == 0
+
+
+def test_history_downsampling() -> None:
+    """Test points are aggregated into equal time buckets with refresh stats."""
+    history = History(capacity=100, path="")
+    for i in range(10):
+        history.record(5, 2_000_000_000 - i, duration=float(i), ok=i != 3, at=1000 + i * 10)
+    history.record(6, 0, at=1095)
+
+    result = history.query(max_points=2)
+
+    assert len(result["points"]) == 2
+    first, second = result["points"]
+    assert first["refreshes"] == 5 and first["failures"] == 1
+    assert first["refresh_seconds"] == 2.0 and first["refresh_seconds_max"] == 4.0
+    assert second["cookie_count"] == 6
+    assert second["earliest_expiry"] == "2033-05-18T03:33:11+00:00"
+    assert history.query(since=1090)["points"][0]["refreshes"] == 1
+
+
+def test_history_persists_across_restarts(tmp_path: Path) -> None:
+    """Test points survive a restart through the binary file, keeping the newest when capacity shrinks."""
+    path = tmp_path / "history.bin"
+    history = History(capacity=10, path=str(path))
+    history.record(3, 1_900_000_000, at=1000)
+    history.record(4, 1_900_000_100, duration=12.5, ok=True, at=2000)
+
+    assert path.stat().st_size == 9 + 2 * 29
+    restored = History(capacity=1, path=str(path))
+
+    points = restored.query()["points"]
+    assert [(p["cookie_count"], p["refresh_seconds"]) for p in points] == [(4, 12.5)]
+
+
+def test_history_concurrent_records_persist(tmp_path: Path) -> None:
+    """Test the sampler and the refresh worker can record at the same time without losing the file."""
+    path = tmp_path / "history.bin"
+    history = History(capacity=1000, path=str(path))
+
+    def record(count: int) -> None:
+        for i in range(50):
+            history.record(count, 0, at=1000 + i)
+
+    threads = [threading.Thread(target=record, args=(count,)) for count in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(History(capacity=1000, path=str(path))) == 200
+    assert [p.name for p in tmp_path.iterdir()] == ["history.bin"]
+
+
+def test_history_ignores_corrupt_file(tmp_path: Path) -> None:
+    """Test an unreadable history file starts an empty history."""
+    path = tmp_path / "history.bin"
+    path.write_bytes(b"garbage")
+
+    assert len(History(path=str(path))) == 0
+
+
+def test_history_sampler_disabled() -> None:
+    """Test an interval of 0 disables periodic sampling."""
+    sampler = HistorySampler(History(path=""), interval=0)
+    sampler.start()
+    sampler.stop()
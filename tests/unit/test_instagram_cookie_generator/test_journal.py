@@ -0,0 +1,103 @@
+"""
+Unit tests for journal module.
+"""
+
+import json
+from pathlib import Path
+
+from instagram_cookie_generator.journal import CookieDiff, CookieJournal, diff_cookies, redact_entry
+from instagram_cookie_generator.storage import Cookie
+
+SESSION = Cookie(".instagram.com", "/", True, 2_000_000_000, "sessionid", "s1")
+CSRF = Cookie(".instagram.com", "/", True, 1_900_000_000, "csrftoken", "c1")
+RUR = Cookie(".instagram.com", "/", True, 1_800_000_000, "rur", "r1")
+
+
+def test_diff_cookies_detects_added_removed_changed() -> None:
+    """Test diff reports added, removed and rotated cookies."""
+    rotated = Cookie(".instagram.com", "/", True, 2_000_000_100, "sessionid", "s2")
+
+    diff = diff_cookies([SESSION, CSRF], [rotated, RUR])
+
+    assert diff.added == [RUR]
+    assert diff.removed == [CSRF]
+    assert diff.changed == [(SESSION, rotated)]
+    assert diff.to_dict()["changed"][0]["fields"] == ["value", "expiry"]
+    assert diff.summary() == "+1 -1 ~1 (csrftoken, rur, sessionid)"
+
+
+def test_diff_cookies_identical_jars_is_empty() -> None:
+    """Test identical jars produce an empty diff."""
+    assert diff_cookies([SESSION, CSRF], [CSRF, SESSION]).is_empty()
+
+
+def test_journal_record_publishes_and_counts_rotations() -> None:
+    """Test recorded diffs reach subscribers and feed rotation counts."""
+    journal = CookieJournal()
+    received: list[CookieDiff] = []
+    journal.subscribe(received.append)
+
+    rotated = Cookie(".instagram.com", "/", True, 2_000_000_000, "sessionid", "s2")
+    journal.record([], [SESSION], "alice")
+    journal.record([SESSION], [SESSION], "alice")
+    journal.record([SESSION], [rotated], "alice")
+    journal.record([SESSION], [rotated], "bob")
+
+    assert len(received) == 3
+    assert [entry["account"] for entry in journal.recent()] == ["alice", "alice", "bob"]
+    assert journal.rotation_counts() == {"alice": {"sessionid": 1}, "bob": {"sessionid": 1}}
+
+    journal.unsubscribe(received.append)
+    journal.record([], [RUR], "alice")
+    assert len(received) == 3
+
+
+def test_journal_file_is_size_capped(tmp_path: Path) -> None:
+    """Test the journal file drops its oldest entries once it exceeds the cap."""
+    path = tmp_path / "journal.jsonl"
+    journal = CookieJournal(str(path), max_bytes=2048)
+
+    for i in range(50):
+        journal.record([], [Cookie(".instagram.com", "/", True, 2_000_000_000, f"cookie{i}", "v")], "alice")
+
+    assert path.stat().st_size <= 2048
+    entries = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+    assert entries[-1]["added"][0]["name"] == "cookie49"
+    assert journal.recent(limit=1) == entries[-1:]
+
+
+def test_journal_subscriber_failure_is_isolated() -> None:
+    """Test a failing subscriber does not break recording."""
+    journal = CookieJournal()
+
+    def boom(_diff: CookieDiff) -> None:
+        raise RuntimeError("boom")
+
+    journal.subscribe(boom)
+    assert not journal.record([], [SESSION], "alice").is_empty()
+
+
+def test_redact_entry_strips_values() -> None:
+    """Test values are removed before journal entries are exposed."""
+    entry = {"ts": 1, **diff_cookies([], [SESSION]).to_dict()}
+    assert "value" not in redact_entry(entry)["added"][0]
+    assert entry["added"][0]["value"] == "s1"
+
+
+def test_journal_recent_skips_corrupt_lines(tmp_path: Path) -> None:
+    """Test a line truncated by a crash during an append does not break reading the journal."""
+    path = tmp_path / "journal.jsonl"
+    journal = CookieJournal(str(path))
+    journal.record([], [SESSION], "alice")
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"time": "2024-01-01T00:00:00+00:00", "add')
+
+    entries = journal.recent()
+
+    assert len(entries) == 1
+    assert entries[0]["added"][0]["name"] == "sessionid"
+
+    journal.record([SESSION], [], "alice")
+    entries = journal.recent()
+    assert len(entries) == 2
+    assert entries[1]["removed"][0]["name"] == "sessionid"
@@ -0,0 +1,78 @@
+"""
+Unit tests for leader module.
+"""
+
+import threading
+import time
+from pathlib import Path
+
+from instagram_cookie_generator.leader import LeaderElector, LeaderLease
+
+
+def test_lease_is_exclusive_until_expiry(tmp_path: Path) -> None:
+    """Test only one node holds the lease and another takes over once it expires."""
+    path = str(tmp_path / "leader.db")
+    first = LeaderLease(path, "node-a", ttl=0.2)
+    second = LeaderLease(path, "node-b", ttl=0.2)
+
+    assert first.try_acquire()
+    assert first.try_acquire()  # renewal keeps the term
+    assert not second.try_acquire()
+    assert first.is_leader and not second.is_leader
+    assert second.status()["holder"] == "node-a"
+
+    time.sleep(0.25)
+    assert not first.is_leader
+    assert second.try_acquire()
+    assert second.term == first.term + 1
+    assert not first.try_acquire()
+
+
+def test_release_hands_over_immediately(tmp_path: Path) -> None:
+    """Test a released lease can be acquired without waiting for expiry."""
+    path = str(tmp_path / "leader.db")
+    first = LeaderLease(path, "node-a", ttl=60)
+    second = LeaderLease(path, "node-b", ttl=60)
+
+    assert first.try_acquire()
+    first.release()
+    assert not first.is_leader
+    assert second.try_acquire()
+    assert second.status()["expires_in"] > 0
+
+
+def test_elector_failover(tmp_path: Path) -> None:
+    """Test a follower becomes leader within the lease TTL after the leader stops renewing."""
+    path = str(tmp_path / "leader.db")
+    leader = LeaderElector(LeaderLease(path, "node-a", ttl=0.3), renew_interval=0.05)
+    follower = LeaderElector(LeaderLease(path, "node-b", ttl=0.3), renew_interval=0.05)
+    leader.start()
+    follower.start()
+    try:
+        assert leader.is_leader
+        assert not follower.wait_until_leader(timeout=0.4)
+
+        # Simulate a crashed leader: it stops renewing but does not release the lease.
+        leader._stop.set()  # pylint: disable=protected-access
+        started = time.monotonic()
+        assert follower.wait_until_leader(timeout=2)
+        assert time.monotonic() - started < 0.3 + 0.1 + 0.2
+    finally:
+        follower.stop()
+        leader.stop()
+
+
+def test_wait_until_leader_returns_on_stop(tmp_path: Path) -> None:
+    """Test stopping the elector wakes up waiting followers."""
+    path = str(tmp_path / "leader.db")
+    assert LeaderLease(path, "node-a", ttl=60).try_acquire()
+    follower = LeaderElector(LeaderLease(path, "node-b", ttl=60), renew_interval=30)
+    follower.start()
+
+    result = []
+    waiter = threading.Thread(target=lambda: result.append(follower.wait_until_leader()))
+    waiter.start()
+    follower.stop()
+    waiter.join(timeout=2)
+
+    assert result == [False]
@@ -0,0 +1,89 @@
+"""
+Unit tests for lifecycle module.
+"""
+
+import os
+import signal
+import threading
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+from instagram_cookie_generator.lifecycle import Lifecycle, ShutdownRequested, install_signal_handlers
+
+
+def test_checkpoint_raises_after_stop() -> None:
+    """Test safe points cancel the refresh once a shutdown was requested."""
+    lifecycle = Lifecycle()
+    lifecycle.checkpoint("login")
+
+    lifecycle.request_stop("SIGTERM")
+
+    assert lifecycle.stopping
+    assert lifecycle.stop_reason == "SIGTERM"
+    with pytest.raises(ShutdownRequested, match="login"):
+        lifecycle.checkpoint("login")
+
+
+def test_shutdown_requested_passes_broad_handlers() -> None:
+    """Test the broad exception handlers of the refresh path do not swallow a cancellation."""
+    assert not issubclass(ShutdownRequested, Exception)
+
+
+def test_sleep_wakes_on_refresh_request() -> None:
+    """Test a refresh request ends the sleep early, once."""
+    lifecycle = Lifecycle()
+    threading.Timer(0.05, lifecycle.request_refresh).start()
+
+    started = time.monotonic()
+    assert lifecycle.sleep(10) is True
+    assert time.monotonic() - started < 5
+    assert lifecycle.sleep(0.01) is False
+
+
+def test_sleep_returns_immediately_once_stopping() -> None:
+    """Test waits end as soon as a shutdown was requested."""
+    lifecycle = Lifecycle()
+    lifecycle.request_stop("SIGTERM")
+
+    assert lifecycle.sleep(10) is True
+    assert lifecycle.sleep(10) is True
+    assert lifecycle.wait_for_stop(10) is True
+
+
+def test_quit_browsers() -> None:
+    """Test registered browsers are quit, and unregistered once their block exits."""
+    lifecycle = Lifecycle()
+    failing = MagicMock()
+    failing.quit.side_effect = RuntimeError("gone")
+    with lifecycle.browser(MagicMock()):
+        pass
+    with lifecycle.browser(failing):
+        assert lifecycle.quit_browsers() == 1
+    assert lifecycle.quit_browsers() == 0
+
+
+def test_signal_handlers() -> None:
+    """Test SIGHUP requests a refresh, SIGUSR1 dumps state and SIGTERM stops."""
+    lifecycle = Lifecycle()
+    dumped = threading.Event()
+    saved = {
+        signum: signal.getsignal(signum) for signum in (signal.SIGTERM, signal.SIGINT, signal.SIGHUP, signal.SIGUSR1)
+    }
+    try:
+        install_signal_handlers(lifecycle, dumped.set)
+
+        os.kill(os.getpid(), signal.SIGUSR1)
+        assert dumped.wait(5)
+
+        os.kill(os.getpid(), signal.SIGHUP)
+        assert lifecycle.sleep(5) is True
+        assert not lifecycle.stopping
+
+        os.kill(os.getpid(), signal.SIGTERM)
+        assert lifecycle.wait_for_stop(5)
+        assert lifecycle.stop_reason == "SIGTERM"
+    finally:
+        for signum, handler in saved.items():
+            signal.signal(signum, handler)
@@ -0,0 +1,82 @@
+"""
+Unit tests for locators module.
+"""
+
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+from selenium.webdriver.remote.webdriver import WebDriver
+
+from instagram_cookie_generator.locators import UNSEEN_HIT_RATE, LocatorStats, batch_find
+
+FIRST = ("css selector", "input[name='username']")
+SECOND = ("name", "username")
+THIRD = ("xpath", "//input[@aria-label='username']")
+
+
+def test_stats_reorder_by_hit_rate() -> None:
+    """Test the locator that keeps matching moves to the front."""
+    stats = LocatorStats()
+    assert stats.order("username", [FIRST, SECOND, THIRD]) == [FIRST, SECOND, THIRD]
+
+    for _ in range(3):
+        stats.record("username", [FIRST, SECOND, THIRD], THIRD)
+
+    assert stats.order("username", [FIRST, SECOND, THIRD]) == [THIRD, FIRST, SECOND]
+    assert stats.hit_rate("username", THIRD) > UNSEEN_HIT_RATE > stats.hit_rate("username", FIRST)
+    assert stats.order("password", [FIRST, SECOND]) == [FIRST, SECOND]
+
+
+def test_stats_miss_lowers_rate() -> None:
+    """Test a lookup without a match counts as a miss for every locator tried."""
+    stats = LocatorStats()
+    stats.record("consent", [FIRST, SECOND], None)
+    assert stats.hit_rate("consent", FIRST) < UNSEEN_HIT_RATE
+    assert stats.hit_rate("consent", THIRD) == UNSEEN_HIT_RATE
+
+
+def test_stats_persist_across_instances(tmp_path: Path) -> None:
+    """Test stats survive a restart through the stats file."""
+    path = tmp_path / "locators.json"
+    stats = LocatorStats(str(path))
+    stats.record("username", [FIRST, SECOND], SECOND)
+    stats.save()
+
+    reloaded = LocatorStats(str(path))
+    assert reloaded.snapshot() == stats.snapshot()
+    assert reloaded.order("username", [FIRST, SECOND]) == [SECOND, FIRST]
+
+
+def test_stats_ignore_corrupt_file(tmp_path: Path) -> None:
+    """Test a corrupt stats file does not break lookups."""
+    path = tmp_path / "locators.json"
+    path.write_text("{not json", encoding="utf-8")
+    assert not LocatorStats(str(path)).snapshot()
+
+
+def test_batch_find_returns_index_and_element() -> None:
+    """Test a batched lookup maps the script result to (index, element)."""
+    element = MagicMock()
+    driver = MagicMock(spec=WebDriver)
+    driver.execute_script.return_value = [1, element]
+
+    assert batch_find(driver, [FIRST, SECOND]) == (1, element)
+    driver.execute_script.assert_called_once()
+    assert driver.execute_script.call_args.args[1] == [list(FIRST), list(SECOND)]
+
+
+def test_batch_find_no_match() -> None:
+    """Test a batched lookup without matches returns None."""
+    driver = MagicMock(spec=WebDriver)
+    driver.execute_script.return_value = None
+    assert batch_find(driver, [FIRST]) is None
+
+
+@pytest.mark.parametrize("locators,result", [([("link text", "Log in")], None), ([FIRST], "unexpected")])
+def test_batch_find_unsupported(locators: list[tuple[str, str]], result: object) -> None:
+    """Test unsupported strategies and odd results ask the caller to fall back."""
+    driver = MagicMock(spec=WebDriver)
+    driver.execute_script.return_value = result
+    with pytest.raises(ValueError):
+        batch_find(driver, locators)
@@ -8,7 +8,14 @@ import logging
 
 import pytest
 
-from instagram_cookie_generator.logger import JsonFormatter, PlainFormatter, _stdout_filter, get_logger, setup_logger
+from instagram_cookie_generator.logger import (
+    JsonFormatter,
+    PlainFormatter,
+    SamplingFilter,
+    _stdout_filter,
+    get_logger,
+    setup_logger,
+)
 
 
 def test_get_logger_returns_logger_instance() -> None:
@@ -100,3 +107,101 @@ def test_get_logger_with_explicit_name() -> None:
     name = "my.custom.logger"
     logger = get_logger(name)
     assert logger.name == name
+
+
+def _sampled_logger(name: str, sampling: SamplingFilter) -> tuple[logging.Logger, io.StringIO]:
+    """Logger writing JSON lines through a sampling filter."""
+    logger = get_logger(name)
+    logger.handlers.clear()
+    logger.propagate = False
+    stream = io.StringIO()
+    handler = logging.StreamHandler(stream)
+    handler.setFormatter(JsonFormatter())
+    handler.addFilter(sampling)
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    return logger, stream
+
+
+def _lines(stream: io.StringIO) -> list[dict[str, object]]:
+    return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+
+def test_sampling_filter_collapses_repeats(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test identical messages within the window collapse into one line with a repeat count."""
+    now = [1000.0]
+    monkeypatch.setattr("time.time", lambda: now[0])
+    logger, stream = _sampled_logger("test_sampling_repeats", SamplingFilter(window=60, max_per_site=0))
+
+    for probe in range(7):
+        if probe == 6:
+            now[0] += 61
+        logger.warning("/healthz: cookies invalid or expired.")
+        if probe == 0:
+            logger.warning("Something else")
+
+    lines = _lines(stream)
+    assert [line["message"] for line in lines] == [
+        "/healthz: cookies invalid or expired.",
+        "Something else",
+        "/healthz: cookies invalid or expired. (repeated 5 more times in 60s)",
+    ]
+    assert lines[-1]["repeated"] == 5
+
+
+def test_sampling_filter_summarizes_stopped_messages(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test suppressed messages that stop recurring are summarized on the next sweep or on flush."""
+    now = [1000.0]
+    monkeypatch.setattr("time.time", lambda: now[0])
+    sampling = SamplingFilter(window=60, max_per_site=0)
+    logger, stream = _sampled_logger("test_sampling_summary", sampling)
+
+    for _ in range(3):
+        logger.warning("Failed to read or parse cookies file")
+    now[0] += 61
+    for _ in range(3):
+        logger.info("Recovered")
+
+    lines = _lines(stream)
+    assert [line["message"] for line in lines] == [
+        "Failed to read or parse cookies file",
+        "Failed to read or parse cookies file (repeated 2 more times in 60s)",
+        "Recovered",
+    ]
+    assert lines[1]["repeated"] == 2
+
+    sampling.flush()
+    assert _lines(stream)[-1] == {
+        **_lines(stream)[-1],
+        "message": "Recovered (repeated 2 more times in 60s)",
+        "repeated": 2,
+    }
+
+
+def test_sampling_filter_rate_limits_call_sites(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test a call site logging many different messages is capped per window."""
+    now = [1000.0]
+    monkeypatch.setattr("time.time", lambda: now[0])
+    logger, stream = _sampled_logger("test_sampling_sites", SamplingFilter(window=60, max_per_site=3))
+
+    for i in range(11):
+        if i == 10:
+            now[0] += 61
+        logger.warning(f"/livez: no progress for {i}s")
+
+    messages = [line["message"] for line in _lines(stream)]
+    assert messages == [
+        "/livez: no progress for 0s",
+        "/livez: no progress for 1s",
+        "/livez: no progress for 2s",
+        "Suppressed 7 log messages from this call site in 60s",
+        "/livez: no progress for 10s",
+    ]
+
+
+def test_sampling_filter_disabled() -> None:
+    """Test a window of 0 passes every record."""
+    logger, stream = _sampled_logger("test_sampling_disabled", SamplingFilter(window=0, max_per_site=1))
+    for _ in range(3):
+        logger.warning("same")
+    assert len(_lines(stream)) == 3
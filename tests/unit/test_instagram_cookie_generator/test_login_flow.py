@@ -0,0 +1,140 @@
+"""
+Unit tests for login_flow module.
+"""
+
+import json
+from pathlib import Path
+from typing import Dict, List
+from unittest.mock import MagicMock
+
+import pytest
+
+from instagram_cookie_generator.login_flow import Action, FlowContext, LoginFlow, Step, load_steps
+
+
+def recording_actions(calls: List[str], results: Dict[str, bool]) -> Dict[str, Action]:
+    """Actions that record the executed step names and return preset results."""
+
+    def action(_driver: object, step: Step, _context: FlowContext) -> bool:
+        calls.append(step.name)
+        outcome = results.get(step.name, True)
+        if isinstance(outcome, Exception):
+            results[step.name] = True
+            raise outcome
+        return outcome
+
+    return {"do": action}
+
+
+def steps(*names: str, checkpoint: str = "", optional: str = "") -> List[Step]:
+    """Build steps using the single `do` action."""
+    return [Step(name, "do", checkpoint=name == checkpoint, optional=name == optional) for name in names]
+
+
+def test_default_flow_is_valid() -> None:
+    """Test the built-in flow loads and submits credentials at a checkpoint."""
+    flow = load_steps("")
+    assert [s.name for s in flow][:2] == ["open_login", "consent"]
+    assert next(s for s in flow if s.name == "submit").checkpoint
+
+
+def test_flow_runs_steps_in_order_and_times_them() -> None:
+    """Test a successful run executes all steps and records timings."""
+    calls: List[str] = []
+    flow = LoginFlow(steps("a", "b", "c"), recording_actions(calls, {}))
+
+    assert flow.run(MagicMock()) is True
+    assert calls == ["a", "b", "c"]
+    assert [t.name for t in flow.timings] == ["a", "b", "c"]
+    assert "b=" in flow.timings_summary()
+
+
+def test_flow_required_step_failure_stops() -> None:
+    """Test a failing required step ends the run with False."""
+    calls: List[str] = []
+    flow = LoginFlow(steps("a", "b", "c"), recording_actions(calls, {"b": False}))
+
+    assert flow.run(MagicMock()) is False
+    assert calls == ["a", "b"]
+    assert flow.resume_index == 0
+
+
+def test_flow_optional_step_failure_continues() -> None:
+    """Test optional steps may fail without failing the flow."""
+    calls: List[str] = []
+    flow = LoginFlow(steps("a", "b", "c", optional="b"), recording_actions(calls, {"b": False}))
+
+    assert flow.run(MagicMock()) is True
+    assert calls == ["a", "b", "c"]
+
+
+def test_flow_trailing_optional_step_does_not_decide_result() -> None:
+    """Test a flow ending with an interstitial that was not shown still succeeds."""
+    calls: List[str] = []
+    flow = LoginFlow(
+        steps("verify", "save_login_info", optional="save_login_info"),
+        recording_actions(calls, {"save_login_info": False}),
+    )
+
+    assert flow.run(MagicMock()) is True
+    assert calls == ["verify", "save_login_info"]
+
+
+def test_flow_resumes_after_checkpoint() -> None:
+    """Test a run interrupted by an exception resumes after the last checkpoint."""
+    calls: List[str] = []
+    flow = LoginFlow(
+        steps("open", "submit", "interstitial", "verify", checkpoint="submit"),
+        recording_actions(calls, {"interstitial": RuntimeError("hung")}),  # type: ignore[dict-item]
+    )
+
+    with pytest.raises(RuntimeError):
+        flow.run(MagicMock())
+    assert flow.run(MagicMock()) is True
+
+    assert calls == ["open", "submit", "interstitial", "interstitial", "verify"]
+    assert flow.timings[2].ok is False
+
+
+def test_flow_rejects_unknown_actions() -> None:
+    """Test flows fail fast when a step has no registered action."""
+    with pytest.raises(ValueError, match="missing"):
+        LoginFlow([Step("x", "missing")], {})
+
+
+def test_load_steps_from_file_with_interstitial(tmp_path: Path) -> None:
+    """Test a custom flow with an extra interstitial is loaded from JSON."""
+    path = tmp_path / "flow.json"
+    custom = [
+        {"name": "open", "action": "navigate", "url": "https://example.test/login"},
+        {"name": "save_info", "action": "click", "locators": [["xpath", "//button[.='Not now']"]], "optional": True},
+    ]
+    path.write_text(json.dumps(custom), encoding="utf-8")
+
+    loaded = load_steps(str(path))
+
+    assert loaded[1] == Step("save_info", "click", locators=(("xpath", "//button[.='Not now']"),), optional=True)
+
+
+@pytest.mark.parametrize(
+    "definition",
+    [
+        [{"name": "a", "action": "do", "colour": "red"}],
+        [{"name": "a"}],
+        [{"name": "a", "action": "do"}, {"name": "a", "action": "do"}],
+    ],
+)
+def test_load_steps_rejects_invalid_definitions(tmp_path: Path, definition: List[Dict[str, str]]) -> None:
+    """Test unknown keys, missing actions and duplicate names are rejected."""
+    path = tmp_path / "flow.json"
+    path.write_text(json.dumps(definition), encoding="utf-8")
+
+    with pytest.raises(ValueError):
+        load_steps(str(path))
+
+
+def test_flow_context_renders_variables() -> None:
+    """Test placeholders are substituted from flow variables."""
+    context = FlowContext(variables={"username": "alice"})
+    assert context.render("{username}") == "alice"
+    assert context.render(None) == ""
@@ -0,0 +1,185 @@
+"""
+Unit tests for main module.
+"""
+
+# pylint: disable=redefined-outer-name
+
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any
+from unittest.mock import MagicMock
+
+import pytest
+
+from instagram_cookie_generator import lifecycle, main
+
+
+@pytest.fixture()
+def patch_startup(monkeypatch: pytest.MonkeyPatch) -> MagicMock:
+    """Patch out .env loading, logger setup, signal handlers, the history sampler and the blocking Flask server."""
+    monkeypatch.setattr(main, "load_dotenv", lambda: None)
+    monkeypatch.setattr(main, "setup_logger", lambda: None)
+    monkeypatch.setattr(lifecycle, "_LIFECYCLE", None)
+    monkeypatch.setattr(lifecycle, "install_signal_handlers", MagicMock())
+    monkeypatch.setattr("instagram_cookie_generator.history.HistorySampler", MagicMock())
+    start_server = MagicMock()
+    monkeypatch.setattr("instagram_cookie_generator.webserver.start_server", start_server)
+    return start_server
+
+
+def test_parse_args_serve_only() -> None:
+    """Test --serve-only flag parsing."""
+    assert main.parse_args(["--serve-only"]).serve_only is True
+    assert main.parse_args([]).serve_only is False
+
+
+def test_main_serve_only_skips_refresh_worker(patch_startup: MagicMock, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test serve-only mode starts the server without the refresh thread."""
+    thread_cls = MagicMock()
+    monkeypatch.setattr("threading.Thread", thread_cls)
+
+    main.main(["--serve-only"])
+
+    thread_cls.assert_not_called()
+    patch_startup.assert_called_once()
+
+
+def test_main_starts_refresh_worker(patch_startup: MagicMock, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test default mode starts the refresh thread before serving."""
+    started: list[Any] = []
+    monkeypatch.setattr(
+        "threading.Thread",
+        lambda target, **_kwargs: MagicMock(start=lambda: started.append(target), is_alive=lambda: False),
+    )
+
+    main.main([])
+
+    assert started == [main.refresh_worker]
+    patch_startup.assert_called_once()
+
+
+def test_main_rejects_invalid_export_config(patch_startup: MagicMock, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test invalid COOKIE_VIEWS or COOKIE_EXPORT_FORMATS stop the service at startup."""
+
+    def invalid() -> None:
+        raise ValueError("Unknown cookie export format: 'bogus'")
+
+    monkeypatch.setattr("instagram_cookie_generator.export.get_exports", invalid)
+
+    with pytest.raises(SystemExit):
+        main.main([])
+    patch_startup.assert_not_called()
+
+
+def test_webserver_import_does_not_load_selenium() -> None:
+    """Test the health server can be imported without pulling in Selenium."""
+    code = "import sys, instagram_cookie_generator.main, instagram_cookie_generator.webserver; print('selenium' in sys.modules)"
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)}
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True, env=env)
+    assert result.stdout.strip() == "False"
+
+
+def test_next_refresh_delay(tmp_path: Path) -> None:
+    """Test a new leader waits until the first of the shared cookie files is due."""
+    # pylint: disable=protected-access
+    cookies_file = tmp_path / "cookies.txt"
+    other_file = tmp_path / "other.txt"
+    assert main._next_refresh_delay([str(cookies_file)], 3600) == 0
+    assert main._next_refresh_delay([], 3600) == 0
+
+    cookies_file.write_text("", encoding="utf-8")
+    assert 3590 < main._next_refresh_delay([str(cookies_file)], 3600) <= 3600
+    assert main._next_refresh_delay([str(cookies_file), str(other_file)], 3600) == 0
+
+    other_file.write_text("", encoding="utf-8")
+    os.utime(other_file, (time.time() - 3000, time.time() - 3000))
+    assert 590 < main._next_refresh_delay([str(cookies_file), str(other_file)], 3600) <= 600
+
+    os.utime(cookies_file, (0, 0))
+    assert main._next_refresh_delay([str(cookies_file), str(other_file)], 3600) == 0
+
+
+@pytest.mark.usefixtures("patch_startup")
+def test_main_shuts_down_after_server_stops(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test the refresh worker is stopped and joined once the server returns."""
+    worker = MagicMock(is_alive=lambda: False)
+    monkeypatch.setattr("threading.Thread", lambda **_kwargs: worker)
+
+    main.main([])
+
+    assert lifecycle.get_lifecycle().stopping
+    worker.join.assert_called_once()
+
+
+def test_shutdown_quits_browsers_of_stuck_refresh(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test browsers are quit from the main thread when the refresh does not stop in time."""
+    monkeypatch.setattr(lifecycle, "_LIFECYCLE", None)
+    driver = MagicMock()
+    worker = MagicMock(is_alive=lambda: True)
+
+    with lifecycle.get_lifecycle().browser(driver):
+        main.shutdown(worker, timeout=0.1)
+
+    driver.quit.assert_called_once()
+    assert worker.join.call_count == 2
+
+
+def test_refresh_worker_stops_between_accounts(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test a shutdown requested during a refresh cancels the remaining accounts and the sleep."""
+    # pylint: disable=import-outside-toplevel
+    from instagram_cookie_generator.accounts import Account
+
+    monkeypatch.setattr(lifecycle, "_LIFECYCLE", None)
+    accounts = [Account("alice", "x", "a.txt"), Account("bob", "x", "b.txt")]
+    monkeypatch.setattr("instagram_cookie_generator.accounts.get_accounts", lambda: accounts)
+    monkeypatch.setattr("instagram_cookie_generator.leader.get_elector", lambda: None)
+    refreshed: list[str] = []
+
+    def fake_cookie_manager(account: Account) -> None:
+        refreshed.append(account.username)
+        lifecycle.get_lifecycle().request_stop("SIGTERM")
+
+    monkeypatch.setattr("instagram_cookie_generator.cookie_manager.cookie_manager", fake_cookie_manager)
+
+    main.refresh_worker()
+
+    assert refreshed == ["alice"]
+
+
+def test_refresh_worker_records_resources_once_per_cycle(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test the resources of all accounts of a cycle are published as a single record."""
+    # pylint: disable=import-outside-toplevel
+    from instagram_cookie_generator.accounts import Account
+
+    monkeypatch.setattr(lifecycle, "_LIFECYCLE", None)
+    accounts = [Account("alice", "x", "a.txt"), Account("bob", "x", "b.txt")]
+    monkeypatch.setattr("instagram_cookie_generator.accounts.get_accounts", lambda: accounts)
+    monkeypatch.setattr("instagram_cookie_generator.leader.get_elector", lambda: None)
+    record_cycle = MagicMock()
+    monkeypatch.setattr("instagram_cookie_generator.resources.record_cycle", record_cycle)
+    monkeypatch.setattr("instagram_cookie_generator.resources.PROC_AVAILABLE", True)
+    refreshed: list[str] = []
+
+    def fake_cookie_manager(account: Account) -> None:
+        refreshed.append(account.username)
+        if account.username == "bob":
+            lifecycle.get_lifecycle().request_stop("SIGTERM")
+
+    monkeypatch.setattr("instagram_cookie_generator.cookie_manager.cookie_manager", fake_cookie_manager)
+
+    main.refresh_worker()
+
+    assert refreshed == ["alice", "bob"]
+    record_cycle.assert_called_once()
+
+
+def test_dump_state(caplog: pytest.LogCaptureFixture) -> None:
+    """Test the SIGUSR1 state dump logs worker state and thread stacks."""
+    with caplog.at_level("INFO"):
+        main.dump_state()
+
+    assert "State dump" in caplog.text
+    assert "MainThread" in caplog.text
@@ -0,0 +1,87 @@
+"""
+Unit tests for overlays module.
+"""
+
+# pylint: disable=redefined-outer-name
+
+from unittest.mock import MagicMock
+
+import pytest
+from pytest_mock import MockerFixture
+from selenium.common import NoSuchElementException
+from selenium.webdriver.remote.webdriver import WebDriver
+
+from instagram_cookie_generator.locators import LocatorStats
+from instagram_cookie_generator.overlays import (
+    CONSENT,
+    KNOWN_OVERLAYS,
+    NOT_NOW,
+    Overlay,
+    detect_overlays,
+    dismiss_overlays,
+)
+
+
+@pytest.fixture(autouse=True)
+def fresh_stats(mocker: MockerFixture) -> LocatorStats:
+    """Use empty locator stats and skip sleeping."""
+    stats = LocatorStats()
+    mocker.patch("instagram_cookie_generator.overlays.get_locator_stats", return_value=stats)
+    mocker.patch("instagram_cookie_generator.overlays.time.sleep")
+    return stats
+
+
+def test_detect_checks_all_overlays_in_one_call() -> None:
+    """Test every overlay and locator is sent in a single script evaluation."""
+    driver = MagicMock(spec=WebDriver)
+    driver.execute_script.return_value = {"not_now": [1, False]}
+
+    assert detect_overlays(driver, KNOWN_OVERLAYS) == {"not_now": (1, False)}
+    driver.execute_script.assert_called_once()
+    payload = driver.execute_script.call_args.args[1]
+    assert [name for name, _ in payload] == ["consent", "not_now"]
+    assert len(payload[0][1]) == len(CONSENT.buttons)
+
+
+def test_detect_rejects_unbatchable_locators() -> None:
+    """Test locators that cannot be resolved in-page raise ValueError."""
+    driver = MagicMock(spec=WebDriver)
+    with pytest.raises(ValueError):
+        detect_overlays(driver, [Overlay("custom", (("link text", "Close"),))])
+    driver.execute_script.assert_not_called()
+
+
+def test_dismiss_waits_until_overlays_disappear(fresh_stats: LocatorStats) -> None:
+    """Test dismissed overlays are polled until gone and hits are recorded."""
+    driver = MagicMock(spec=WebDriver)
+    driver.execute_script.side_effect = [
+        {"consent": [2, True], "not_now": [0, True]},
+        {"not_now": [0, False]},
+        {},
+    ]
+
+    assert dismiss_overlays(driver) == ["consent", "not_now"]
+    assert driver.execute_script.call_count == 3
+    # The second poll only asks for the overlay that was still visible.
+    assert [name for name, _ in driver.execute_script.call_args_list[2].args[1]] == ["not_now"]
+    assert fresh_stats.order("consent", CONSENT.buttons)[0] == CONSENT.buttons[2]
+
+
+def test_dismiss_returns_empty_without_overlays() -> None:
+    """Test nothing is waited for when no overlay is present."""
+    driver = MagicMock(spec=WebDriver)
+    driver.execute_script.return_value = {}
+
+    assert not dismiss_overlays(driver, [NOT_NOW])
+    driver.execute_script.assert_called_once()
+
+
+def test_dismiss_falls_back_to_sequential_lookup() -> None:
+    """Test buttons are probed one by one when in-page detection is unavailable."""
+    driver = MagicMock(spec=WebDriver)
+    driver.execute_script.return_value = None
+    button = MagicMock()
+    driver.find_element.side_effect = [NoSuchElementException(), button, NoSuchElementException()]
+
+    assert dismiss_overlays(driver, [CONSENT, Overlay("dialog", (("link text", "Close"),))]) == ["consent"]
+    button.click.assert_called_once()
@@ -0,0 +1,60 @@
+"""
+Unit tests for profiler module.
+"""
+
+import threading
+import time
+
+import pytest
+
+from instagram_cookie_generator import profiler
+from instagram_cookie_generator.profiler import Profile, ProfilerBusyError, sample
+
+
+def _busy_loop(stop: threading.Event) -> None:
+    while not stop.is_set():
+        time.sleep(0.001)
+
+
+def test_sample_captures_other_threads() -> None:
+    """Test stacks of other threads are sampled and rooted at the thread name."""
+    stop = threading.Event()
+    worker = threading.Thread(target=_busy_loop, args=(stop,), name="refresh_worker")
+    worker.start()
+    try:
+        profile = sample(0.05, interval=0.005)
+    finally:
+        stop.set()
+        worker.join()
+
+    assert profile.samples >= 2
+    threads = {stack[0] for stack in profile.stacks}
+    assert "refresh_worker" in threads
+    assert threading.current_thread().name not in threads
+    assert any("_busy_loop" in line for line in profile.collapsed().splitlines())
+
+
+def test_sample_rejects_concurrent_profiles() -> None:
+    """Test only one profile runs at a time."""
+    with profiler._PROFILE_LOCK:  # pylint: disable=protected-access
+        with pytest.raises(ProfilerBusyError):
+            sample(0.01)
+
+
+def test_sample_rejects_non_finite_window() -> None:
+    """Test a NaN window is refused instead of sampling forever while holding the profile lock."""
+    with pytest.raises(ValueError):
+        sample(float("nan"))
+    assert not profiler._PROFILE_LOCK.locked()  # pylint: disable=protected-access
+
+
+def test_profile_top_counts_self_and_total() -> None:
+    """Test per-function self and total samples."""
+    profile = Profile(samples=3)
+    profile.stacks[("worker", "main", "refresh", "login")] = 2
+    profile.stacks[("worker", "main", "refresh")] = 1
+
+    top = {entry["function"]: (entry["self"], entry["total"]) for entry in profile.top()}
+    assert top == {"login": (2, 2), "refresh": (1, 3), "main": (0, 3)}
+    assert profile.collapsed().splitlines()[0] == "worker;main;refresh;login 2"
+    assert profile.to_dict()["threads"] == ["worker"]
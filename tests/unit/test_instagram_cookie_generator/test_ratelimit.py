@@ -0,0 +1,93 @@
+"""
+Unit tests for ratelimit module.
+"""
+
+import threading
+import time
+
+from pytest_mock import MockerFixture
+
+from instagram_cookie_generator.ratelimit import Governor, TokenBucket
+
+
+def test_bucket_allows_burst_then_paces() -> None:
+    """Test the burst is granted immediately and later tokens wait for the refill."""
+    bucket = TokenBucket(rate_per_hour=3600, burst=2)  # one token per second
+
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == 0
+    assert 0.9 < bucket.reserve() <= 1.0
+    assert 1.9 < bucket.reserve() <= 2.0
+    assert bucket.state()["granted"] == 4
+
+
+def test_disabled_bucket_never_waits() -> None:
+    """Test a zero rate disables the limit."""
+    bucket = TokenBucket(rate_per_hour=0, burst=1)
+    assert all(bucket.reserve() == 0 for _ in range(10))
+
+
+def test_login_waits_for_global_and_account_buckets(mocker: MockerFixture) -> None:
+    """Test the stricter of the global and per-account limits applies."""
+    sleep = mocker.patch("instagram_cookie_generator.lifecycle.Lifecycle.wait_for_stop", return_value=False)
+    governor = Governor(global_rate=3600, global_burst=10, account_rate=360, account_burst=1)
+
+    with governor.login("alice") as waited:
+        assert waited == 0
+    with governor.login("bob") as waited:
+        assert waited == 0
+    with governor.login("alice") as waited:
+        assert 9 < waited <= 10
+    sleep.assert_called_once()
+
+    state = governor.state()
+    assert set(state["accounts"]) == {"alice", "bob"}
+    assert state["global"]["granted"] == 3
+    assert state["logins"] == {"active": 0, "limit": 1}
+
+
+def test_login_reservation_is_used_or_refunded(mocker: MockerFixture) -> None:
+    """Test a reservation paces the refresh up front, covers its login and is refunded if unused."""
+    sleep = mocker.patch("instagram_cookie_generator.lifecycle.Lifecycle.wait_for_stop", return_value=False)
+    governor = Governor(global_rate=3600, global_burst=10, account_rate=360, account_burst=1)
+
+    with governor.login_reservation("alice") as waited:
+        assert waited == 0
+        with governor.login("alice") as waited:
+            assert waited == 0
+    with governor.login_reservation("alice") as waited:
+        assert 9 < waited <= 10
+        with governor.login("alice") as waited:
+            assert waited == 0
+    sleep.assert_called_once()
+
+    with governor.login_reservation("bob"):
+        pass
+    state = governor.state()
+    assert state["global"]["granted"] == 2
+    assert state["accounts"]["bob"]["granted"] == 0
+    assert state["accounts"]["bob"]["tokens"] == 1
+
+
+def test_browser_slots_cap_concurrency() -> None:
+    """Test only the configured number of browsers run at the same time."""
+    governor = Governor(max_browsers=1)
+    entered = threading.Event()
+    release = threading.Event()
+
+    def hold() -> None:
+        with governor.browser_slot():
+            entered.set()
+            release.wait(2)
+
+    holder = threading.Thread(target=hold)
+    holder.start()
+    entered.wait(2)
+    assert governor.state()["browsers"] == {"active": 1, "limit": 1}
+
+    started = time.monotonic()
+    threading.Timer(0.1, release.set).start()
+    with governor.browser_slot():
+        assert time.monotonic() - started >= 0.09
+    holder.join()
+    assert governor.state()["browsers"]["active"] == 0
@@ -0,0 +1,170 @@
+"""
+Unit tests for replay module.
+"""
+
+import json
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+from unittest.mock import MagicMock
+
+import pytest
+from selenium.common import NoSuchElementException, WebDriverException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.common.keys import Keys
+from selenium.webdriver.remote.webelement import WebElement
+
+from instagram_cookie_generator import replay
+from instagram_cookie_generator.browser import get_engine
+from instagram_cookie_generator.replay import (
+    REDACTED,
+    RecordingDriver,
+    ReplayDriver,
+    ReplayEngine,
+    ReplayError,
+    load_trace,
+    redact,
+)
+from instagram_cookie_generator.tracing import span
+
+COOKIE = {"domain": ".instagram.com", "path": "/", "secure": True, "expiry": 2000000000, "name": "sessionid"}
+
+
+def fake_browser() -> MagicMock:
+    """Browser with a username field, a missing login button and one session cookie."""
+    field = MagicMock(spec=WebElement)
+    driver = MagicMock()
+    driver.current_url = "https://www.instagram.com/"
+
+    def find_element(_by: str, value: str) -> Any:
+        if value == "input[name='username']":
+            return field
+        raise NoSuchElementException(f"no {value}\nstacktrace")
+
+    driver.find_element.side_effect = find_element
+    driver.get_cookies.return_value = [{**COOKIE, "value": "secret-session"}]
+    return driver
+
+
+def record_session(path: Path) -> List[Dict[str, Any]]:
+    """Record a short login-like session and return its trace."""
+    driver = RecordingDriver(fake_browser(), str(path))
+    with span("navigate"):
+        driver.get("https://www.instagram.com/")
+    with span("cookies.load"):
+        driver.add_cookie({**COOKIE, "value": "old-secret"})
+    with span("login"):
+        field = driver.find_element(By.CSS_SELECTOR, "input[name='username']")
+        field.send_keys("dummyuser")
+        field.send_keys(Keys.RETURN)
+        with pytest.raises(NoSuchElementException):
+            driver.find_element(By.CSS_SELECTOR, "button[type='submit']")
+        assert driver.current_url == "https://www.instagram.com/"
+    with span("cookies.save"):
+        driver.get_cookies()
+    driver.quit()
+    return load_trace(str(path))
+
+
+def test_recording_driver_writes_trace(tmp_path: Path) -> None:
+    """Test every command is recorded with its span, latency and outcome."""
+    commands = record_session(tmp_path / "trace.jsonl")
+
+    assert [c["command"] for c in commands] == [
+        "get",
+        "add_cookie",
+        "find_element",
+        "element.send_keys",
+        "element.send_keys",
+        "find_element",
+        "current_url",
+        "get_cookies",
+        "quit",
+    ]
+    assert [c["span"] for c in commands[:3]] == ["navigate", "cookies.load", "login"]
+    assert all(c["latency"] >= 0 for c in commands)
+    assert commands[2]["result"] == {"$element": 1}
+    assert commands[3]["element"] == 1
+    assert commands[5]["error"] == {"type": "NoSuchElementException", "message": "Message: no button[type='submit']"}
+    header = json.loads((tmp_path / "trace.jsonl").read_text(encoding="utf-8").splitlines()[0])
+    assert header["version"] == 1
+    assert header["commands"] == len(commands)
+
+
+def test_recording_redacts_secrets(tmp_path: Path) -> None:
+    """Test cookie values and typed text never reach the trace, special keys do."""
+    record_session(tmp_path / "trace.jsonl")
+    text = (tmp_path / "trace.jsonl").read_text(encoding="utf-8")
+
+    assert "secret" not in text
+    assert "dummyuser" not in text
+    assert redact("element.send_keys", [Keys.RETURN, "password"]) == [Keys.RETURN, REDACTED]
+
+
+def test_replay_driver_plays_trace(tmp_path: Path) -> None:
+    """Test the replay returns recorded results, elements and errors, matching redacted arguments."""
+    driver = ReplayDriver(record_session(tmp_path / "trace.jsonl"), time_scale=0)
+
+    driver.get("https://www.instagram.com/")
+    driver.add_cookie({**COOKIE, "value": "another-secret"})
+    field = driver.find_element(By.CSS_SELECTOR, "input[name='username']")
+    field.send_keys("otheruser")
+    field.send_keys(Keys.RETURN)
+    with pytest.raises(NoSuchElementException):
+        driver.find_element(By.CSS_SELECTOR, "button[type='submit']")
+    # Polling more often than recorded repeats the last response.
+    assert driver.current_url == "https://www.instagram.com/"
+    assert driver.current_url == "https://www.instagram.com/"
+    assert driver.get_cookies() == [{**COOKIE, "value": REDACTED}]
+    driver.quit()
+    assert driver.replayed == 10
+
+
+def test_replay_driver_rejects_unknown_command(tmp_path: Path) -> None:
+    """Test a command missing from the trace fails like a WebDriver error."""
+    driver = ReplayDriver(record_session(tmp_path / "trace.jsonl"), time_scale=0)
+
+    with pytest.raises(ReplayError) as exc_info:
+        driver.get("https://example.com/")
+    assert isinstance(exc_info.value, WebDriverException)
+
+
+def test_replay_driver_scales_latency() -> None:
+    """Test recorded latencies are replayed multiplied by the time scale."""
+    commands = [{"command": "get", "element": None, "args": ["https://www.instagram.com/"], "latency": 0.05}]
+
+    started = time.perf_counter()
+    ReplayDriver(commands, time_scale=2).get("https://www.instagram.com/")
+    assert time.perf_counter() - started >= 0.1
+
+    started = time.perf_counter()
+    ReplayDriver(commands, time_scale=0).get("https://www.instagram.com/")
+    assert time.perf_counter() - started < 0.05
+
+
+def test_replay_engine_launches_replay_driver(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test the replay engine is selectable and launches drivers playing its trace."""
+    trace = tmp_path / "trace.jsonl"
+    record_session(trace)
+    monkeypatch.setattr(replay, "REPLAY_TRACE_FILE", str(trace))
+    monkeypatch.setattr(replay, "REPLAY_TIME_SCALE", 0.0)
+
+    engine = get_engine("replay")
+
+    assert isinstance(engine, ReplayEngine)
+    assert engine.launch().current_url == "https://www.instagram.com/"
+
+
+def test_replay_engine_requires_trace() -> None:
+    """Test the replay engine refuses to start without a trace."""
+    with pytest.raises(ValueError):
+        ReplayEngine()
+
+
+def test_load_trace_rejects_unknown_version(tmp_path: Path) -> None:
+    """Test traces of another format version are refused."""
+    trace = tmp_path / "trace.jsonl"
+    trace.write_text(json.dumps({"version": 99}) + "\n", encoding="utf-8")
+
+    with pytest.raises(ValueError):
+        load_trace(str(trace))
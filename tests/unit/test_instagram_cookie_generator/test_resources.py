@@ -0,0 +1,88 @@
+"""
+Unit tests for resources module.
+"""
+
+import os
+import subprocess
+import sys
+from typing import Iterator
+
+import pytest
+
+from instagram_cookie_generator import resources
+from instagram_cookie_generator.resources import (
+    CycleResources,
+    ResourceMonitor,
+    descendants,
+    find_leaked_browsers,
+    last_cycle,
+    read_process,
+    track_resources,
+)
+from instagram_cookie_generator.tracing import span
+
+pytestmark = pytest.mark.skipif(not resources.PROC_AVAILABLE, reason="requires /proc")
+
+
+@pytest.fixture(name="child")
+def fixture_child() -> Iterator["subprocess.Popen[bytes]"]:
+    """A child process standing in for a browser."""
+    with subprocess.Popen([sys.executable, "-c", "import time; time.sleep(30)"]) as proc:
+        try:
+            yield proc
+        finally:
+            proc.kill()
+
+
+def test_read_process_self() -> None:
+    """Test the current process is parsed from /proc."""
+    info = read_process(os.getpid())
+    assert info is not None
+    assert info.ppid == os.getppid()
+    assert info.rss_bytes > 0
+    assert read_process(-1) is None
+
+
+def test_monitor_samples_child_tree(child: "subprocess.Popen[bytes]") -> None:
+    """Test the monitor accounts for child processes."""
+    assert child.pid in {info.pid for info in descendants()}
+
+    monitor = ResourceMonitor(interval=0.01)
+    monitor.start()
+    usage = monitor.stop()
+
+    assert usage.samples >= 1
+    assert usage.max_processes >= 1
+    assert usage.peak_rss_bytes > 0
+    assert usage.max_open_fds >= 3
+
+
+def test_find_leaked_browsers(child: "subprocess.Popen[bytes]") -> None:
+    """Test surviving processes with browser names are reported after the grace period."""
+    info = read_process(child.pid)
+    assert info is not None
+
+    leaked = find_leaked_browsers(grace=0.05, names=(info.name.lower(),))
+    assert child.pid in {p.pid for p in leaked}
+    assert not find_leaked_browsers(grace=0, names=("geckodriver-not-running",))
+
+
+def test_track_resources_records_cycle(child: "subprocess.Popen[bytes]", caplog: pytest.LogCaptureFixture) -> None:
+    """Test a tracked block publishes its usage, warns about leaks and annotates the span."""
+    info = read_process(child.pid)
+    assert info is not None
+    generation = last_cycle()[0]
+
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(resources, "BROWSER_PROCESS_NAMES", (info.name.lower(),))
+        mp.setattr(resources, "LEAK_GRACE_SECONDS", 0.0)
+        with span("do_work") as work:
+            with track_resources():
+                pass
+
+    new_generation, usage = last_cycle()
+    assert new_generation == generation + 1
+    assert isinstance(usage, CycleResources)
+    assert f"{info.name}[{child.pid}]" in usage.leaked
+    assert work.attributes["resources"]["max_processes"] >= 1
+    assert "survived driver.quit()" in caplog.text
@@ -0,0 +1,57 @@
+"""
+Unit tests for sharding module.
+"""
+
+import os
+from pathlib import Path
+
+from instagram_cookie_generator.accounts import Account
+from instagram_cookie_generator.sharding import Cluster, HashRing, Member, load_members
+
+ACCOUNTS = [f"account{i}" for i in range(1000)]
+
+
+def test_ring_spreads_keys_evenly() -> None:
+    """Test each node owns roughly its share of the accounts."""
+    shards = HashRing(["gen-a", "gen-b", "gen-c", "gen-d"]).assign(ACCOUNTS)
+
+    assert sum(len(keys) for keys in shards.values()) == len(ACCOUNTS)
+    assert all(150 < len(keys) < 350 for keys in shards.values())
+    assert HashRing([]).owner("account0") is None
+
+
+def test_ring_moves_minimal_keys_on_join_and_leave() -> None:
+    """Test only accounts taken over by a new node move, and they move back when it leaves."""
+    before = HashRing(["gen-a", "gen-b", "gen-c"])
+    after = HashRing(["gen-a", "gen-b", "gen-c", "gen-d"])
+
+    moved = [key for key in ACCOUNTS if before.owner(key) != after.owner(key)]
+    assert all(after.owner(key) == "gen-d" for key in moved)
+    assert len(moved) < len(ACCOUNTS) * 0.35
+
+
+def test_load_members(tmp_path: Path) -> None:
+    """Test membership lines with optional URLs and comments."""
+    path = tmp_path / "members.txt"
+    path.write_text("# fleet\ngen-a http://gen-a:5000/\n\ngen-b  # no url\n", encoding="utf-8")
+
+    assert load_members(str(path)) == [Member("gen-a", "http://gen-a:5000"), Member("gen-b")]
+
+
+def test_cluster_shard_follows_membership_file(tmp_path: Path) -> None:
+    """Test a node refreshes only its shard and picks up membership changes."""
+    accounts = [Account(name, "secret", f"{name}.txt") for name in ACCOUNTS[:50]]
+    assert len(Cluster("gen-a").shard(accounts)) == 50
+
+    path = tmp_path / "members.txt"
+    path.write_text("gen-a\ngen-b\n", encoding="utf-8")
+    node_a, node_b = Cluster("gen-a", str(path)), Cluster("gen-b", str(path))
+    shard_a, shard_b = node_a.shard(accounts), node_b.shard(accounts)
+    assert shard_a and shard_b
+    assert {a.username for a in shard_a} | {a.username for a in shard_b} == set(ACCOUNTS[:50])
+    assert not {a.username for a in shard_a} & {a.username for a in shard_b}
+
+    path.write_text("gen-a\n", encoding="utf-8")
+    os.utime(path, ns=(0, 0))
+    assert len(node_a.shard(accounts)) == 50
+    assert not node_b.shard(accounts)
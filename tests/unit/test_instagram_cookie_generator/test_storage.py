@@ -0,0 +1,184 @@
+"""
+Unit tests for storage module.
+"""
+
+# pylint: disable=redefined-outer-name
+
+import os
+import threading
+from pathlib import Path
+from typing import Iterator
+
+import pytest
+
+from instagram_cookie_generator.storage import (
+    Cookie,
+    CookieStore,
+    MemoryStore,
+    NetscapeFileStore,
+    SQLiteStore,
+    create_store,
+    read_netscape,
+    scan_netscape,
+    write_atomic,
+    write_netscape,
+)
+
+SESSION = Cookie(".instagram.com", "/", True, 2_000_000_000, "sessionid", "s1")
+CSRF = Cookie(".instagram.com", "/", True, 1_900_000_000, "csrftoken", "c1")
+RUR = Cookie("www.instagram.com", "/", False, 1_800_000_000, "rur", "r1")
+
+
+@pytest.fixture(params=["file", "sqlite", "memory"])
+def store(request: pytest.FixtureRequest, tmp_path: Path) -> Iterator[CookieStore]:
+    """Yield each store implementation backed by a temporary location."""
+    if request.param == "file":
+        yield NetscapeFileStore(str(tmp_path / "{account}.txt"))
+    elif request.param == "sqlite":
+        sqlite_store = SQLiteStore(str(tmp_path / "cookies.db"))
+        yield sqlite_store
+        sqlite_store.close()
+    else:
+        yield MemoryStore()
+
+
+def test_cookie_netscape_roundtrip() -> None:
+    """Test Cookie renders and parses Netscape lines symmetrically."""
+    line = SESSION.to_netscape_line()
+    assert line == ".instagram.com\tTRUE\t/\tTRUE\t2000000000\tsessionid\ts1"
+    assert Cookie.from_netscape_line(line + "\n") == SESSION
+    assert Cookie.from_netscape_line("# comment\n") is None
+    assert Cookie.from_netscape_line("\n") is None
+    with pytest.raises(ValueError):
+        Cookie.from_netscape_line("broken\tline\n")
+
+
+def test_cookie_from_webdriver_defaults_expiry() -> None:
+    """Test session cookies without expiry get a default one."""
+    cookie = Cookie.from_webdriver({"domain": ".instagram.com", "path": "/", "name": "mid", "value": "m"})
+    assert cookie.expiry > 0
+    assert cookie.secure is False
+    assert Cookie.from_webdriver(cookie.to_webdriver()) == cookie
+
+
+def test_read_write_netscape(tmp_path: Path) -> None:
+    """Test Netscape files roundtrip and skip invalid lines."""
+    filename = tmp_path / "cookies.txt"
+    write_netscape(str(filename), [SESSION, CSRF])
+    with open(filename, "a", encoding="utf-8") as f:
+        f.write("garbage\n")
+
+    assert read_netscape(str(filename)) == [SESSION, CSRF]
+    assert not read_netscape(str(tmp_path / "missing.txt"))
+
+
+def test_write_atomic_concurrent_writers(tmp_path: Path) -> None:
+    """Test concurrent writers of a file each use their own temporary file and leave a complete file."""
+    filename = tmp_path / "export.bin"
+    bodies = [bytes([i]) * 65536 for i in range(8)]
+    threads = [threading.Thread(target=write_atomic, args=(str(filename), body)) for body in bodies]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert filename.read_bytes() in bodies
+    assert os.listdir(tmp_path) == ["export.bin"]
+    umask = os.umask(0)
+    os.umask(umask)
+    assert filename.stat().st_mode & 0o777 == 0o666 & ~umask
+
+
+def test_scan_netscape_extracts_requested_fields(tmp_path: Path) -> None:
+    """Test the memory-mapped scanner yields only requested columns and flags malformed lines."""
+    filename = tmp_path / "cookies.txt"
+    filename.write_bytes(
+        b"# Netscape HTTP Cookie File\n\n"
+        + SESSION.to_netscape_line().encode()
+        + b"\r\n"
+        + b"broken\tline\n"
+        + b"  "
+        + RUR.to_netscape_line().encode()
+    )
+
+    assert list(scan_netscape(str(filename), ("name", "expiry"))) == [
+        (b"sessionid", b"2000000000"),
+        None,
+        (b"rur", b"1800000000"),
+    ]
+    assert read_netscape(str(filename)) == [SESSION, RUR]
+
+
+def test_scan_netscape_edge_cases(tmp_path: Path) -> None:
+    """Test empty files, extra columns and unknown field names."""
+    empty = tmp_path / "empty.txt"
+    empty.write_bytes(b"")
+    assert not list(scan_netscape(str(empty)))
+
+    extra = tmp_path / "extra.txt"
+    extra.write_bytes(SESSION.to_netscape_line().encode() + b"\textra\n")
+    assert list(scan_netscape(str(extra))) == [None]
+
+    with pytest.raises(ValueError):
+        list(scan_netscape(str(extra), ("expires",)))
+
+
+def test_store_save_and_load(store: CookieStore) -> None:
+    """Test saving replaces an account's jar."""
+    store.save("alice", [SESSION, CSRF])
+    store.save("alice", [SESSION, RUR])
+    store.save("bob", [CSRF])
+
+    assert store.load("alice") == [SESSION, RUR]
+    assert store.load("bob") == [CSRF]
+    assert not store.load("nobody")
+    assert store.accounts() == ["alice", "bob"]
+
+
+def test_file_store_lists_accounts_after_restart(tmp_path: Path) -> None:
+    """Test the file store finds accounts saved by an earlier process from its path template."""
+    NetscapeFileStore(str(tmp_path / "jar.{account}.txt")).save("alice", [SESSION])
+    (tmp_path / "jar.bob.txt.tmp").write_text("", encoding="utf-8")
+
+    assert NetscapeFileStore(str(tmp_path / "jar.{account}.txt")).accounts() == ["alice"]
+    assert not NetscapeFileStore(str(tmp_path / "jar.txt")).accounts()
+
+
+def test_store_upsert_and_delete(store: CookieStore) -> None:
+    """Test individual cookies can be updated and removed."""
+    store.save("alice", [SESSION, CSRF])
+    rotated = Cookie(".instagram.com", "/", True, 2_100_000_000, "sessionid", "s2")
+
+    store.upsert("alice", [rotated, RUR])
+    assert sorted(store.load("alice"), key=lambda c: c.name) == [CSRF, RUR, rotated]
+
+    store.delete("alice", [CSRF.key])
+    assert CSRF not in store.load("alice")
+
+
+def test_store_query(store: CookieStore) -> None:
+    """Test queries by account, name and expiry."""
+    store.save("alice", [SESSION, CSRF])
+    store.save("bob", [SESSION, RUR])
+
+    assert store.query(name="sessionid") == [("alice", SESSION), ("bob", SESSION)]
+    assert store.query(account="bob", expires_before=1_900_000_000) == [("bob", RUR)]
+    assert store.query(expires_before=1_000_000_000) == []
+
+
+def test_store_export_netscape(store: CookieStore, tmp_path: Path) -> None:
+    """Test any store exports a Netscape file readable by yt-dlp style consumers."""
+    store.save("alice", [SESSION, CSRF])
+    export = tmp_path / "export.txt"
+
+    store.export_netscape("alice", str(export))
+
+    assert export.read_text(encoding="utf-8").startswith("# Netscape HTTP Cookie File")
+    assert read_netscape(str(export)) == [SESSION, CSRF]
+
+
+def test_create_store_unknown_backend() -> None:
+    """Test an unknown backend name is rejected."""
+    assert isinstance(create_store("memory"), MemoryStore)
+    with pytest.raises(ValueError):
+        create_store("redis")
@@ -0,0 +1,93 @@
+"""
+Unit tests for tracing module.
+"""
+
+import json
+from pathlib import Path
+
+import pytest
+from pytest_mock import MockerFixture
+
+from instagram_cookie_generator.retry import retry
+from instagram_cookie_generator.tracing import Tracer, current_span, span
+
+
+@pytest.fixture(name="tracer")
+def fixture_tracer(mocker: MockerFixture) -> Tracer:
+    """Export spans to a fresh in-memory tracer."""
+    tracer = Tracer(capacity=100)
+    mocker.patch("instagram_cookie_generator.tracing.get_tracer", return_value=tracer)
+    return tracer
+
+
+def test_nested_spans_share_trace(tracer: Tracer) -> None:
+    """Test child spans link to their parent and the root starts a new trace."""
+    with span("refresh_cycle", cycle=1) as root:
+        assert current_span() is root
+        with span("browser.launch") as child:
+            child.set_attribute("engine", "firefox")
+    assert current_span() is None
+
+    launch, cycle = tracer.spans()
+    assert cycle.parent_id is None
+    assert launch.parent_id == cycle.span_id
+    assert launch.trace_id == cycle.trace_id
+    assert launch.attributes == {"engine": "firefox"}
+    assert cycle.duration_ms >= launch.duration_ms
+
+
+def test_span_records_errors(tracer: Tracer) -> None:
+    """Test an exception marks the span as failed and propagates."""
+    with pytest.raises(RuntimeError):
+        with span("login"):
+            raise RuntimeError("boom")
+
+    (failed,) = tracer.spans()
+    assert failed.status == "error"
+    assert failed.error == "RuntimeError: boom"
+
+
+def test_retry_traces_each_attempt(tracer: Tracer, mocker: MockerFixture) -> None:
+    """Test every retry attempt gets its own span with the attempt number."""
+    mocker.patch("instagram_cookie_generator.retry.time.sleep")
+    calls = []
+
+    @retry(max_attempts=3, delay_seconds=0, jitter=0)
+    def flaky() -> str:
+        calls.append(1)
+        if len(calls) < 2:
+            raise RuntimeError("transient")
+        return "ok"
+
+    with span("refresh_cycle"):
+        assert flaky() == "ok"
+
+    attempts = [s for s in tracer.spans() if s.name == "flaky"]
+    assert [(s.attributes["attempt"], s.status) for s in attempts] == [(1, "error"), (2, "ok")]
+    (trace,) = tracer.traces()
+    assert trace["name"] == "refresh_cycle"
+    assert len(trace["spans"]) == 3
+
+
+def test_traces_newest_first_and_limited(tracer: Tracer) -> None:
+    """Test traces are grouped by trace id, most recent first."""
+    for cycle in range(3):
+        with span("refresh_cycle", cycle=cycle):
+            pass
+
+    traces = tracer.traces(limit=2)
+    assert [t["spans"][0]["attributes"]["cycle"] for t in traces] == [2, 1]
+
+
+def test_ring_buffer_and_jsonl_export(tmp_path: Path) -> None:
+    """Test the buffer keeps the newest spans while the file keeps all of them."""
+    path = tmp_path / "traces.jsonl"
+    tracer = Tracer(str(path), capacity=2)
+    for name in ("a", "b", "c"):
+        with span(name) as finished:
+            pass
+        tracer.export(finished)
+
+    assert [s.name for s in tracer.spans()] == ["b", "c"]
+    lines = path.read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line)["name"] for line in lines] == ["a", "b", "c"]
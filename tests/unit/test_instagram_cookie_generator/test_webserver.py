@@ -5,13 +5,25 @@ Unit tests for webserver module.
 # pylint: disable=redefined-outer-name
 
 import importlib
+import json
 import time
 from pathlib import Path
 from typing import Any
+from urllib.parse import quote
 
 import pytest
 
-from instagram_cookie_generator import cookie_manager, webserver
+from instagram_cookie_generator import accounts, config, leader, sharding, webserver
+from instagram_cookie_generator.accounts import Account, load_accounts
+from instagram_cookie_generator.export import ExportCache, parse_formats
+from instagram_cookie_generator.heartbeat import Heartbeat
+from instagram_cookie_generator.history import History
+from instagram_cookie_generator.leader import LeaderLease
+from instagram_cookie_generator.proxies import ProxyPool
+from instagram_cookie_generator.resources import CycleResources, record_cycle
+from instagram_cookie_generator.sharding import Cluster
+from instagram_cookie_generator.storage import Cookie
+from instagram_cookie_generator.tracing import span
 
 
 @pytest.fixture()
@@ -28,7 +40,7 @@ def patch_env_and_reload(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Any
     monkeypatch.setenv("INSTAGRAM_USERNAME", "dummyuser")
     monkeypatch.setenv("INSTAGRAM_PASSWORD", "dummypass")
 
-    importlib.reload(cookie_manager)
+    importlib.reload(config)
     importlib.reload(webserver)
 
     return webserver
@@ -63,6 +75,10 @@ def test_webserver_status_version_fallback(patch_env_and_reload: Any, monkeypatc
     monkeypatch.setattr(
         "instagram_cookie_generator.webserver.dist_version", lambda name: (_ for _ in ()).throw(Exception("fail"))
     )
+    assert patch_env_and_reload._resolve_version() == "unknown"  # pylint: disable=protected-access
+
+    monkeypatch.setattr(patch_env_and_reload, "PACKAGE_VERSION", "unknown")
+    monkeypatch.setattr(patch_env_and_reload, "_SNAPSHOT", None)
 
     client = patch_env_and_reload.app.test_client()
     response = client.get("/status")
@@ -71,6 +87,68 @@ def test_webserver_status_version_fallback(patch_env_and_reload: Any, monkeypatc
     assert response.json["version"] == "unknown"
 
 
+def test_webserver_status_snapshot_cached_until_file_changes(patch_env_and_reload: Any) -> None:
+    """Test that the serialized status snapshot is reused until the cookies file changes."""
+    first = patch_env_and_reload.get_status_snapshot()
+    assert patch_env_and_reload.get_status_snapshot() is first
+
+    cookies_file = Path(patch_env_and_reload.COOKIES_FILE)
+    expiry = int(time.time()) + 3600
+    cookies_file.write_text(
+        f".instagram.com\tTRUE\t/\tFALSE\t{expiry}\tsessionid\tv\n"
+        f".instagram.com\tTRUE\t/\tFALSE\t{expiry}\tcsrftoken\tv\n",
+        encoding="utf-8",
+    )
+
+    second = patch_env_and_reload.get_status_snapshot()
+    assert second is not first
+    assert second.earliest_expiry == expiry
+
+
+def test_webserver_status_splices_expires_in(patch_env_and_reload: Any, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that expires_in is computed per request and the status flips once cookies expire."""
+    client = patch_env_and_reload.app.test_client()
+    earliest = patch_env_and_reload.get_status_snapshot().earliest_expiry
+
+    monkeypatch.setattr(time, "time", lambda: earliest - 10)
+    response = client.get("/status")
+    assert response.status_code == 200
+    assert response.json["cookies"]["expires_in"] == 10
+
+    monkeypatch.setattr(time, "time", lambda: earliest + 10)
+    response = client.get("/status")
+    assert response.status_code == 503
+    assert response.json["fresh"] is False
+    assert response.json["cookies"]["expires_in"] == 0
+    assert client.get("/healthz").status_code == 503
+
+
+def test_webserver_status_renders_proxies_per_request(
+    patch_env_and_reload: Any, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test the proxy state on /status follows the quarantine clock while the snapshot stays cached."""
+    pool = ProxyPool(["http://10.0.0.1:3128"], cooldown=0.2)
+    proxy = pool.assign("alice")
+    assert proxy is not None
+    for _ in range(3):
+        pool.report(proxy, False)
+    monkeypatch.setattr(patch_env_and_reload, "get_proxy_pool", lambda: pool)
+    client = patch_env_and_reload.app.test_client()
+
+    response = client.get("/status")
+    assert response.json is not None
+    assert response.json["proxies"][0]["healthy"] is False
+    assert response.json["proxies"][0]["quarantined_for"] > 0
+    snapshot = patch_env_and_reload.get_status_snapshot()
+
+    time.sleep(0.25)
+    response = client.get("/status")
+    assert response.json is not None
+    assert response.json["proxies"][0]["healthy"] is True
+    assert response.json["proxies"][0]["quarantined_for"] == 0
+    assert patch_env_and_reload.get_status_snapshot() is snapshot
+
+
 def test_webserver_health_healthy(patch_env_and_reload: Any) -> None:
     """Test that /healthz reports healthy when cookies are valid and fresh."""
     client = patch_env_and_reload.app.test_client()
@@ -89,7 +167,7 @@ def test_webserver_status_empty_file(tmp_path: Path, monkeypatch: pytest.MonkeyP
     monkeypatch.setenv("INSTAGRAM_USERNAME", "dummyuser")
     monkeypatch.setenv("INSTAGRAM_PASSWORD", "dummypass")
 
-    importlib.reload(cookie_manager)
+    importlib.reload(config)
     importlib.reload(webserver)
 
     client = webserver.app.test_client()
@@ -110,7 +188,7 @@ def test_webserver_health_unhealthy(tmp_path: Path, monkeypatch: pytest.MonkeyPa
     monkeypatch.setenv("INSTAGRAM_USERNAME", "dummyuser")
     monkeypatch.setenv("INSTAGRAM_PASSWORD", "dummypass")
 
-    importlib.reload(cookie_manager)
+    importlib.reload(config)
     importlib.reload(webserver)
 
     client = webserver.app.test_client()
@@ -132,3 +210,269 @@ def test_webserver_health_file_oserror(monkeypatch: pytest.MonkeyPatch) -> None:
     assert response.status_code == 503
     assert response.json is not None
     assert response.json["fresh"] is False
+
+
+def test_webserver_status_journal(patch_env_and_reload: Any) -> None:
+    """Test /status/journal exposes recent changes without cookie values."""
+    journal = patch_env_and_reload.get_journal()
+    journal.record([], [Cookie(".instagram.com", "/", True, 2_000_000_000, "sessionid", "secret")], "dummyuser")
+
+    client = patch_env_and_reload.app.test_client()
+    response = client.get("/status/journal?limit=5")
+
+    assert response.status_code == 200
+    assert response.json["entries"][-1]["added"][0]["name"] == "sessionid"
+    assert response.json["entries"][-1]["account"] == "dummyuser"
+    assert "secret" not in response.get_data(as_text=True)
+
+
+def test_webserver_debug_traces(patch_env_and_reload: Any, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test /debug/traces returns finished refresh traces with their spans."""
+    with span("refresh_cycle", cycle=7):
+        with span("browser.launch"):
+            pass
+
+    client = patch_env_and_reload.app.test_client()
+    assert client.get("/debug/traces").status_code == 404
+
+    monkeypatch.setattr(webserver, "DEBUG_ENDPOINTS", True)
+    response = client.get("/debug/traces?limit=1")
+
+    assert response.status_code == 200
+    (trace,) = response.json["traces"]
+    assert trace["name"] == "refresh_cycle"
+    assert [s["name"] for s in trace["spans"]] == ["refresh_cycle", "browser.launch"]
+
+
+def test_webserver_debug_profile_disabled(patch_env_and_reload: Any) -> None:
+    """Test /debug/profile is not available without DEBUG_ENDPOINTS."""
+    client = patch_env_and_reload.app.test_client()
+    assert client.get("/debug/profile?seconds=0").status_code == 404
+
+
+def test_webserver_debug_profile(patch_env_and_reload: Any, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test /debug/profile returns collapsed stacks or a JSON summary."""
+    monkeypatch.setattr(patch_env_and_reload, "DEBUG_ENDPOINTS", True)
+    client = patch_env_and_reload.app.test_client()
+
+    response = client.get("/debug/profile?seconds=0.02")
+    assert response.status_code == 200
+    assert response.mimetype == "text/plain"
+
+    response = client.get("/debug/profile?seconds=0.02&format=json")
+    assert response.status_code == 200
+    assert response.json["samples"] >= 1
+    # The requesting thread itself is never sampled.
+    assert "MainThread" not in response.json["threads"]
+
+    assert client.get("/debug/profile?seconds=nan").status_code == 400
+    assert client.get("/debug/profile?seconds=inf").status_code == 400
+
+
+def test_webserver_status_includes_cycle_resources(patch_env_and_reload: Any) -> None:
+    """Test /status reports the latest refresh cycle resources without waiting for a cookie change."""
+    client = patch_env_and_reload.app.test_client()
+    client.get("/status")
+
+    record_cycle(CycleResources(peak_rss_bytes=1024, cpu_seconds=1.234, max_processes=3, max_open_fds=40, samples=2))
+    response = client.get("/status")
+
+    assert response.json["resources"]["max_processes"] == 3
+    assert response.json["resources"]["cpu_seconds"] == 1.23
+
+
+def test_webserver_status_leader(patch_env_and_reload: Any, monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    """Test /status/leader reports whether leader election is enabled and who holds the lease."""
+    client = patch_env_and_reload.app.test_client()
+    assert client.get("/status/leader").json == {"enabled": False}
+
+    path = str(tmp_path / "leader.db")
+    LeaderLease(path, "node-a", ttl=60).try_acquire()
+    monkeypatch.setattr(leader, "LEADER_LEASE_FILE", path)
+
+    response = client.get("/status/leader")
+    assert response.json["enabled"] is True
+    assert response.json["holder"] == "node-a"
+    assert response.json["is_leader"] is False
+
+
+def test_webserver_status_account(patch_env_and_reload: Any, monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    """Test /status/<account> answers for owned accounts and redirects to the owner otherwise."""
+    members = tmp_path / "members.txt"
+    members.write_text("gen-a http://gen-a:5000\ngen-b\n", encoding="utf-8")
+    cluster = Cluster("gen-a", str(members))
+    owned = next(f"user{i}" for i in range(100) if cluster.owns(f"user{i}"))
+    remote = next(f"user{i}" for i in range(100) if not cluster.owns(f"user{i}"))
+    configured = {name: Account(name, "secret", config.COOKIES_FILE) for name in (owned, remote)}
+    monkeypatch.setattr(patch_env_and_reload, "find_account", configured.get)
+    monkeypatch.setattr(patch_env_and_reload, "get_cluster", lambda: cluster)
+    client = patch_env_and_reload.app.test_client()
+
+    response = client.get(f"/status/{owned}")
+    assert response.status_code == 200
+    assert response.json["cookies"]["cookie_names"] == ["sessionid"]
+
+    response = client.get(f"/status/{remote}")
+    assert response.status_code == 421
+    assert response.json["owner"] == "gen-b"
+
+    cluster_b = Cluster("gen-b", str(members))
+    monkeypatch.setattr(patch_env_and_reload, "get_cluster", lambda: cluster_b)
+    response = client.get(f"/status/{owned}")
+    assert response.status_code == 307
+    assert response.headers["Location"] == f"http://gen-a:5000/status/{owned}"
+
+    odd = next(f"a b?#{i}" for i in range(100) if not cluster_b.owns(f"a b?#{i}"))
+    monkeypatch.setitem(configured, odd, Account(odd, "secret", config.COOKIES_FILE))
+    response = client.get(f"/status/{quote(odd, safe='')}")
+    assert response.headers["Location"] == f"http://gen-a:5000/status/{quote(odd, safe='')}"
+
+    assert client.get("/status/nobody").status_code == 404
+
+
+@pytest.fixture()
+def accounts_file(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """Configure two accounts from an accounts file, each with its own fresh jar; COOKIES_FILE is unused."""
+    path = tmp_path / "accounts.json"
+    path.write_text(
+        json.dumps(
+            [
+                {"username": name, "password": "secret", "cookies_file": str(tmp_path / f"{name}.txt")}
+                for name in ("alice", "bob")
+            ]
+        ),
+        encoding="utf-8",
+    )
+    for name, ttl in (("alice", 7200), ("bob", 3600)):
+        expiry = int(time.time()) + ttl
+        (tmp_path / f"{name}.txt").write_text(
+            f".instagram.com\tTRUE\t/\tFALSE\t{expiry}\tsessionid\t{name}\n", encoding="utf-8"
+        )
+    monkeypatch.setattr(accounts, "_ACCOUNTS", load_accounts(str(path)))
+    monkeypatch.setattr(sharding, "INSTAGRAM_ACCOUNTS_FILE", str(path))
+    monkeypatch.setattr(sharding, "_CLUSTER", None)
+    monkeypatch.setattr(webserver, "INSTAGRAM_ACCOUNTS_FILE", str(path))
+    monkeypatch.setattr(webserver, "_SNAPSHOT", None)
+    return path
+
+
+@pytest.mark.usefixtures("patch_env_and_reload")
+def test_webserver_healthz_with_accounts_file(accounts_file: Path) -> None:
+    """Test readiness follows the accounts' own jars, and the least fresh one decides."""
+    Path(config.COOKIES_FILE).unlink()
+    client = webserver.app.test_client()
+
+    assert client.get("/healthz").status_code == 200
+    response = client.get("/status")
+    assert response.status_code == 200
+    assert response.json is not None
+    assert 3590 < response.json["cookies"]["expires_in"] <= 3600
+    assert set(response.json["accounts"]) == {"alice", "bob"}
+
+    (accounts_file.parent / "bob.txt").unlink()
+    assert client.get("/healthz").status_code == 503
+    response = client.get("/status")
+    assert response.json is not None
+    assert response.json["accounts"]["alice"]["cookie_count"] == 1
+
+
+@pytest.mark.usefixtures("patch_env_and_reload", "accounts_file")
+def test_webserver_cookie_export_requires_account_with_accounts_file(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test /cookies/<view>.<format> needs ?account= when every account has its own jar."""
+    monkeypatch.setattr(webserver, "COOKIE_EXPORT_TOKEN", "secret")
+    monkeypatch.setattr(webserver, "get_exports", lambda: ExportCache([], parse_formats("txt")))
+    client = webserver.app.test_client()
+    headers = {"Authorization": "Bearer secret"}
+
+    assert client.get("/cookies/full.txt", headers=headers).status_code == 400
+    response = client.get("/cookies/full.txt?account=bob", headers=headers)
+    assert response.status_code == 200
+    assert b"\tsessionid\tbob" in response.data
+
+
+def test_webserver_status_account_accounts_unavailable(
+    patch_env_and_reload: Any, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test an unreadable accounts file makes /status/<account> unavailable instead of failing."""
+
+    def unreadable(_username: str) -> None:
+        raise ValueError("Accounts file must contain a JSON list")
+
+    monkeypatch.setattr(patch_env_and_reload, "find_account", unreadable)
+    assert patch_env_and_reload.app.test_client().get("/status/alice").status_code == 503
+
+
+def test_webserver_status_limits(patch_env_and_reload: Any) -> None:
+    """Test /status/limits exposes the login limiter and concurrency state."""
+    client = patch_env_and_reload.app.test_client()
+    response = client.get("/status/limits")
+
+    assert response.status_code == 200
+    assert {"global", "accounts", "browsers", "logins"} <= set(response.json)
+
+
+def test_webserver_livez(patch_env_and_reload: Any, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test /livez reports a stuck refresh worker with 503 and its stage."""
+    stuck = Heartbeat(deadline=0)
+    stuck.attach()
+    stuck.beat("navigate")
+    monkeypatch.setattr(webserver, "get_heartbeat", lambda: stuck)
+    client = patch_env_and_reload.app.test_client()
+    time.sleep(0.01)
+
+    response = client.get("/livez")
+    assert response.status_code == 503
+    assert response.json["status"] == "stuck"
+    assert response.json["stage"] == "navigate"
+
+    stuck.deadline = 60
+    response = client.get("/livez")
+    assert response.status_code == 200
+    assert response.json["status"] == "alive"
+
+
+def test_webserver_cookie_export(patch_env_and_reload: Any, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test /cookies/<view>.<format> serves rendered exports behind the token, with ETags."""
+    client = patch_env_and_reload.app.test_client()
+    assert client.get("/cookies/full.header").status_code == 404
+
+    monkeypatch.setattr(webserver, "COOKIE_EXPORT_TOKEN", "secret")
+    monkeypatch.setattr(webserver, "get_exports", lambda: ExportCache([], parse_formats("txt,header")))
+    assert client.get("/cookies/full.header").status_code == 401
+
+    headers = {"Authorization": "Bearer secret"}
+    response = client.get("/cookies/full.header", headers=headers)
+    assert response.status_code == 200
+    assert response.data == b"Cookie: sessionid=dummyvalue\n"
+    assert response.mimetype == "text/plain"
+
+    cached = client.get("/cookies/full.header", headers={**headers, "If-None-Match": response.headers["ETag"]})
+    assert cached.status_code == 304
+    assert client.get("/cookies/full.json", headers=headers).status_code == 404
+    assert client.get("/cookies/full.txt?account=nobody", headers=headers).status_code == 404
+
+
+def test_webserver_cookie_export_misconfigured(patch_env_and_reload: Any, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test invalid export settings make /cookies/<view>.<format> unavailable instead of failing."""
+    monkeypatch.setattr(webserver, "COOKIE_EXPORT_TOKEN", "secret")
+    monkeypatch.setattr(webserver, "get_exports", lambda: parse_formats("txt,bogus"))
+
+    response = patch_env_and_reload.app.test_client().get(
+        "/cookies/full.txt", headers={"Authorization": "Bearer secret"}
+    )
+    assert response.status_code == 503
+
+
+def test_webserver_status_history(patch_env_and_reload: Any, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test /status/history returns downsampled points."""
+    history = History(capacity=10, path="")
+    for i in range(4):
+        history.record(1, 0, duration=1.0, ok=True, at=time.time() - 100 + i)
+    monkeypatch.setattr(webserver, "get_history", lambda: history)
+    client = patch_env_and_reload.app.test_client()
+
+    response = client.get("/status/history?points=2")
+    assert response.status_code == 200
+    assert response.json["size"] == 4
+    assert [p["refreshes"] for p in response.json["points"]] == [2, 2]
+    assert client.get("/status/history?since=10").json["points"] == []